@@ -0,0 +1,2 @@
+from .generator import generate_log
+from .runner import run_benchmarks, save_results
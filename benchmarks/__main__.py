@@ -0,0 +1,139 @@
+import argparse
+import logging
+from pathlib import Path
+from typing import Dict, Optional, Sequence
+
+from config import read_log_format
+from log_parser import LogFormat, LogParser
+from log_parser.timerange import DEFAULT_DATE_FORMAT
+from .generator import DEFAULT_LEVEL_MIX, generate_log
+from .runner import run_benchmarks, save_results
+
+logger = logging.getLogger("core")
+
+
+def _level_mix(value: str) -> Dict[str, float]:
+    """Parse a level mix like `ERROR=5,INFO=95` into its weights."""
+    try:
+        return {
+            level.strip().upper(): float(weight)
+            for level, weight in (item.split("=") for item in value.split(","))
+        }
+    except ValueError:
+        raise argparse.ArgumentTypeError(
+            f"expected LEVEL=WEIGHT pairs separated by commas, got `{value}`"
+        ) from None
+
+
+def build_arg_parser() -> argparse.ArgumentParser:
+    """
+    Build the command line interface of the benchmark suite.
+
+    Returns:
+        argparse.ArgumentParser: The parser of the benchmark arguments.
+    """
+    arg_parser = argparse.ArgumentParser(
+        prog="python -m benchmarks",
+        description="Benchmark the scan modes of the parser on a synthetic log.",
+    )
+    arg_parser.add_argument(
+        "--size", type=float, default=100, help="the size of the log file in MB"
+    )
+    arg_parser.add_argument(
+        "--levels",
+        type=_level_mix,
+        default=DEFAULT_LEVEL_MIX,
+        help="the weights of the log levels, like `ERROR=5,INFO=95`",
+    )
+    arg_parser.add_argument(
+        "--line-length", type=int, default=120, help="the average line length"
+    )
+    arg_parser.add_argument(
+        "--tracebacks",
+        type=float,
+        default=0.0,
+        help="the share of the ERROR lines followed by a traceback",
+    )
+    arg_parser.add_argument("--seed", type=int, default=0, help="the random seed")
+    arg_parser.add_argument(
+        "-l", "--level", default="ERROR", help="the log level to filter by"
+    )
+    arg_parser.add_argument(
+        "-m",
+        "--modes",
+        default=",".join(LogParser.valid_modes),
+        help="the comma-separated scan modes to benchmark",
+    )
+    arg_parser.add_argument(
+        "--repeat", type=int, default=3, help="the number of runs of every mode"
+    )
+    arg_parser.add_argument(
+        "--workers",
+        type=int,
+        default=0,
+        help="the worker processes of the parallel mode, 0 for the number of CPUs",
+    )
+    arg_parser.add_argument(
+        "--log-file",
+        type=Path,
+        default=Path("benchmarks/data/synthetic.log"),
+        help="the path of the generated log file",
+    )
+    arg_parser.add_argument(
+        "-o",
+        "--output",
+        type=Path,
+        default=Path("benchmarks/results"),
+        help="the directory of the JSON result files",
+    )
+    return arg_parser
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    """
+    Generate the synthetic log file, benchmark every scan mode on it and save the
+    results as JSON.
+
+    Args:
+        argv (Optional[Sequence[str]]): The arguments, defaults to `sys.argv`.
+    """
+    arg_parser = build_arg_parser()
+    args = arg_parser.parse_args(argv)
+    modes = [mode.strip().lower() for mode in args.modes.split(",")]
+    for mode in modes:
+        if mode not in LogParser.valid_modes:
+            arg_parser.error(f"Valid scan modes are: {LogParser.valid_modes}")
+    log_format = LogFormat(format_string=read_log_format())
+
+    settings = {
+        "size": int(args.size * 1024 * 1024),
+        "level_mix": args.levels,
+        "line_length": args.line_length,
+        "traceback_ratio": args.tracebacks,
+        "seed": args.seed,
+        "format_string": log_format.format_string,
+        "date_format": DEFAULT_DATE_FORMAT,
+    }
+    args.log_file.parent.mkdir(parents=True, exist_ok=True)
+    settings["lines"] = generate_log(path=args.log_file, **settings)
+    settings.update(level=args.level, modes=modes, repeat=args.repeat)
+
+    results = run_benchmarks(
+        file_path=args.log_file,
+        log_level=args.level,
+        modes=modes,
+        repeat=args.repeat,
+        workers=args.workers,
+    )
+    for result in results:
+        print(
+            f"{result['mode']:>8}: {result['lines_per_second']:>12,.0f} lines/s, "
+            f"{result['mb_per_second']:>8.1f} MB/s, first match after "
+            f"{(result['time_to_first_match'] or 0) * 1000:.2f} ms, peak RSS "
+            f"{result['peak_rss_bytes'] / (1024 * 1024):.1f} MB"
+        )
+    print(f"Saved the results to `{save_results(results, settings, args.output)}`")
+
+
+if __name__ == "__main__":
+    main()
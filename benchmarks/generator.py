@@ -0,0 +1,120 @@
+import logging
+import random
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, Mapping, Optional
+
+from log_parser.records import DEFAULT_FORMAT
+from log_parser.timerange import DEFAULT_DATE_FORMAT
+
+logger = logging.getLogger("core")
+
+# The share of every log level, close to the one of a production service.
+DEFAULT_LEVEL_MIX: Dict[str, float] = {
+    "DEBUG": 0.30,
+    "INFO": 0.55,
+    "WARNING": 0.10,
+    "ERROR": 0.04,
+    "CRITICAL": 0.01,
+}
+DEFAULT_MODULES = ("app", "db", "views", "cache", "auth", "worker")
+START_TIME = datetime(2024, 1, 1)
+WORDS = (
+    "request user order payment session query cache timeout retry connection "
+    "handler worker queue message token record update delete insert commit"
+).split()
+TRACEBACK = (
+    "Traceback (most recent call last):\n"
+    '  File "app.py", line 42, in handle\n'
+    "ValueError: invalid literal for int() with base 10\n"
+)
+
+
+def generate_log(
+    path: Path,
+    size: int,
+    level_mix: Optional[Mapping[str, float]] = None,
+    line_length: int = 120,
+    traceback_ratio: float = 0.0,
+    seed: int = 0,
+    format_string: str = DEFAULT_FORMAT,
+    date_format: str = DEFAULT_DATE_FORMAT,
+) -> int:
+    """
+    Write a synthetic log file in the format of `logging.toml`. The same arguments
+    always write the same bytes, so benchmark runs are comparable.
+
+    Args:
+        path (Path): The path of the log file to write.
+        size (int): The approximate size of the file in bytes.
+        level_mix (Optional[Mapping[str, float]]): The weight of every log level,
+            defaults to `DEFAULT_LEVEL_MIX`.
+        line_length (int): The average length of the lines, the messages are
+            between half and one and a half of the length left for them.
+        traceback_ratio (float): The share of the ERROR and CRITICAL lines that
+            are followed by a traceback.
+        seed (int): The seed of the random generator.
+        format_string (str): The `logging` format of the lines.
+        date_format (str): The `strftime` format of the `asctime` field.
+
+    Returns:
+        int: The number of lines written.
+    """
+    level_mix = level_mix or DEFAULT_LEVEL_MIX
+    levels = list(level_mix)
+    weights = list(level_mix.values())
+    generator = random.Random(seed)
+
+    # The length of a line without its message, to size the messages.
+    header_length = len(format_string % _fields(generator=random.Random(seed)))
+    message_length = max(line_length - header_length - 1, 8)
+
+    lines = 0
+    written = 0
+    timestamp = START_TIME
+    with path.open(mode="w", encoding="utf-8", newline="\n") as file:
+        while written < size:
+            level = generator.choices(levels, weights)[0]
+            fields = _fields(generator=generator)
+            fields["asctime"] = timestamp.strftime(date_format)
+            fields["levelname"] = level
+            fields["message"] = _message(generator=generator, length=message_length)
+            line = format_string % fields + "\n"
+            if level in ("ERROR", "CRITICAL") and generator.random() < traceback_ratio:
+                line += TRACEBACK
+                lines += TRACEBACK.count("\n")
+
+            file.write(line)
+            written += len(line)
+            lines += 1
+            # Several lines share a second, like in a busy service.
+            timestamp += timedelta(milliseconds=generator.randint(0, 250))
+
+    logger.debug(f"Generated {lines} lines ({written} bytes) into `{path}`")
+    return lines
+
+
+def _fields(generator: random.Random) -> Dict[str, object]:
+    """Build the random fields of a line, besides its time, level and message."""
+    return {
+        "asctime": START_TIME.strftime(DEFAULT_DATE_FORMAT),
+        "levelname": "INFO",
+        "module": generator.choice(DEFAULT_MODULES),
+        "process": generator.randint(1000, 1015),
+        "thread": generator.randint(140000000, 140000063),
+        "message": "",
+    }
+
+
+def _message(generator: random.Random, length: int) -> str:
+    """Build a message of random words, between half and 1.5 times the length."""
+    target = generator.randint(length // 2, length + length // 2)
+    words = []
+    current = 0
+    while current < target:
+        word = generator.choice(WORDS)
+        if generator.random() < 0.2:
+            word = f"{word}={generator.randint(0, 99999)}"
+        words.append(word)
+        current += len(word) + 1
+    return " ".join(words)[:target]
@@ -0,0 +1,183 @@
+import json
+import logging
+import multiprocessing
+import platform
+import resource
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import (
+    Any,
+    Dict,
+    List,
+    Mapping,
+    NotRequired,
+    Optional,
+    Sequence,
+    TypedDict,
+)
+
+from log_parser import LogParser
+from log_parser.engines import read_blocks
+
+logger = logging.getLogger("core")
+
+# `ru_maxrss` is in kilobytes on Linux but in bytes on macOS.
+RSS_UNIT = 1 if sys.platform == "darwin" else 1024
+
+
+class Measurement(TypedDict):
+    """The measurements of a run of a scan mode, as saved in the result files."""
+
+    mode: str
+    level: str
+    bytes: int
+    lines: int
+    matches: int
+    seconds: float
+    # None when the run was too fast to be timed.
+    lines_per_second: Optional[float]
+    mb_per_second: Optional[float]
+    # None when no line matched.
+    time_to_first_match: Optional[float]
+    peak_rss_bytes: int
+    # The time of every run, set on the fastest one by `run_benchmarks`.
+    runs: NotRequired[List[float]]
+
+
+def _peak_rss() -> int:
+    """Return the peak resident memory of this process and its children in bytes."""
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    return max(own, children) * RSS_UNIT
+
+
+def measure(
+    file_path: Path, log_level: str, mode: str, workers: int = 0
+) -> Measurement:
+    """
+    Parse a log file once and measure the throughput of the parser, meant to run
+    in a fresh process so the peak memory is the one of this mode only.
+
+    Args:
+        file_path (Path): The path of the log file.
+        log_level (str): The log level to filter by.
+        mode (str): The scan mode of the parser.
+        workers (int): The number of worker processes of the `parallel` mode,
+            0 for the number of CPUs.
+
+    Returns:
+        Measurement: The measurements of the run.
+    """
+    size = file_path.stat().st_size
+    with file_path.open(mode="rb") as file:
+        lines = sum(block.count(b"\n") for block in read_blocks(file=file))
+
+    parser = LogParser()
+    parser.file_path = file_path
+    parser.log_level = log_level
+    parser.mode = mode
+    parser.workers = workers or None
+
+    matches = 0
+    first_match: Optional[float] = None
+    started = time.perf_counter()
+    for _ in parser.parse():
+        if first_match is None:
+            first_match = time.perf_counter() - started
+        matches += 1
+    elapsed = time.perf_counter() - started
+
+    return {
+        "mode": mode,
+        "level": log_level,
+        "bytes": size,
+        "lines": lines,
+        "matches": matches,
+        "seconds": elapsed,
+        "lines_per_second": lines / elapsed if elapsed else None,
+        "mb_per_second": size / (1024 * 1024) / elapsed if elapsed else None,
+        "time_to_first_match": first_match,
+        "peak_rss_bytes": _peak_rss(),
+    }
+
+
+def run_benchmarks(
+    file_path: Path,
+    log_level: str = "ERROR",
+    modes: Sequence[str] = LogParser.valid_modes,
+    repeat: int = 3,
+    workers: int = 0,
+) -> List[Measurement]:
+    """
+    Benchmark every scan mode, running each measurement in its own process and
+    keeping the fastest of the repeated runs.
+
+    Args:
+        file_path (Path): The path of the log file.
+        log_level (str): The log level to filter by.
+        modes (Sequence[str]): The scan modes to benchmark.
+        repeat (int): The number of runs of every mode.
+        workers (int): The number of worker processes of the `parallel` mode,
+            0 for the number of CPUs.
+
+    Returns:
+        List[Measurement]: The measurements of the fastest run of every mode,
+            with the time of every run under `runs`.
+    """
+    results = []
+    for mode in modes:
+        runs: List[Measurement] = []
+        for _ in range(repeat):
+            # A spawned process does not inherit the memory of this one.
+            context = multiprocessing.get_context("spawn")
+            with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+                future = executor.submit(measure, file_path, log_level, mode, workers)
+                runs.append(future.result())
+        best = min(runs, key=lambda run: run["seconds"])
+        best["runs"] = [run["seconds"] for run in runs]
+        logger.info(f"Benchmarked the `{mode}` mode: {best['seconds']:.3f}s")
+        results.append(best)
+    return results
+
+
+def environment() -> Dict[str, Any]:
+    """
+    Describe the machine and the interpreter of a benchmark run.
+
+    Returns:
+        Dict[str, Any]: The environment of the run.
+    """
+    return {
+        "time": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "processor": platform.processor(),
+    }
+
+
+def save_results(
+    results: Sequence[Mapping[str, Any]], settings: Dict[str, Any], output_dir: Path
+) -> Path:
+    """
+    Save the results of a run as JSON, in a new file named after its time.
+
+    Args:
+        results (Sequence[Mapping[str, Any]]): The measurements of the run, like
+            the measurements of every mode.
+        settings (Dict[str, Any]): The settings of the generated log file and of
+            the run.
+        output_dir (Path): The directory of the result files.
+
+    Returns:
+        Path: The path of the result file.
+    """
+    output_dir.mkdir(parents=True, exist_ok=True)
+    run = {"environment": environment(), "settings": settings, "results": results}
+    output_path = output_dir / f"{datetime.now():%Y%m%d-%H%M%S}.json"
+    output_path.write_text(json.dumps(run, indent=2) + "\n", encoding="utf-8")
+    return output_path
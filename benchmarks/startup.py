@@ -0,0 +1,123 @@
+import argparse
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+from log_parser.utils.messages import ViewMessages
+from .runner import save_results
+
+# The target of the time from the start of the interpreter to the first prompt.
+STARTUP_TARGET = 0.1  # 100 ms
+DEFAULT_COMMAND = (sys.executable, "run.py")
+
+
+def measure_startup(command: Sequence[str], prompt: str) -> float:
+    """
+    Start a command and measure the time until it prints its prompt, then stop it.
+
+    Args:
+        command (Sequence[str]): The command and its arguments.
+        prompt (str): The beginning of the prompt to wait for.
+
+    Returns:
+        float: The number of seconds until the prompt was printed.
+
+    Raises:
+        RuntimeError: If the command exited without printing the prompt.
+    """
+    expected = prompt.encode("utf-8")
+    started = time.perf_counter()
+    process = subprocess.Popen(
+        command,
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+    )
+    output = b""
+    try:
+        while expected not in output:
+            data = process.stdout.read1(4096)  # type: ignore[union-attr]
+            if not data:
+                raise RuntimeError(
+                    f"`{' '.join(command)}` exited before its prompt: {output!r}"
+                )
+            output += data
+        return time.perf_counter() - started
+    finally:
+        process.kill()
+        process.wait()
+
+
+def run_startup(
+    command: Sequence[str] = DEFAULT_COMMAND,
+    prompt: str = ViewMessages.GET_PATH,
+    repeat: int = 20,
+) -> Dict[str, Any]:
+    """
+    Measure the startup time of a command many times. The first run is reported
+    on its own, since it may read the files from the disk rather than the cache.
+
+    Args:
+        command (Sequence[str]): The command and its arguments.
+        prompt (str): The beginning of the prompt to wait for.
+        repeat (int): The number of runs.
+
+    Returns:
+        Dict[str, Any]: The measurements, in seconds.
+    """
+    runs = [measure_startup(command=command, prompt=prompt) for _ in range(repeat)]
+    median = statistics.median(runs)
+    return {
+        "command": list(command),
+        "runs": runs,
+        "first": runs[0],
+        "min": min(runs),
+        "median": median,
+        "max": max(runs),
+        "target": STARTUP_TARGET,
+        "met": median < STARTUP_TARGET,
+    }
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    """
+    Measure the time from the start of `run.py` to its first prompt and save the
+    results as JSON.
+
+    Args:
+        argv (Optional[Sequence[str]]): The arguments, defaults to `sys.argv`.
+    """
+    arg_parser = argparse.ArgumentParser(
+        prog="python -m benchmarks.startup",
+        description="Measure the time from the start of run.py to its first prompt.",
+    )
+    arg_parser.add_argument(
+        "--repeat", type=int, default=20, help="the number of starts to measure"
+    )
+    arg_parser.add_argument(
+        "-o",
+        "--output",
+        type=Path,
+        default=Path("benchmarks/results"),
+        help="the directory of the JSON result files",
+    )
+    args = arg_parser.parse_args(argv)
+
+    result = run_startup(repeat=args.repeat)
+    times: List[str] = [
+        f"{name} {result[name] * 1000:.1f} ms" for name in ("first", "min", "max")
+    ]
+    status = "met" if result["met"] else "missed"
+    print(
+        f"Startup to the first prompt: median {result['median'] * 1000:.1f} ms "
+        f"({', '.join(times)}), target {STARTUP_TARGET * 1000:.0f} ms {status}"
+    )
+    settings = {"repeat": args.repeat, "benchmark": "startup"}
+    print(f"Saved the results to `{save_results([result], settings, args.output)}`")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+import json
+import sys
+from pathlib import Path
+from typing import Any
+
+from log_parser import LogFormat
+from ..generator import generate_log
+from ..runner import measure, save_results
+from ..startup import run_startup
+
+
+class TestBenchmarks:
+    """Test class for the synthetic log generator and the benchmark runner."""
+
+    def test_generate_log(self, tmp_path: Path) -> None:
+        """Tests that the generator is deterministic and follows the format."""
+        first_path, second_path = tmp_path / "first.log", tmp_path / "second.log"
+        level_mix = {"ERROR": 1, "INFO": 3}
+        lines = generate_log(path=first_path, size=10_000, level_mix=level_mix)
+        generate_log(path=second_path, size=10_000, level_mix=level_mix)
+
+        content = first_path.read_text()
+        assert content == second_path.read_text(), "expect the same content"
+        assert len(content) >= 10_000, f"expect 10000 bytes but got {len(content)}"
+
+        actual: Any = len(content.splitlines())
+        assert actual == lines, f"expect {lines} but got {actual}"
+
+        records = [LogFormat().parse(line) for line in content.splitlines()]
+        actual = {record.levelname for record in records if record is not None}
+        expected = {"ERROR", "INFO"}
+        assert actual == expected, f"expect {expected} but got {actual}"
+
+    def test_measure_and_save(self, tmp_path: Path) -> None:
+        """Tests that a run is measured and saved as JSON."""
+        file_path = tmp_path / "test.log"
+        generate_log(path=file_path, size=10_000, seed=1)
+        result = measure(file_path=file_path, log_level="INFO", mode="mmap")
+
+        actual = result["matches"]
+        expected = file_path.read_text().count(" - INFO - ")
+        assert actual == expected, f"expect {expected} but got {actual}"
+        assert result["peak_rss_bytes"] > 0
+
+        output_path = save_results([result], {"seed": 1}, tmp_path / "results")
+        actual = json.loads(output_path.read_text())["results"][0]["mode"]
+        assert actual == "mmap", f"expect mmap but got {actual}"
+
+    def test_startup(self) -> None:
+        """Tests that the time until the prompt of a command is measured."""
+        command = [sys.executable, "-c", "print('ready'); input()"]
+        result = run_startup(command=command, prompt="ready", repeat=2)
+
+        actual = len(result["runs"])
+        assert actual == 2, f"expect 2 runs but got {actual}"
+        assert 0 < result["min"] <= result["median"] <= result["max"]
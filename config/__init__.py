@@ -1 +1 @@
-from .log import setup_logging
+from .log import LOGGING_CONFIG_PATH, read_log_format, setup_logging
@@ -1,15 +1,196 @@
 from pathlib import Path
+import atexit
 import logging.handlers
 import logging.config
-from typing import Dict
+import queue
+from typing import Any, Dict, List, Optional, Protocol, Tuple
 
-from .utils.funcs import read_toml, validate_and_create_dirs
+from .utils.funcs import load_config, validate_and_create_dirs
 
+QUEUE_POLICIES = ("drop", "block")
+LOGGING_CONFIG_PATH = Path("logging.toml")
 
-def setup_logging(logging_config_path: Path) -> None:
-    """Setup the logging configurations."""
-    logging_config = read_toml(path=logging_config_path)
+
+class RecordQueue(Protocol):
+    """The methods of the bounded queues of the records, like `queue.Queue`."""
+
+    def put(
+        self, item: Any, block: bool = True, timeout: Optional[float] = None
+    ) -> None: ...
+
+    def put_nowait(self, item: Any) -> None: ...
+
+    def get(self, block: bool = True, timeout: Optional[float] = None) -> Any: ...
+
+    def qsize(self) -> int: ...
+
+
+class BoundedQueueHandler(logging.handlers.QueueHandler):
+    """
+    A QueueHandler for a bounded queue, which either drops the records or blocks
+    the logging thread when the queue is full.
+    """
+
+    queue: RecordQueue
+
+    def __init__(self, log_queue: RecordQueue, policy: str = "block") -> None:
+        """
+        Initialize the handler.
+
+        Args:
+            log_queue (RecordQueue): The bounded queue of the records, a `queue.Queue`.
+            policy (str): `drop` to drop the records when the queue is full, or
+                `block` to wait for the listener to make room for them.
+
+        Raises:
+            ValueError: If the policy is not valid.
+        """
+        if policy not in QUEUE_POLICIES:
+            raise ValueError(
+                f"Valid queue policies are: {QUEUE_POLICIES}, but got `{policy}`"
+            )
+        super().__init__(log_queue)
+        self.policy = policy
+        # The number of records dropped because the queue was full.
+        self.dropped = 0
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        """Put a record into the queue, following the policy when it is full."""
+        if self.policy == "block":
+            self.queue.put(record)
+            return
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class BoundedQueueListener(logging.handlers.QueueListener):
+    """
+    A QueueListener that can always be stopped, even when its queue is full, and
+    reports the records its queue handler dropped.
+    """
+
+    queue: RecordQueue
+    # The record stopping the thread of QueueListener, missing from its type stubs.
+    _sentinel: None = None
+    # The handler putting the records into the queue, whose drops are reported.
+    queue_handler: Optional[BoundedQueueHandler] = None
+
+    def stop(self) -> None:
+        """
+        Stop the listener, writing out the queued records, if it is running. The
+        number of dropped records, if any, is then written by the handlers.
+        """
+        if self._thread is None:
+            return
+        super().stop()
+
+        dropped = 0 if self.queue_handler is None else self.queue_handler.dropped
+        if dropped:
+            record = logging.makeLogRecord(
+                {
+                    "name": "core",
+                    "levelno": logging.WARNING,
+                    "levelname": "WARNING",
+                    "msg": f"{dropped} log records were dropped, the queue was full.",
+                }
+            )
+            self.handle(record)
+
+    def enqueue_sentinel(self) -> None:
+        """Wait for room in the queue for the sentinel, instead of failing."""
+        self.queue.put(self._sentinel)
+
+
+def setup_queue(
+    logging_config: dict, maxsize: int = 10000, policy: str = "block"
+) -> List[BoundedQueueListener]:
+    """
+    Move the handlers of the configured loggers behind bounded queues, so the
+    file I/O and the rotations of the records happen on the background thread of
+    a listener instead of the logging thread. The records are still formatted on
+    the logging thread, by `QueueHandler.prepare`, before they are queued.
+
+    The loggers sharing the same handlers share a queue and a listener. The
+    listeners are stopped when the interpreter exits, writing out the records
+    left in their queues.
+
+    Args:
+        logging_config (dict): The logging configuration applied by `dictConfig`.
+        maxsize (int): The maximum number of records in every queue.
+        policy (str): `block` to wait for room when a queue is full, or `drop` to
+            drop the records, which loses them under a heavy load.
+
+    Returns:
+        List[BoundedQueueListener]: The started listeners.
+    """
+    loggers = [logging.getLogger(name) for name in logging_config.get("loggers", {})]
+    if "root" in logging_config:
+        loggers.append(logging.getLogger())
+
+    queue_handlers: Dict[Tuple[logging.Handler, ...], BoundedQueueHandler] = {}
+    listeners = []
+    for logger in loggers:
+        handlers = tuple(logger.handlers)
+        if not handlers:
+            continue
+        if handlers not in queue_handlers:
+            log_queue: queue.Queue = queue.Queue(maxsize=maxsize)
+            queue_handlers[handlers] = BoundedQueueHandler(
+                log_queue=log_queue, policy=policy
+            )
+            listener = BoundedQueueListener(
+                log_queue, *handlers, respect_handler_level=True
+            )
+            listener.queue_handler = queue_handlers[handlers]
+            listener.start()
+            atexit.register(listener.stop)
+            listeners.append(listener)
+        logger.handlers = [queue_handlers[handlers]]
+    return listeners
+
+
+def read_log_format(
+    logging_config_path: Path = LOGGING_CONFIG_PATH, formatter: str = "coreFormatter"
+) -> str:
+    """
+    Read the format string of a formatter of the logging configuration, so the
+    log files it writes can be parsed with the same format.
+
+    Args:
+        logging_config_path (Path): The path of the logging configuration.
+        formatter (str): The name of the formatter.
+
+    Returns:
+        str: The format string of the formatter.
+    """
+    logging_config = load_config(path=logging_config_path)
+    return logging_config["formatters"][formatter]["format"]
+
+
+def setup_logging(logging_config_path: Path) -> List[BoundedQueueListener]:
+    """
+    Setup the logging configurations.
+
+    The configuration is read through its JSON cache, see `load_config`. When the
+    `[queue]` table of the configuration is enabled, the handlers are moved behind
+    bounded queues, see `setup_queue`.
+
+    Returns:
+        List[BoundedQueueListener]: The listeners of the queues, if enabled.
+    """
+    logging_config = load_config(path=logging_config_path)
+    queue_config: dict = logging_config.pop("queue", {})
     # Check or Create the dirs of log files specified in the config.
-    handlers: Dict[str, dict] = logging_config.get("handlers", None)
+    handlers: Dict[str, dict] = logging_config.get("handlers", {})
     validate_and_create_dirs(handlers=handlers)
     logging.config.dictConfig(logging_config)
+
+    if not queue_config.get("enabled", False):
+        return []
+    return setup_queue(
+        logging_config=logging_config,
+        maxsize=queue_config.get("maxsize", 10000),
+        policy=queue_config.get("policy", "block"),
+    )
@@ -1,10 +1,11 @@
+import json
 import tempfile
 from pathlib import Path
 from typing import Generator
 
 import pytest
 
-from ..utils.funcs import read_toml, validate_and_create_dirs
+from ..utils.funcs import load_config, read_toml, validate_and_create_dirs
 
 
 @pytest.fixture
@@ -113,6 +114,31 @@ def test_read_toml_file_not_found() -> None:
         read_toml(Path("nonexistence_file.toml"))
 
 
+def test_load_config_cache(tmp_path: Path) -> None:
+    """
+    Test case for checking if the load_config function reads the configuration from
+    its cache, and reads the TOML file again once it changes.
+    """
+    toml_path = tmp_path / "config.toml"
+    toml_path.write_text('key = "value"')
+    actual = load_config(path=toml_path)
+    expected = {"key": "value"}
+    assert actual == expected, f"expected `{expected}` but got `{actual}`"
+
+    cache_path = tmp_path / ".config.toml.json"
+    cache = json.loads(cache_path.read_text())
+    cache["config"] = {"key": "cached"}
+    cache_path.write_text(json.dumps(cache))
+    actual = load_config(path=toml_path)
+    expected = {"key": "cached"}
+    assert actual == expected, f"expected `{expected}` but got `{actual}`"
+
+    toml_path.write_text('key = "changed"')
+    actual = load_config(path=toml_path)
+    expected = {"key": "changed"}
+    assert actual == expected, f"expected `{expected}` but got `{actual}`"
+
+
 def test_validate_and_create_dirs_with_path_manager(sample_handlers: dict) -> None:
     """Test the validate_and_create_dirs function with PathManager."""
     paths = validate_and_create_dirs(sample_handlers)
@@ -1,14 +1,21 @@
 import logging
+import logging.handlers
+import queue
 from pathlib import Path
-from typing import Any
+from typing import Any, Generator
 
 import pytest
 
-from ..log import setup_logging
+from ..log import (
+    BoundedQueueHandler,
+    BoundedQueueListener,
+    read_log_format,
+    setup_logging,
+)
 
 
 @pytest.fixture
-def sample_config_path(tmp_path: Path) -> Path:
+def sample_config_path(tmp_path: Path) -> Generator[Path, None, None]:
     """
     Fixture creates a temporary sample TOML configuration file for testing purposes.
 
@@ -84,3 +91,85 @@ def test_setup_logging(sample_config_path: Path, caplog: Any) -> None:
     logger.info("Test log message.")
 
     assert "Test log message." == caplog.records[0].msg
+
+
+def test_setup_logging_queue(tmp_path: Path) -> None:
+    """
+    Tests that the handlers are moved behind a queue when it is enabled, and that
+    the queued records are written when the listener stops.
+    """
+    log_path = tmp_path / "queued.log"
+    config_path = tmp_path / "queued.toml"
+    config_path.write_text(
+        f"""
+    version = 1
+
+    [queue]
+    enabled = true
+    maxsize = 100
+    policy = "block"
+
+    [handlers.queuedHandler]
+    class = 'logging.FileHandler'
+    level = 'DEBUG'
+    filename = '{log_path.as_posix()}'
+
+    [loggers.queuedLogger]
+    level = 'DEBUG'
+    handlers = ['queuedHandler']
+    propagate = false
+    """
+    )
+    listeners = setup_logging(config_path)
+
+    logger = logging.getLogger("queuedLogger")
+    assert isinstance(logger.handlers[0], BoundedQueueHandler)
+    logger.info("Queued log message.")
+    for listener in listeners:
+        listener.stop()
+
+    actual = log_path.read_text()
+    expected = "Queued log message.\n"
+    assert actual == expected, f"expect {expected} but got {actual}"
+
+
+def test_queue_drop_policy() -> None:
+    """Tests that the records are dropped and counted when the queue is full."""
+    handler = BoundedQueueHandler(log_queue=queue.Queue(maxsize=1), policy="drop")
+    record = logging.makeLogRecord({"msg": "Test log message."})
+    handler.handle(record)
+    handler.handle(record)
+
+    actual = (handler.queue.qsize(), handler.dropped)
+    expected = (1, 1)
+    assert actual == expected, f"expect {expected} but got {actual}"
+
+    with pytest.raises(ValueError, match="Valid queue policies are:"):
+        BoundedQueueHandler(log_queue=queue.Queue(), policy="wait")
+
+
+def test_queue_report_dropped() -> None:
+    """Tests that the number of dropped records is written when the queue stops."""
+    target = logging.handlers.BufferingHandler(capacity=10)
+    log_queue: queue.Queue = queue.Queue(maxsize=1)
+    handler = BoundedQueueHandler(log_queue=log_queue, policy="drop")
+    listener = BoundedQueueListener(log_queue, target)
+    listener.queue_handler = handler
+    handler.dropped = 2
+    listener.start()
+    listener.stop()
+
+    actual = [record.getMessage() for record in target.buffer]
+    expected = ["2 log records were dropped, the queue was full."]
+    assert actual == expected, f"expect {expected} but got {actual}"
+
+
+def test_read_log_format(tmp_path: Path) -> None:
+    """Test that the format string of a formatter is read from the configuration."""
+    config_path = tmp_path / "logging.toml"
+    config_path.write_text(
+        "[formatters.testFormatter]\nformat = '%(levelname)s - %(message)s'\n"
+    )
+    actual = read_log_format(config_path, formatter="testFormatter")
+    expected = "%(levelname)s - %(message)s"
+    assert actual == expected, f"expected `{expected}` but got `{actual}`"
@@ -1,5 +1,6 @@
+import json
+import os
 import sys
-import tomllib
 from pathlib import Path
 
 
@@ -13,10 +14,13 @@ def read_toml(path: Path) -> dict:
     Returns:
         dict: The parsed content of the TOML file.
     """
+    # Imported here, since the configuration is usually read from its cache.
+    import tomllib
+
     try:
         with path.open(mode="rb") as file:
-            file = tomllib.load(file)
-        return file
+            content = tomllib.load(file)
+        return content
     except FileNotFoundError:
         print(f"\n\033[91mThis path is unreachable: `{path}`!")
         sys.exit()
@@ -25,6 +29,45 @@ def read_toml(path: Path) -> dict:
         sys.exit()
 
 
+def load_config(path: Path) -> dict:
+    """
+    Read a TOML configuration through a JSON cache of its content, saved next to
+    it as `.<name>.json` and used as long as the file keeps its size and its
+    modification time, so the TOML file is not parsed on every start.
+
+    Args:
+        path (Path): The path to the TOML file.
+
+    Returns:
+        dict: The parsed content of the TOML file.
+    """
+    cache_path = path.with_name(f".{path.name}.json")
+    try:
+        stat = path.stat()
+    except OSError:
+        # Let read_toml report the error.
+        return read_toml(path=path)
+    key = [stat.st_mtime_ns, stat.st_size]
+
+    try:
+        with cache_path.open(mode="rb") as cache_file:
+            cached = json.load(cache_file)
+        if cached["key"] == key:
+            return cached["config"]
+    except (OSError, ValueError, KeyError, TypeError):
+        pass
+
+    config = read_toml(path=path)
+    # Written to a temporary file first, so concurrent starts never read half of it.
+    temp_path = cache_path.with_name(f"{cache_path.name}.{os.getpid()}.tmp")
+    try:
+        temp_path.write_text(json.dumps({"key": key, "config": config}))
+        os.replace(temp_path, cache_path)
+    except (OSError, TypeError, ValueError):
+        temp_path.unlink(missing_ok=True)
+    return config
+
+
 def validate_and_create_dirs(handlers: dict[str, dict]) -> list[Path]:
     """
     Validate the configuration and create directories specified in handlers.
@@ -1 +1,27 @@
-from .app import main
+from importlib import import_module
+from typing import TYPE_CHECKING, Any, List
+
+# The entry points and their modules, imported on their first use, so starting
+# one of them does not import the others, like the HTTP server for the prompt.
+_EXPORTS = {"main": ".app", "batch": ".batch", "serve": ".server"}
+
+__all__ = list(_EXPORTS)
+
+if TYPE_CHECKING:  # pragma: no cover
+    from .app import main
+    from .batch import batch
+    from .server import serve
+
+
+def __getattr__(name: str) -> Any:
+    """Import the module of an entry point on its first use."""
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(_EXPORTS[name], __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> List[str]:
+    """List the entry points along with the imported names."""
+    return sorted(set(globals()) | set(__all__))
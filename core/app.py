@@ -1,14 +1,20 @@
 import sys
 import logging
+from typing import Iterator, Optional
 
+from config import read_log_format
 from log_parser import LogParserView
-from log_parser import LogParser
+from log_parser import LogFormat, LogParser
+from log_parser.utils.messages import ErrorMessages
 
 logger = logging.getLogger("core")
 
 parser = LogParser()
 view = LogParserView()
 
+# The number of message templates printed by the `templates` command.
+TEMPLATES_SHOWN = 20
+
 
 def main() -> None:
     """
@@ -16,32 +22,124 @@ def main() -> None:
 
     1. Initializes the logging configuration.
     2. Creates instances of LogParser and LogParserView classes.
-    3. Prompts the user for log file path and log level for filtering.
+    3. Prompts the user for log file path and log level for filtering. Many paths
+        separated by commas are merged into one stream in timestamp order.
     4. Parses the log file lazily and prints the first line.
-    5. Enters a loop, allowing the user to request the next log line or quit the
-        application.
+    5. Enters a loop, allowing the user to go to the next or the previous log
+        line, to jump to the first, the last or the Nth one, to collapse the
+        lines into their message templates, or to quit the application. Jumps
+        seek to the checkpoints of the parser, so they do not read the log file
+        from its beginning again.
     """
     view.clear_screen()
+    # The lines are parsed with the format the application writes its logs in.
+    log_format = LogFormat(format_string=read_log_format())
+    parser.log_format = log_format
 
     file_path = view.get_path()
     log_level = view.get_log_level()
 
+    file_paths = [path.strip() for path in file_path.split(",") if path.strip()]
+    if len(file_paths) > 1:
+        # Imported here, since most sessions browse a single log file.
+        from log_parser import MergedLogParser
+
+        merged_parser = MergedLogParser()
+        merged_parser.log_format = log_format
+        merged_parser.file_paths = file_paths
+        merged_parser.log_level = log_level
+        browse_forward(lazy_file=merged_parser.parse(), log_parser=merged_parser)
+        return
+
     parser.file_path = file_path
     parser.log_level = log_level
-    lazy_file = parser.parse()
+    try:
+        first_line = parser.first()
+    except ValueError:
+        # Compressed files and rotation families can only be read forward.
+        browse_forward(lazy_file=parser.parse(), log_parser=parser)
+        return
+    except (FileNotFoundError, PermissionError):
+        # Let parse() report the error to the user.
+        list(parser.parse())
+        return
+    if first_line is None:
+        print("You have reached the end of the log file!")
+        return
+    print(first_line)
+
+    while True:
+        command = view.action()
+
+        if command == "quit":
+            break
+        if command == "templates":
+            show_templates(log_parser=parser)
+            continue
+        if command == "next":
+            line = parser.next_match()
+            if line is None:
+                print("You have reached the end of the log file!")
+                sys.exit()
+        elif command == "prev":
+            line = parser.previous_match()
+        elif command == "first":
+            line = parser.first()
+        elif command == "last":
+            line = parser.last()
+        else:
+            # Lines are numbered from 1 for the user.
+            line = parser.goto(int(command.split()[1]) - 1)
 
+        if line is None:
+            print("There is no such line in the log file!")
+        else:
+            print(line)
+
+
+def show_templates(log_parser: LogParser) -> None:
+    """
+    Print the most frequent message templates of the matching lines, each as its
+    first line with the count and the first and last timestamps of its lines.
+
+    Args:
+        log_parser (LogParser): The parser of the log file.
+    """
+    miner = log_parser.templates()
+    for template in miner.templates(top=TEMPLATES_SHOWN):
+        print(template)
+    if len(miner) > TEMPLATES_SHOWN:
+        print(f"... and {len(miner) - TEMPLATES_SHOWN} less frequent templates.")
+    if miner.evicted:
+        print(f"{miner.evicted} lines of rare templates were not kept.")
+
+
+def browse_forward(lazy_file: Iterator, log_parser: Optional[LogParser] = None) -> None:
+    """
+    Print the lines of a stream that can only be read forward, like the merged
+    stream of many log files, one at a time on the `next` command.
+
+    Args:
+        lazy_file (Iterator): The lines to print.
+        log_parser (Optional[LogParser]): The parser of the lines, used by the
+            `templates` command.
+    """
     first_line = next(lazy_file)
     print(first_line)
 
     while True:
         command = view.action()
 
-        if command.lower() == "next":
+        if command == "next":
             try:
                 line = next(lazy_file)
                 print(line)
             except StopIteration:
                 print("You have reached the end of the log file!")
                 sys.exit()
-        elif command.lower() == "quit":
+        elif command == "quit":
             break
+        elif command == "templates" and log_parser is not None:
+            show_templates(log_parser=log_parser)
+        else:
+            print(ErrorMessages.NO_NAVIGATION)
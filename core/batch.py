@@ -0,0 +1,446 @@
+import argparse
+import json
+import logging
+import os
+import sqlite3
+import sys
+from datetime import datetime, timedelta
+from itertools import islice
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, TextIO
+
+from config import read_log_format
+from log_parser import (
+    JsonFormat,
+    LineFormat,
+    LogDatabase,
+    LogFormat,
+    LogParser,
+    LogStats,
+    MergedLogParser,
+    parse_query,
+)
+from log_parser.rotation import rotation_family
+from log_parser.utils.messages import ErrorMessages
+
+logger = logging.getLogger("core")
+
+OUTPUT_BUFFER_SIZE = 1024 * 1024  # 1 MB
+# The number of lines gathered before they are written at once.
+WRITE_BATCH_SIZE = 4096
+
+# The exit codes of the batch mode, following the convention of `grep`.
+EXIT_MATCH = 0
+EXIT_NO_MATCH = 1
+EXIT_ERROR = 2
+
+
+def _json_keys(value: str) -> Dict[str, str]:
+    """Parse the keys of the JSON fields like `levelname=severity,message=msg`."""
+    try:
+        return {
+            name.strip(): key.strip()
+            for name, key in (item.split("=") for item in value.split(","))
+        }
+    except ValueError:
+        raise argparse.ArgumentTypeError(
+            f"expected FIELD=KEY pairs separated by commas, got `{value}`"
+        ) from None
+
+
+def _non_negative(value: str) -> int:
+    """Parse a count like `--max 10`, which can not be negative."""
+    try:
+        count = int(value)
+    except ValueError:
+        msg = f"expected an integer, got `{value}`"
+        raise argparse.ArgumentTypeError(msg) from None
+    if count < 0:
+        raise argparse.ArgumentTypeError(f"expected zero or more, got `{value}`")
+    return count
+
+
+def build_arg_parser() -> argparse.ArgumentParser:
+    """
+    Build the command-line argument parser of the batch mode.
+
+    Returns:
+        argparse.ArgumentParser: The argument parser.
+    """
+    arg_parser = argparse.ArgumentParser(
+        prog="run.py",
+        description="Filter the lines of a log file by log level, non-interactively.",
+    )
+    arg_parser.add_argument(
+        "paths",
+        nargs="+",
+        metavar="path",
+        help="the path of the log file, many paths are merged in timestamp order",
+    )
+    arg_parser.add_argument(
+        "-l",
+        "--level",
+        help=f"the log level to filter by, one of {', '.join(LogParser.valid_levels)}",
+    )
+    arg_parser.add_argument(
+        "-q",
+        "--query",
+        help="filter by a query instead, like `level>=WARNING and module=db`",
+    )
+    arg_parser.add_argument(
+        "-m", "--mode", default="line", help="the scan mode: line, mmap or parallel"
+    )
+    arg_parser.add_argument(
+        "-o", "--output", help="write the matching lines to this file, not stdout"
+    )
+    arg_parser.add_argument(
+        "-c",
+        "--count",
+        action="store_true",
+        help="print the number of matching lines instead of the lines",
+    )
+    arg_parser.add_argument(
+        "-n",
+        "--max",
+        type=_non_negative,
+        help="stop after this number of matching lines",
+    )
+    arg_parser.add_argument(
+        "--rotation",
+        action="store_true",
+        help="treat the path as a rotated log set (base path or glob pattern)",
+    )
+    arg_parser.add_argument(
+        "--index", action="store_true", help="use the sidecar offset index"
+    )
+    arg_parser.add_argument(
+        "-k",
+        "--keyword",
+        action="append",
+        default=[],
+        help="only the lines containing this word, whatever its case, repeatable",
+    )
+    arg_parser.add_argument(
+        "--keyword-index",
+        action="store_true",
+        help="find the --keyword lines with the sidecar inverted index",
+    )
+    arg_parser.add_argument(
+        "--json",
+        action="store_true",
+        help="read JSON lines, matching the log level by its field",
+    )
+    arg_parser.add_argument(
+        "--json-keys",
+        type=_json_keys,
+        help="the JSON keys of the fields, like `levelname=severity,message=msg`",
+    )
+    arg_parser.add_argument(
+        "--start",
+        type=datetime.fromisoformat,
+        help="only the lines at or after this time, like `2024-01-01 14:00:00`",
+    )
+    arg_parser.add_argument(
+        "--end",
+        type=datetime.fromisoformat,
+        help="only the lines at or before this time, like `2024-01-01 14:05:00`",
+    )
+    arg_parser.add_argument(
+        "--stats",
+        action="store_true",
+        help="print the line counts by time bucket, level, module and process as CSV",
+    )
+    arg_parser.add_argument(
+        "--by",
+        default=",".join(LogStats.dimensions),
+        help="the comma-separated dimensions to group the --stats table by",
+    )
+    arg_parser.add_argument(
+        "--bucket",
+        type=int,
+        default=60,
+        help="the size of the time buckets of --stats in seconds",
+    )
+    arg_parser.add_argument(
+        "--top",
+        type=int,
+        help="print this number of the most frequent messages, the distinct modules "
+        "and processes and sample lines as JSON, approximated in a fixed memory",
+    )
+    arg_parser.add_argument(
+        "--templates",
+        action="store_true",
+        help="print the message templates of the matching lines with their counts "
+        "and first and last timestamps as CSV",
+    )
+    arg_parser.add_argument(
+        "--ingest",
+        metavar="DATABASE",
+        help="ingest the lines of the log files into this SQLite database, only the "
+        "lines appended since the last ingest",
+    )
+    arg_parser.add_argument(
+        "--db",
+        metavar="DATABASE",
+        help="query the lines of the log files from this SQLite database instead",
+    )
+    arg_parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="print the bytes, lines and time spent reading, decoding and matching",
+    )
+    return arg_parser
+
+
+def _check_path(parser: LogParser) -> Optional[str]:
+    """
+    Check that the log files of the parser can be read, since the parser itself
+    reports these errors on stdout, which is reserved for the output here.
+
+    Returns:
+        Optional[str]: The error message, or None if the files can be read.
+    """
+    if isinstance(parser, MergedLogParser):
+        file_paths = parser.file_paths
+    else:
+        file_paths = [parser.file_path]
+
+    paths = []
+    for file_path in file_paths:
+        try:
+            if parser.rotation:
+                paths.extend(rotation_family(path=file_path))
+            else:
+                paths.append(file_path)
+        except FileNotFoundError:
+            return ErrorMessages.WRONG_PATH
+
+    for path in paths:
+        if not path.is_file():
+            return ErrorMessages.WRONG_PATH
+        if not os.access(path, os.R_OK):
+            return ErrorMessages.NO_PERMISSION
+    return None
+
+
+def _open_output(output: Optional[str]) -> TextIO:
+    """Open the output file with a large write buffer, or return stdout."""
+    if output is None:
+        return sys.stdout
+    return open(output, mode="w", buffering=OUTPUT_BUFFER_SIZE, encoding="utf-8")
+
+
+def _close_stdout() -> None:
+    """
+    Point stdout to devnull once the reader of its pipe is gone, like `head`
+    exiting early, so the flush of stdout at exit does not fail again.
+    """
+    devnull = os.open(os.devnull, os.O_WRONLY)
+    os.dup2(devnull, sys.stdout.fileno())
+    os.close(devnull)
+
+
+def _write_lines(lines: Iterable[str], output: TextIO) -> int:
+    """
+    Write lines to the output in batches, instead of one write call per line.
+
+    Returns:
+        int: The number of written lines.
+    """
+    written = 0
+    pending: List[str] = []
+    for line in lines:
+        pending.append(line if line.endswith("\n") else f"{line}\n")
+        if len(pending) >= WRITE_BATCH_SIZE:
+            output.writelines(pending)
+            written += len(pending)
+            pending.clear()
+
+    output.writelines(pending)
+    return written + len(pending)
+
+
+def _source_paths(args: argparse.Namespace) -> List[Path]:
+    """Return the paths of the log files, with the members of rotated log sets."""
+    paths: List[Path] = []
+    for path in args.paths:
+        if args.rotation:
+            paths.extend(rotation_family(path=path))
+        else:
+            paths.append(Path(path))
+    return paths
+
+
+def _ingest(args: argparse.Namespace, log_format: LineFormat) -> int:
+    """
+    Ingest the lines of the log files into the database of `--ingest`, printing
+    the number of new lines of every file.
+
+    Returns:
+        int: 0 if a line was ingested, 1 if none was, and 2 on errors.
+    """
+    ingested = 0
+    try:
+        with LogDatabase(db_path=args.ingest, log_format=log_format) as database:
+            for path in _source_paths(args=args):
+                lines = database.ingest(file_path=path)
+                print(f"{path}: {lines} lines ingested")
+                ingested += lines
+    except FileNotFoundError:
+        print(ErrorMessages.WRONG_PATH, file=sys.stderr)
+        return EXIT_ERROR
+    except PermissionError:
+        print(ErrorMessages.NO_PERMISSION, file=sys.stderr)
+        return EXIT_ERROR
+    except (OSError, sqlite3.Error) as error:
+        print(error, file=sys.stderr)
+        logger.info(f"Batch mode could not ingest `{args.paths}`: {error}")
+        return EXIT_ERROR
+    return EXIT_MATCH if ingested else EXIT_NO_MATCH
+
+
+def _query_database(args: argparse.Namespace, log_format: LineFormat) -> int:
+    """
+    Write the lines of the log files matching the level or the query, or their
+    count, from the database of `--db` instead of the log files. The log format
+    must be the one the lines were ingested with, like for the JSON lines.
+
+    Returns:
+        int: 0 if a line matched, 1 if none did, and 2 on errors.
+    """
+    try:
+        expression = parse_query(args.query or f"level={args.level}")
+        with LogDatabase(db_path=args.db, log_format=log_format) as database:
+            settings = dict(
+                expression=expression,
+                sources=_source_paths(args=args),
+                start_time=args.start,
+                end_time=args.end,
+            )
+            output = _open_output(output=args.output)
+            try:
+                if args.count:
+                    matches = database.count(**settings)
+                    output.write(f"{matches}\n")
+                else:
+                    lines = database.select(limit=args.max, **settings)
+                    matches = _write_lines(lines=lines, output=output)
+            finally:
+                if output is sys.stdout:
+                    output.flush()
+                else:
+                    output.close()
+    except BrokenPipeError:
+        # The reader stopped early, like `grep` the output is simply cut.
+        _close_stdout()
+        logger.debug(f"Batch mode output of `{args.db}` was closed early")
+        return EXIT_MATCH
+    except (OSError, ValueError, sqlite3.Error) as error:
+        print(error, file=sys.stderr)
+        logger.info(f"Batch mode could not query `{args.db}`: {error}")
+        return EXIT_ERROR
+    return EXIT_MATCH if matches else EXIT_NO_MATCH
+
+
+def batch(argv: Optional[Sequence[str]] = None) -> int:
+    """
+    Non-interactive entry point for the Log Parser application.
+
+    1. Parses the command-line arguments instead of prompting the user.
+    2. Parses the log file lazily with the requested scan mode.
+    3. Writes the matching lines, or their count, to stdout or a file using large
+        buffered writes.
+
+    Args:
+        argv (Optional[Sequence[str]]): The command-line arguments, defaults to
+            `sys.argv[1:]`.
+
+    Returns:
+        int: 0 if a line matched, 1 if none did, and 2 on errors.
+    """
+    arg_parser = build_arg_parser()
+    args = arg_parser.parse_args(argv)
+    log_format: LineFormat = LogFormat(format_string=read_log_format())
+    if args.json or args.json_keys:
+        log_format = JsonFormat(keys=args.json_keys)
+    if args.ingest is not None:
+        return _ingest(args=args, log_format=log_format)
+
+    if args.level is None and args.query is None and not args.stats:
+        arg_parser.error("the following arguments are required: -l/--level")
+    if args.db is not None:
+        if args.stats or args.top is not None or args.templates:
+            arg_parser.error("--db only writes the matching lines or their --count")
+        return _query_database(args=args, log_format=log_format)
+
+    parser = LogParser() if len(args.paths) == 1 else MergedLogParser()
+    try:
+        if isinstance(parser, MergedLogParser):
+            parser.file_paths = args.paths
+        else:
+            parser.file_path = args.paths[0]
+        if args.level is not None:
+            parser.log_level = args.level
+        if args.query is not None:
+            parser.query = args.query
+        parser.mode = args.mode
+    except ValueError as error:
+        print(error, file=sys.stderr)
+        return EXIT_ERROR
+    parser.rotation = args.rotation
+    parser.use_index = args.index
+    parser.keywords = tuple(args.keyword)
+    parser.use_keyword_index = args.keyword_index
+    parser.start_time = args.start
+    parser.end_time = args.end
+    parser.profile = args.profile
+    parser.log_format = log_format
+
+    path_error = _check_path(parser=parser)
+    if path_error is not None:
+        print(path_error, file=sys.stderr)
+        logger.info(f"Batch mode failed for `{args.paths}`: {path_error}")
+        return EXIT_ERROR
+
+    lines = islice(parser.parse(), args.max)
+    try:
+        output = _open_output(output=args.output)
+        try:
+            if args.stats:
+                stats = parser.stats(bucket_size=timedelta(seconds=args.bucket))
+                dimensions = [name.strip() for name in args.by.split(",") if name]
+                stats.write_csv(output, *dimensions)
+                matches = len(stats.counts())
+            elif args.templates:
+                miner = parser.templates()
+                miner.write_csv(output)
+                matches = len(miner)
+            elif args.top is not None:
+                summary = parser.sketch().summary(top=args.top)
+                output.write(f"{json.dumps(summary, indent=2)}\n")
+                matches = summary["lines"]
+            elif args.count:
+                matches = sum(1 for _ in lines)
+                output.write(f"{matches}\n")
+            else:
+                matches = _write_lines(lines=lines, output=output)
+        finally:
+            if output is sys.stdout:
+                output.flush()
+            else:
+                output.close()
+    except BrokenPipeError:
+        # The reader stopped early, like `grep` the output is simply cut.
+        _close_stdout()
+        logger.debug(f"Batch mode output of `{args.paths}` was closed early")
+        return EXIT_MATCH
+    except (OSError, ValueError) as error:
+        print(error, file=sys.stderr)
+        logger.info(f"Batch mode could not write the output: {error}")
+        return EXIT_ERROR
+
+    if parser.metrics is not None:
+        for name, value in parser.metrics.as_dict().items():
+            print(f"{name}: {value:g}", file=sys.stderr)
+    logger.debug(f"Batch mode wrote {matches} matching lines of `{args.paths}`")
+    return EXIT_MATCH if matches else EXIT_NO_MATCH
@@ -0,0 +1,600 @@
+import argparse
+import json
+import logging
+import os
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import closing, contextmanager
+from functools import lru_cache
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from pathlib import Path
+from typing import (
+    Any,
+    BinaryIO,
+    Dict,
+    Generator,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
+from urllib.parse import parse_qs, urlsplit
+
+from config import read_log_format
+from log_parser import LineFormat, LogFormat, LogParser, compile_filter
+from log_parser.compression import detect_compression
+from log_parser.engines import decode_line, mmap_scan
+
+logger = logging.getLogger("core")
+
+DEFAULT_PORT = 8080
+DEFAULT_LIMIT = 100
+MAX_LIMIT = 10_000
+# The size of the chunks of the streamed responses.
+CHUNK_SIZE = 64 * 1024  # 64 KB
+
+# The queries are compiled once and shared by every request and every cursor.
+_compile = lru_cache(maxsize=128)(compile_filter)
+
+
+class _Handle:
+    """An open log file of the pool with the number of scans reading it."""
+
+    __slots__ = ("file", "users", "stale")
+
+    def __init__(self, file: BinaryIO) -> None:
+        self.file = file
+        self.users = 0
+        # Set once the file was replaced, closed when its last scan ends.
+        self.stale = False
+
+
+class FileHandlePool:
+    """
+    A pool of open log files shared by the scans of every request, so the files
+    that are queried again and again are not opened for every page.
+
+    The scans memory-map the files and never move their position, so many of them
+    can read the same open file at once. A file is opened again when it was
+    rotated, and the least recently used idle files are closed beyond `max_open`.
+
+    Example Usage:
+    ```
+    pool = FileHandlePool(max_open=16)
+    with pool.open(Path("logs/project.log")) as file:
+        for offset, line in mmap_scan(file=file, token=b"ERROR"):
+            print(line)
+    ```
+    """
+
+    def __init__(self, max_open: int = 64) -> None:
+        """
+        Initialize an empty pool.
+
+        Args:
+            max_open (int): The number of idle files kept open.
+        """
+        self.max_open = max_open
+        self._handles: "OrderedDict[Path, _Handle]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        """Return the number of open files in the pool."""
+        return len(self._handles)
+
+    @contextmanager
+    def open(self, path: Path) -> Iterator[BinaryIO]:
+        """
+        Borrow the open file of a path, opening it if it is not in the pool.
+
+        Args:
+            path (Path): The resolved path of the log file.
+
+        Yields:
+            BinaryIO: The file opened in binary mode, which must not be closed.
+
+        Raises:
+            FileNotFoundError: If the log file does not exist.
+            PermissionError: If the log file can not be read.
+        """
+        handle = self._acquire(path=path)
+        try:
+            yield handle.file
+        finally:
+            self._release(handle=handle)
+
+    def close(self) -> None:
+        """Close the idle files, the borrowed ones are closed once returned."""
+        with self._lock:
+            for handle in self._handles.values():
+                handle.stale = True
+                if handle.users == 0:
+                    handle.file.close()
+            self._handles.clear()
+
+    def _acquire(self, path: Path) -> _Handle:
+        """Return the handle of a path, opening the file again if it was rotated."""
+        with self._lock:
+            handle = self._handles.get(path)
+            if handle is not None and not self._is_current(path, handle.file):
+                logger.debug(f"The log file `{path}` was rotated, opening it again.")
+                del self._handles[path]
+                handle.stale = True
+                if handle.users == 0:
+                    handle.file.close()
+                handle = None
+
+            if handle is None:
+                handle = self._handles[path] = _Handle(file=path.open(mode="rb"))
+            handle.users += 1
+            self._handles.move_to_end(path)
+            self._evict()
+            return handle
+
+    def _release(self, handle: _Handle) -> None:
+        """Return a borrowed handle, closing it if it is no longer pooled."""
+        with self._lock:
+            handle.users -= 1
+            if handle.stale and handle.users == 0:
+                handle.file.close()
+            self._evict()
+
+    def _evict(self) -> None:
+        """Close the least recently used idle files beyond the limit."""
+        idle = [path for path, handle in self._handles.items() if handle.users == 0]
+        for path in idle[: max(0, len(self._handles) - self.max_open)]:
+            self._handles.pop(path).file.close()
+
+    @staticmethod
+    def _is_current(path: Path, file: BinaryIO) -> bool:
+        """Check that the open file is still the file at the path."""
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return False
+        opened = os.fstat(file.fileno())
+        return (stat.st_dev, stat.st_ino) == (opened.st_dev, opened.st_ino)
+
+
+class Cursor(NamedTuple):
+    """
+    Where the next page of a query starts: the query itself, the byte offset of
+    its next match and the identity of the scanned file.
+    """
+
+    path: Path
+    level: Optional[str]
+    query: Optional[str]
+    offset: int
+    device: int
+    inode: int
+
+
+class CursorTable:
+    """
+    The cursors of the paged queries, keyed by random ids handed to the clients.
+
+    A cursor is taken out of the table by the page it starts, which hands out a
+    new cursor for the page after it, so two requests never share a cursor. The
+    cursors expire after `ttl` seconds, and the oldest ones are dropped beyond
+    `max_cursors`.
+    """
+
+    def __init__(self, max_cursors: int = 1024, ttl: float = 600) -> None:
+        """
+        Initialize an empty table.
+
+        Args:
+            max_cursors (int): The maximum number of cursors kept.
+            ttl (float): The number of seconds a cursor is kept for.
+        """
+        self.max_cursors = max_cursors
+        self.ttl = ttl
+        self._cursors: "OrderedDict[str, Tuple[float, Cursor]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        """Return the number of cursors in the table."""
+        return len(self._cursors)
+
+    def save(self, cursor: Cursor) -> str:
+        """
+        Save a cursor for a later request.
+
+        Args:
+            cursor (Cursor): The cursor of the next page of a query.
+
+        Returns:
+            str: The id of the cursor.
+        """
+        cursor_id = secrets.token_urlsafe(16)
+        now = time.monotonic()
+        with self._lock:
+            self._cursors[cursor_id] = (now + self.ttl, cursor)
+            while self._cursors:
+                oldest_id, (expiry, _) = next(iter(self._cursors.items()))
+                if expiry > now and len(self._cursors) <= self.max_cursors:
+                    break
+                del self._cursors[oldest_id]
+        return cursor_id
+
+    def take(self, cursor_id: str) -> Cursor:
+        """
+        Take a cursor out of the table.
+
+        Args:
+            cursor_id (str): The id of the cursor.
+
+        Returns:
+            Cursor: The cursor.
+
+        Raises:
+            LookupError: If the cursor does not exist or expired.
+        """
+        with self._lock:
+            expiry, cursor = self._cursors.pop(cursor_id, (0.0, None))
+        if cursor is None or expiry < time.monotonic():
+            raise LookupError(f"The cursor `{cursor_id}` does not exist or expired")
+        return cursor
+
+
+class QueryService:
+    """
+    Run the paged queries of the HTTP service on the local log files: a level
+    or a filter query on a file, from its beginning or from a cursor.
+
+    Only the files under the `root` directory are served. The matches are found
+    with the memory-mapped scan of the `mmap` mode, or the compiled filter of the
+    query, reading the pooled open files.
+    """
+
+    def __init__(
+        self,
+        root: Union[Path, str] = ".",
+        log_format: Optional[LineFormat] = None,
+        pool: Optional[FileHandlePool] = None,
+        cursors: Optional[CursorTable] = None,
+    ) -> None:
+        """
+        Initialize the service.
+
+        Args:
+            root (Union[Path, str]): The directory of the served log files.
+            log_format (Optional[LineFormat]): The format of the log lines,
+                defaults to `LogFormat()`.
+            pool (Optional[FileHandlePool]): The pool of open files.
+            cursors (Optional[CursorTable]): The table of the cursors.
+        """
+        self.root = Path(root).resolve()
+        self.log_format = log_format or LogFormat()
+        self.pool = pool or FileHandlePool()
+        self.cursors = cursors or CursorTable()
+
+    def start(self, params: Dict[str, str]) -> Tuple[Cursor, int]:
+        """
+        Find where the page of a request starts, from its parameters: either a
+        `cursor`, or a `path` with a `level` or a `query`, and a `limit`.
+
+        Args:
+            params (Dict[str, str]): The parameters of the request.
+
+        Returns:
+            Tuple[Cursor, int]: The cursor of the page and its number of lines.
+
+        Raises:
+            ValueError: If a parameter is not valid.
+            LookupError: If the cursor does not exist, expired, or its file was
+                replaced since.
+            FileNotFoundError: If the log file does not exist.
+            PermissionError: If the log file is outside of the root or can not be
+                read.
+            OSError: If the path can not be opened otherwise, like a directory.
+        """
+        try:
+            limit = int(params.get("limit", DEFAULT_LIMIT))
+        except ValueError:
+            msg = f"The limit is not a number: `{params['limit']}`"
+            raise ValueError(msg) from None
+        if not 0 < limit <= MAX_LIMIT:
+            raise ValueError(f"The limit must be between 1 and {MAX_LIMIT}: {limit}")
+
+        if "cursor" in params:
+            cursor = self.cursors.take(params["cursor"])
+            with self.pool.open(cursor.path) as file:
+                stat = os.fstat(file.fileno())
+            replaced = (stat.st_dev, stat.st_ino) != (cursor.device, cursor.inode)
+            if replaced or stat.st_size < cursor.offset:
+                raise LookupError("The log file was replaced since the cursor was made")
+            return cursor, limit
+
+        if "path" not in params:
+            raise ValueError("Either a `path` or a `cursor` is required")
+        path = (self.root / params["path"]).resolve()
+        if not path.is_relative_to(self.root):
+            raise PermissionError(f"The path is outside of `{self.root}`")
+        if detect_compression(path=path) is not None:
+            raise ValueError("Compressed log files can not be paged")
+
+        level, query = params.get("level"), params.get("query")
+        if (level is None) == (query is None):
+            raise ValueError("Either a `level` or a `query` is required")
+        if level is not None:
+            level = level.upper()
+            if level not in LogParser.valid_levels:
+                raise ValueError(
+                    f"Valid log levels are: {LogParser.valid_levels}, but got `{level}`"
+                )
+        else:
+            _compile(query, self.log_format)
+
+        with self.pool.open(path) as file:
+            stat = os.fstat(file.fileno())
+        cursor = Cursor(path, level, query, 0, stat.st_dev, stat.st_ino)
+        return cursor, limit
+
+    def scan(self, cursor: Cursor) -> Generator[Tuple[int, bytes], None, None]:
+        """
+        Scan the matches of a query from its cursor, reading the pooled file.
+
+        Args:
+            cursor (Cursor): The cursor of the page.
+
+        Yields:
+            Tuple[int, bytes]: The byte offset of the matching line and its raw bytes.
+
+        Raises:
+            ValueError: If the cursor has neither a level nor a query.
+        """
+        with self.pool.open(cursor.path) as file:
+            if cursor.query is not None:
+                matcher = _compile(cursor.query, self.log_format)
+                yield from matcher.scan(file=file, start=cursor.offset)
+                return
+
+            level = cursor.level
+            if level is None:
+                raise ValueError("Either a `level` or a `query` is required")
+            token = self.log_format.level_token(level)
+            matches = mmap_scan(file=file, token=token, start=cursor.offset)
+            if not self.log_format.level_by_field:
+                yield from matches
+                return
+            is_level = self.log_format.is_level
+            for offset, line in matches:
+                if is_level(line.decode("utf-8", errors="replace"), level):
+                    yield offset, line
+
+    def page(
+        self, cursor: Cursor, limit: int
+    ) -> Generator[Tuple[int, str], None, Optional[str]]:
+        """
+        Yield the lines of a page and save the cursor of the next one.
+
+        Args:
+            cursor (Cursor): The cursor of the page.
+            limit (int): The number of lines of the page.
+
+        Yields:
+            Tuple[int, str]: The byte offset of every line and the line.
+
+        Returns:
+            Optional[str]: The id of the cursor of the next page, or None if this
+                page is the last one.
+        """
+        with closing(self.scan(cursor=cursor)) as matches:
+            for number, (offset, line) in enumerate(matches):
+                if number == limit:
+                    # One more match, so there is a next page starting at it.
+                    return self.cursors.save(cursor._replace(offset=offset))
+                yield offset, decode_line(line, errors="replace")
+        return None
+
+    def close(self) -> None:
+        """Close the pooled files."""
+        self.pool.close()
+
+
+class QueryHandler(BaseHTTPRequestHandler):
+    """
+    The handler of the requests of the HTTP service.
+
+    `GET /query?path=<path>&level=<level>&limit=<n>` or `query=<query>` instead of
+    the level, then `GET /query?cursor=<id>` for the next pages. The response is
+    streamed in chunks as the JSON object
+    `{"lines": [{"offset": <n>, "line": <line>}, ...], "cursor": <id or null>}`.
+    """
+
+    protocol_version = "HTTP/1.1"
+    server: "QueryServer"
+
+    def do_GET(self) -> None:
+        """Answer a query with its page of matching lines."""
+        url = urlsplit(self.path)
+        if url.path != "/query":
+            self._send_error(HTTPStatus.NOT_FOUND, f"Unknown endpoint `{url.path}`")
+            return
+        params = {name: values[-1] for name, values in parse_qs(url.query).items()}
+
+        try:
+            cursor, limit = self.server.service.start(params=params)
+        except ValueError as error:
+            self._send_error(HTTPStatus.BAD_REQUEST, str(error))
+            return
+        except LookupError as error:
+            self._send_error(HTTPStatus.GONE, str(error))
+            return
+        except FileNotFoundError:
+            self._send_error(HTTPStatus.NOT_FOUND, "The log file does not exist")
+            return
+        except PermissionError as error:
+            self._send_error(HTTPStatus.FORBIDDEN, str(error))
+            return
+        except IsADirectoryError:
+            self._send_error(HTTPStatus.BAD_REQUEST, "The path is a directory")
+            return
+        except OSError as error:
+            msg = f"The log file can not be read: {error.strerror or error}"
+            self._send_error(HTTPStatus.BAD_REQUEST, msg)
+            return
+
+        self.send_response(HTTPStatus.OK)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+
+        page = self.server.service.page(cursor=cursor, limit=limit)
+        pending: List[bytes] = [b'{"lines": [']
+        pending_size = 0
+        separator = b""
+        try:
+            while True:
+                offset, line = next(page)
+                item = json.dumps({"offset": offset, "line": line}).encode("utf-8")
+                pending.append(separator + item)
+                pending_size += len(item)
+                separator = b", "
+                if pending_size >= CHUNK_SIZE:
+                    self._write_chunk(b"".join(pending))
+                    pending.clear()
+                    pending_size = 0
+        except StopIteration as stop:
+            next_cursor = stop.value
+        except OSError as error:
+            # The client went away, the scan is closed with the page.
+            logger.debug(f"Could not stream the page of `{cursor.path}`: {error}")
+            page.close()
+            return
+        pending.append(b'], "cursor": %s}' % json.dumps(next_cursor).encode("utf-8"))
+        self._write_chunk(b"".join(pending))
+        self._write_chunk(b"")
+
+    def _write_chunk(self, data: bytes) -> None:
+        """Write a chunk of the response, the empty one ending the response."""
+        self.wfile.write(b"%x\r\n%s\r\n" % (len(data), data))
+
+    def _send_error(self, status: HTTPStatus, message: str) -> None:
+        """Send an error as a JSON object."""
+        body = json.dumps({"error": message}).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def end_headers(self) -> None:
+        """
+        End the headers, closing the connection after the response: a worker
+        waiting on an idle kept-alive connection could not serve other requests.
+        """
+        self.send_header("Connection", "close")
+        super().end_headers()
+
+    def log_message(self, format: str, *args: Any) -> None:
+        """Log the requests to the `core` logger instead of stderr."""
+        logger.debug(f"{self.address_string()} {format % args}")
+
+
+class QueryServer(HTTPServer):
+    """
+    The HTTP server of the query service, handling the requests on a bounded pool
+    of worker threads instead of a thread per connection. The connections beyond
+    the pool wait in its queue.
+
+    Example Usage:
+    ```
+    with QueryServer(("127.0.0.1", 8080), QueryService(root="logs")) as server:
+        server.serve_forever()
+    ```
+    """
+
+    def __init__(
+        self,
+        address: Tuple[str, int],
+        service: QueryService,
+        workers: Optional[int] = None,
+    ) -> None:
+        """
+        Bind the server to its address.
+
+        Args:
+            address (Tuple[str, int]): The host and the port to listen on, port 0
+                picks a free port.
+            service (QueryService): The service answering the queries.
+            workers (Optional[int]): The number of worker threads, defaults to the
+                default of `ThreadPoolExecutor`.
+        """
+        super().__init__(address, QueryHandler)
+        self.service = service
+        self.executor = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="query"
+        )
+
+    def process_request(self, request: Any, client_address: Any) -> None:
+        """Handle a request on the worker pool."""
+        self.executor.submit(self._process, request, client_address)
+
+    def _process(self, request: Any, client_address: Any) -> None:
+        """Handle a request in a worker thread, like `ThreadingMixIn` does."""
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+
+    def server_close(self) -> None:
+        """Stop the workers and close the socket and the pooled files."""
+        super().server_close()
+        self.executor.shutdown(wait=True)
+        self.service.close()
+
+
+def serve(argv: Optional[Sequence[str]] = None) -> int:
+    """
+    Entry point of the HTTP query service, serving the log files of a directory
+    until it is interrupted.
+
+    Args:
+        argv (Optional[Sequence[str]]): The command-line arguments, defaults to
+            `sys.argv[1:]`.
+
+    Returns:
+        int: The exit code, 0 once the service is interrupted.
+    """
+    arg_parser = argparse.ArgumentParser(
+        prog="run.py serve",
+        description="Serve paged queries on the local log files over HTTP.",
+    )
+    arg_parser.add_argument("--host", default="127.0.0.1", help="the host to bind")
+    arg_parser.add_argument(
+        "--port", type=int, default=DEFAULT_PORT, help="the port to listen on"
+    )
+    arg_parser.add_argument(
+        "--root", default=".", help="the directory of the served log files"
+    )
+    arg_parser.add_argument(
+        "--workers", type=int, default=8, help="the number of worker threads"
+    )
+    args = arg_parser.parse_args(argv)
+
+    log_format = LogFormat(format_string=read_log_format())
+    service = QueryService(root=args.root, log_format=log_format)
+    with QueryServer((args.host, args.port), service, workers=args.workers) as server:
+        host, port = server.server_address[:2]
+        # The address of a socket server may be typed as bytes, decode it.
+        if isinstance(host, bytes):
+            host = host.decode()
+        print(f"Serving the log files of `{service.root}` on http://{host}:{port}")
+        logger.info(f"Query service listening on {host}:{port}")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+    return 0
@@ -0,0 +1,259 @@
+import json
+import subprocess
+import sys
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from ..batch import EXIT_ERROR, EXIT_MATCH, EXIT_NO_MATCH, batch
+
+
+class TestBatch:
+    """Test class for the non-interactive batch mode."""
+
+    @pytest.fixture
+    def sample_file_path(self, tmp_path: Path) -> Path:
+        """Fixture for creating a sample log file."""
+        file_path = tmp_path / "test.log"
+        file_path.write_text(
+            "DEBUG: Test line 1\nERROR: Test line 2\nERROR: Test line 3\n"
+            "ERROR: Test line 4"
+        )
+        return file_path
+
+    def test_stdout(self, capsys: Any, sample_file_path: Path) -> None:
+        """Tests that the matching lines are written to stdout."""
+        actual = batch([str(sample_file_path), "--level", "error"])
+        assert actual == EXIT_MATCH, f"expect {EXIT_MATCH} but got {actual}"
+
+        actual = capsys.readouterr().out
+        expected = "ERROR: Test line 2\nERROR: Test line 3\nERROR: Test line 4\n"
+        assert actual == expected, f"expect {expected} but got {actual}"
+
+    def test_output_file_and_max(self, tmp_path: Path, sample_file_path: Path) -> None:
+        """Tests that --max limits the lines written to the --output file."""
+        output_path = tmp_path / "output.log"
+        arguments = [str(sample_file_path), "-l", "ERROR", "-n", "2", "-m", "mmap"]
+        actual: Any = batch([*arguments, "-o", str(output_path)])
+        assert actual == EXIT_MATCH, f"expect {EXIT_MATCH} but got {actual}"
+
+        actual = output_path.read_text()
+        expected = "ERROR: Test line 2\nERROR: Test line 3\n"
+        assert actual == expected, f"expect {expected} but got {actual}"
+
+    def test_count(self, capsys: Any, sample_file_path: Path) -> None:
+        """Tests that --count prints the number of matching lines."""
+        batch([str(sample_file_path), "--level", "ERROR", "--count"])
+        actual = capsys.readouterr().out
+        expected = "3\n"
+        assert actual == expected, f"expect {expected} but got {actual}"
+
+    def test_time_range(self, capsys: Any, tmp_path: Path) -> None:
+        """Tests that --start and --end limit the lines to a time window."""
+        file_path = tmp_path / "timed.log"
+        file_path.write_text(
+            "2024-01-01 14:00:00 - ERROR - app - 1 - 2 - Test line 1\n"
+            "2024-01-01 14:05:00 - ERROR - app - 1 - 2 - Test line 2\n"
+            "2024-01-01 14:10:00 - ERROR - app - 1 - 2 - Test line 3\n"
+        )
+        arguments = ["--start", "2024-01-01 14:01", "--end", "2024-01-01 14:05"]
+        batch([str(file_path), "--level", "ERROR", "--count", *arguments])
+        actual = capsys.readouterr().out
+        expected = "1\n"
+        assert actual == expected, f"expect {expected} but got {actual}"
+
+    def test_merge(self, capsys: Any, tmp_path: Path) -> None:
+        """Tests that many paths are merged in timestamp order."""
+        first_path = tmp_path / "worker1.log"
+        first_path.write_text(
+            "2024-01-01 14:00:00 - ERROR - app - 1 - 2 - Test line 1\n"
+            "2024-01-01 14:00:20 - ERROR - app - 1 - 2 - Test line 3\n"
+        )
+        second_path = tmp_path / "worker2.log"
+        second_path.write_text(
+            "2024-01-01 14:00:10 - ERROR - db - 3 - 4 - Test line 2\n"
+        )
+        batch([str(first_path), str(second_path), "--level", "ERROR"])
+        actual = [line[-11:] for line in capsys.readouterr().out.splitlines()]
+        expected = ["Test line 1", "Test line 2", "Test line 3"]
+        assert actual == expected, f"expect {expected} but got {actual}"
+
+    def test_stats(self, capsys: Any, sample_file_path: Path) -> None:
+        """Tests that --stats prints the counts table as CSV."""
+        sample_file_path.write_text(
+            "2024-01-01 14:00:00 - ERROR - app - 1 - 2 - Test line 1\n"
+            "2024-01-01 14:00:10 - ERROR - db - 1 - 2 - Test line 2\n"
+            "2024-01-01 14:00:20 - INFO - db - 1 - 2 - Test line 3\n"
+        )
+        arguments = ["--stats", "--by", "level"]
+        actual = batch([str(sample_file_path), *arguments])
+        assert actual == EXIT_MATCH, f"expect {EXIT_MATCH} but got {actual}"
+
+        actual = capsys.readouterr().out.splitlines()
+        expected = ["level,count", "ERROR,2", "INFO,1"]
+        assert actual == expected, f"expect {expected} but got {actual}"
+
+    def test_top(self, capsys: Any, tmp_path: Path) -> None:
+        """Tests that --top prints the approximate analytics as JSON."""
+        file_path = tmp_path / "test.log"
+        file_path.write_text(
+            "2024-01-01 14:00:00 - ERROR - db - 1 - 2 - Failed\n"
+            "2024-01-01 14:00:01 - ERROR - app - 1 - 2 - Failed\n"
+            "2024-01-01 14:00:02 - ERROR - db - 2 - 2 - Timeout\n"
+        )
+        actual: Any = batch([str(file_path), "--level", "ERROR", "--top", "1"])
+        assert actual == EXIT_MATCH, f"expect {EXIT_MATCH} but got {actual}"
+
+        summary = json.loads(capsys.readouterr().out)
+        actual = (summary["top_messages"], summary["distinct_modules"])
+        expected = ([{"message": "Failed", "count": 2}], 2)
+        assert actual == expected, f"expect {expected} but got {actual}"
+
+    def test_templates(self, capsys: Any, sample_file_path: Path) -> None:
+        """Tests that --templates prints the message templates as CSV."""
+        actual = batch([str(sample_file_path), "--level", "ERROR", "--templates"])
+        assert actual == EXIT_MATCH, f"expect {EXIT_MATCH} but got {actual}"
+
+        actual = capsys.readouterr().out.splitlines()
+        expected = [
+            "count,first_time,last_time,template,example",
+            "3,,,ERROR: Test line <NUM>,ERROR: Test line 2",
+        ]
+        assert actual == expected, f"expect {expected} but got {actual}"
+
+    def test_json(self, capsys: Any, tmp_path: Path) -> None:
+        """Tests that --json-keys matches JSON lines by their level field."""
+        file_path = tmp_path / "test.jsonl"
+        file_path.write_text(
+            '{"severity": "ERROR", "msg": "Failed"}\n'
+            '{"severity": "INFO", "msg": "ERROR ignored"}\n'
+        )
+        arguments = [str(file_path), "-l", "ERROR", "--json-keys", "levelname=severity"]
+        actual = batch([*arguments, "--count"])
+        assert actual == EXIT_MATCH, f"expect {EXIT_MATCH} but got {actual}"
+
+        actual = capsys.readouterr().out
+        expected = "1\n"
+        assert actual == expected, f"expect {expected} but got {actual}"
+
+    def test_keywords(self, capsys: Any, sample_file_path: Path) -> None:
+        """Tests that --keyword keeps the lines containing the keywords."""
+        arguments = [str(sample_file_path), "-l", "ERROR", "-k", "line", "-k", "3"]
+        actual = batch([*arguments, "--keyword-index"])
+        assert actual == EXIT_MATCH, f"expect {EXIT_MATCH} but got {actual}"
+
+        actual = capsys.readouterr().out
+        expected = "ERROR: Test line 3\n"
+        assert actual == expected, f"expect {expected} but got {actual}"
+
+    def test_query(self, capsys: Any, sample_file_path: Path) -> None:
+        """Tests that --query filters the lines without a --level."""
+        sample_file_path.write_text(
+            "2024-01-01 14:00:00 - ERROR - db - 1 - 2 - Test line 1\n"
+            "2024-01-01 14:00:01 - CRITICAL - app - 1 - 2 - Test line 2\n"
+        )
+        actual = batch([str(sample_file_path), "-q", "level>=ERROR and module=db"])
+        assert actual == EXIT_MATCH, f"expect {EXIT_MATCH} but got {actual}"
+
+        actual = capsys.readouterr().out
+        expected = "2024-01-01 14:00:00 - ERROR - db - 1 - 2 - Test line 1\n"
+        assert actual == expected, f"expect {expected} but got {actual}"
+
+        actual = batch([str(sample_file_path), "--query", "module=("])
+        assert actual == EXIT_ERROR, f"expect {EXIT_ERROR} but got {actual}"
+
+    def test_database(
+        self, capsys: Any, tmp_path: Path, sample_file_path: Path
+    ) -> None:
+        """Tests that --ingest fills the database that --db queries."""
+        db_path = str(tmp_path / "logs.db")
+        actual = batch([str(sample_file_path), "--ingest", db_path])
+        assert actual == EXIT_MATCH, f"expect {EXIT_MATCH} but got {actual}"
+        actual = capsys.readouterr().out
+        expected = f"{sample_file_path}: 3 lines ingested\n"
+        assert actual == expected, f"expect {expected} but got {actual}"
+
+        sample_file_path.write_text(
+            "2024-01-01 14:00:00 - ERROR - db - 1 - 2 - Test line 1\n"
+            "2024-01-01 14:00:01 - CRITICAL - app - 1 - 2 - Test line 2\n"
+        )
+        batch([str(sample_file_path), "--ingest", db_path])
+        capsys.readouterr()
+        actual = batch([str(sample_file_path), "--db", db_path, "-q", "module=app"])
+        assert actual == EXIT_MATCH, f"expect {EXIT_MATCH} but got {actual}"
+        actual = capsys.readouterr().out
+        expected = "2024-01-01 14:00:01 - CRITICAL - app - 1 - 2 - Test line 2\n"
+        assert actual == expected, f"expect {expected} but got {actual}"
+
+        batch([str(sample_file_path), "--db", db_path, "-l", "error", "--count"])
+        actual = capsys.readouterr().out
+        assert actual == "1\n", f"expect 1 but got {actual}"
+
+    def test_database_json(self, capsys: Any, tmp_path: Path) -> None:
+        """Tests that --db queries JSON lines with the levels in any case."""
+        file_path = tmp_path / "test.jsonl"
+        file_path.write_text(
+            '{"level": "error", "msg": "Failed"}\n'
+            '{"level": "info", "msg": "ERROR ignored"}\n'
+        )
+        db_path = str(tmp_path / "logs.db")
+        batch([str(file_path), "--json", "--ingest", db_path])
+        capsys.readouterr()
+
+        actual = batch([str(file_path), "--json", "--db", db_path, "-l", "ERROR"])
+        assert actual == EXIT_MATCH, f"expect {EXIT_MATCH} but got {actual}"
+        actual = capsys.readouterr().out
+        expected = '{"level": "error", "msg": "Failed"}\n'
+        assert actual == expected, f"expect {expected} but got {actual}"
+
+    def test_profile(self, capsys: Any, sample_file_path: Path) -> None:
+        """Tests that --profile prints the metrics to stderr."""
+        batch([str(sample_file_path), "--level", "ERROR", "--profile", "-m", "mmap"])
+        captured = capsys.readouterr()
+        assert "lines_scanned: 4\n" in captured.err
+        assert "matches: 3\n" in captured.err
+
+    def test_no_match(self, sample_file_path: Path) -> None:
+        """Tests the exit code when no line matches."""
+        actual = batch([str(sample_file_path), "--level", "CRITICAL"])
+        assert actual == EXIT_NO_MATCH, f"expect {EXIT_NO_MATCH} but got {actual}"
+
+    def test_errors(self, capsys: Any, tmp_path: Path) -> None:
+        """Tests the exit code and message for a wrong path and a wrong level."""
+        actual = batch([str(tmp_path / "missing.log"), "--level", "ERROR"])
+        assert actual == EXIT_ERROR, f"expect {EXIT_ERROR} but got {actual}"
+
+        actual = batch([str(tmp_path / "missing.log"), "--level", "wrong"])
+        assert actual == EXIT_ERROR, f"expect {EXIT_ERROR} but got {actual}"
+
+        captured = capsys.readouterr()
+        assert captured.out == "", f"expect no output but got {captured.out}"
+        assert "The given path is wrong" in captured.err
+        assert "Valid log levels are:" in captured.err
+
+    def test_negative_max(self, capsys: Any, sample_file_path: Path) -> None:
+        """Tests that a negative --max is rejected as a usage error."""
+        with pytest.raises(SystemExit) as error:
+            batch([str(sample_file_path), "--max", "-1"])
+        actual = error.value.code
+        assert actual == EXIT_ERROR, f"expect {EXIT_ERROR} but got {actual}"
+        assert "expected zero or more" in capsys.readouterr().err
+
+    def test_broken_pipe(self, tmp_path: Path) -> None:
+        """Tests that a reader closing the pipe early, like `head`, is not an error."""
+        file_path = tmp_path / "test.log"
+        file_path.write_text("ERROR: Test line\n" * 200_000)
+        command = "import sys; from core import batch; sys.exit(batch())"
+        process = subprocess.Popen(
+            [sys.executable, "-c", command, str(file_path), "-l", "ERROR"],
+            cwd=Path(__file__).resolve().parents[2],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+        )
+        process.stdout.readline()  # type: ignore[union-attr]
+        process.stdout.close()  # type: ignore[union-attr]
+        stderr = process.stderr.read()  # type: ignore[union-attr]
+        actual = process.wait()
+        assert actual == EXIT_MATCH, f"expect {EXIT_MATCH} but got {actual}"
+        assert stderr == b"", f"expect no error but got {stderr!r}"
@@ -0,0 +1,146 @@
+import http.client
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Any, Dict, Generator, Optional, Tuple
+from urllib.parse import urlencode
+
+import pytest
+
+from ..server import Cursor, CursorTable, FileHandlePool, QueryServer, QueryService
+
+
+class TestFileHandlePool:
+    """Test class for the pool of open log files."""
+
+    def test_reuse_and_eviction(self, tmp_path: Path) -> None:
+        """Tests that the open files are reused and the idle ones are evicted."""
+        paths = [tmp_path / f"{name}.log" for name in "abc"]
+        for path in paths:
+            path.write_text("ERROR: line\n")
+
+        pool = FileHandlePool(max_open=2)
+        with pool.open(paths[0]) as first:
+            with pool.open(paths[0]) as second:
+                assert first is second, "expect the same open file"
+        with pool.open(paths[1]), pool.open(paths[2]):
+            with pool.open(paths[0]) as third:
+                assert len(pool) == 3, "expect the borrowed files to stay open"
+        assert len(pool) == 2, f"expect 2 open files but got {len(pool)}"
+        assert first.closed and third.closed, "expect the oldest file to be closed"
+        pool.close()
+
+    def test_rotation(self, tmp_path: Path) -> None:
+        """Tests that a rotated file is opened again."""
+        path = tmp_path / "test.log"
+        path.write_text("ERROR: old\n")
+        pool = FileHandlePool()
+        with pool.open(path) as old:
+            os.rename(path, tmp_path / "test.log.1")
+            path.write_text("ERROR: new\n")
+            with pool.open(path) as new:
+                assert new.read() == b"ERROR: new\n", "expect the new file"
+            assert not old.closed, "expect the borrowed file to stay open"
+        assert old.closed, "expect the rotated file to be closed once returned"
+        pool.close()
+
+
+class TestCursorTable:
+    """Test class for the table of the cursors of the paged queries."""
+
+    def test_take_once(self) -> None:
+        """Tests that a cursor is taken only once and the oldest are dropped."""
+        table = CursorTable(max_cursors=2)
+        cursors = [
+            Cursor(Path("a.log"), "ERROR", None, offset, 1, 2) for offset in range(3)
+        ]
+        ids = [table.save(cursor) for cursor in cursors]
+        assert len(table) == 2, f"expect 2 cursors but got {len(table)}"
+
+        actual = table.take(ids[2])
+        assert actual == cursors[2], f"expect {cursors[2]} but got {actual}"
+        for cursor_id in (ids[2], ids[0]):
+            with pytest.raises(LookupError, match="does not exist or expired"):
+                table.take(cursor_id)
+
+
+class TestQueryServer:
+    """Test class for the HTTP query service."""
+
+    @pytest.fixture
+    def sample_file_path(self, tmp_path: Path) -> Path:
+        """Fixture for creating a sample log file."""
+        file_path = tmp_path / "test.log"
+        file_path.write_text(
+            "".join(
+                f"2024-01-01 14:00:0{number} - {level} - db - 1 - 2 - Line {number}\n"
+                for number, level in enumerate(["ERROR", "INFO", "ERROR", "ERROR"])
+            )
+        )
+        return file_path
+
+    @pytest.fixture
+    def server(self, tmp_path: Path) -> Generator:
+        """Fixture for running the service on a free port in a thread."""
+        service = QueryService(root=tmp_path)
+        with QueryServer(("127.0.0.1", 0), service, workers=2) as server:
+            thread = threading.Thread(target=server.serve_forever, args=(0.01,))
+            thread.start()
+            yield server
+            server.shutdown()
+            thread.join()
+
+    def get(
+        self, server: QueryServer, **params: Any
+    ) -> Tuple[int, Dict, Optional[str]]:
+        """Send a query and return the status, the body and the encoding."""
+        connection = http.client.HTTPConnection("127.0.0.1", server.server_address[1])
+        connection.request("GET", f"/query?{urlencode(params)}")
+        response = connection.getresponse()
+        body = json.loads(response.read())
+        connection.close()
+        return response.status, body, response.getheader("Transfer-Encoding")
+
+    def test_pages(self, server: QueryServer, sample_file_path: Path) -> None:
+        """Tests that the matches are streamed and paged through the cursors."""
+        params = {"path": "test.log", "level": "error", "limit": 2}
+        status, body, encoding = self.get(server, **params)
+        assert (status, encoding) == (200, "chunked"), f"got {status} {encoding}"
+        actual: Any = [item["line"][-7:] for item in body["lines"]]
+        expected: Any = ["Line 0\n", "Line 2\n"]
+        assert actual == expected, f"expect {expected} but got {actual}"
+
+        status, body, _ = self.get(server, cursor=body["cursor"], limit=2)
+        actual = ([item["line"][-7:] for item in body["lines"]], body["cursor"])
+        expected = (["Line 3\n"], None)
+        assert actual == expected, f"expect {expected} but got {actual}"
+
+        status, body, _ = self.get(server, path="test.log", query="level=INFO")
+        actual = [item["offset"] for item in body["lines"]]
+        expected = [len(sample_file_path.read_text().splitlines()[0]) + 1]
+        assert actual == expected, f"expect {expected} but got {actual}"
+
+    @pytest.mark.parametrize(
+        "params, status",
+        [
+            ({"path": "test.log", "level": "FATAL"}, 400),
+            ({"path": "test.log", "query": "module=("}, 400),
+            ({"path": "test.log", "level": "ERROR", "limit": "0"}, 400),
+            ({"path": "missing.log", "level": "ERROR"}, 404),
+            ({"path": "../test.log", "level": "ERROR"}, 403),
+            ({"path": ".", "level": "ERROR"}, 400),
+            ({"cursor": "unknown"}, 410),
+        ],
+    )
+    def test_errors(
+        self,
+        server: QueryServer,
+        sample_file_path: Path,
+        params: Dict[str, str],
+        status: int,
+    ) -> None:
+        """Tests the status and the message of the invalid queries."""
+        actual, body, _ = self.get(server, **params)
+        assert actual == status, f"expect {status} but got {actual}: {body}"
+        assert "error" in body, f"expect an error message but got {body}"
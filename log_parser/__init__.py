@@ -1,2 +1,72 @@
-from .log_file_parser import LogParser
-from .views import LogParserView
+from importlib import import_module
+from typing import TYPE_CHECKING, Any, List
+
+# The public names of the package and their modules. The modules are imported on
+# the first use of one of their names, so a program only pays for the features it
+# uses, like asyncio for AsyncLogParser or sqlite3 for LogDatabase.
+_EXPORTS = {
+    "AsyncLogParser": ".async_parser",
+    "aparse_many": ".async_parser",
+    "ResultCache": ".cache",
+    "LogDatabase": ".database",
+    "And": ".filters",
+    "Equals": ".filters",
+    "Filter": ".filters",
+    "Level": ".filters",
+    "Matcher": ".filters",
+    "Matches": ".filters",
+    "Not": ".filters",
+    "Or": ".filters",
+    "compile_filter": ".filters",
+    "parse_query": ".filters",
+    "LogParser": ".log_file_parser",
+    "MergedLogParser": ".merge",
+    "JsonFormat": ".records",
+    "LineFormat": ".records",
+    "LogEntry": ".records",
+    "LogFormat": ".records",
+    "LogSketch": ".sketches",
+    "LogStats": ".stats",
+    "TemplateMiner": ".templates",
+    "LogParserView": ".views",
+}
+
+__all__ = list(_EXPORTS)
+
+if TYPE_CHECKING:  # pragma: no cover
+    from .async_parser import AsyncLogParser, aparse_many
+    from .cache import ResultCache
+    from .database import LogDatabase
+    from .filters import (
+        And,
+        Equals,
+        Filter,
+        Level,
+        Matcher,
+        Matches,
+        Not,
+        Or,
+        compile_filter,
+        parse_query,
+    )
+    from .log_file_parser import LogParser
+    from .merge import MergedLogParser
+    from .records import JsonFormat, LineFormat, LogEntry, LogFormat
+    from .sketches import LogSketch
+    from .stats import LogStats
+    from .templates import TemplateMiner
+    from .views import LogParserView
+
+
+def __getattr__(name: str) -> Any:
+    """Import the module of a public name on its first use."""
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(_EXPORTS[name], __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> List[str]:
+    """List the public names along with the imported ones."""
+    return sorted(set(globals()) | set(__all__))
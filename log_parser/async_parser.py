@@ -0,0 +1,150 @@
+import asyncio
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from pathlib import Path
+from typing import Any, AsyncGenerator, Iterable, Iterator, List, Tuple, Union
+
+from .log_file_parser import LogParser
+
+logger = logging.getLogger("core")
+
+
+def _next_batch(lines: Iterator, size: int, stop: threading.Event) -> List:
+    """
+    Pull the next batch of lines from a generator, meant to run in a thread. The
+    batch ends early once `stop` is set, so an abandoned scan stops after a line.
+    """
+    batch = []
+    for line in islice(lines, size):
+        batch.append(line)
+        if stop.is_set():
+            break
+    return batch
+
+
+class AsyncLogParser(LogParser):
+    """
+    An asyncio-native LogParser, sharing the path handling, the level validation
+    and every scan mode of the sync class.
+
+    The blocking scan of parse() runs in a worker thread and its lines are handed
+    to the event loop in batches, so the loop is never blocked by file reads.
+
+    Example Usage:
+    ```
+    parser = AsyncLogParser()
+    parser.file_path = "logs/project.log"
+    parser.log_level = "ERROR"
+    async for line in parser.aparse():
+        print(line)
+    ```
+    """
+
+    # The number of lines read in the worker thread at a time.
+    batch_size: int = 1024
+
+    async def aparse(self) -> AsyncGenerator:
+        """
+        Lazily parses the log file without blocking the event loop, and yields
+        lines matching the specified log level.
+
+        While a batch is consumed, only the next one is read ahead, so a slow
+        consumer holds back the reads instead of letting lines pile up in memory.
+
+        Yields:
+            str | LogEntry: Log lines matching the specified log level, or their
+                records in the structured mode.
+        """
+        lines = self.parse()
+        loop = asyncio.get_running_loop()
+        stop = threading.Event()
+        # A single thread runs every read and the final close of the generator,
+        # so the generator is never used by two threads at once.
+        executor = ThreadPoolExecutor(max_workers=1)
+        pending = loop.run_in_executor(
+            executor, _next_batch, lines, self.batch_size, stop
+        )
+        try:
+            while True:
+                batch = await pending
+                if not batch:
+                    return
+                pending = loop.run_in_executor(
+                    executor, _next_batch, lines, self.batch_size, stop
+                )
+                for line in batch:
+                    yield line
+        finally:
+            # The read ahead stops after its current line and is dropped, then
+            # the generator is closed on the same thread to release the file.
+            stop.set()
+            pending.cancel()
+            executor.submit(lines.close)
+            executor.shutdown(wait=False)
+
+
+async def aparse_many(
+    file_paths: Iterable[Union[Path, str]],
+    log_level: str,
+    concurrency: int = 4,
+    **settings: Any,
+) -> AsyncGenerator[Tuple[Path, Any], None]:
+    """
+    Query many log files concurrently and yield their matching lines as soon as
+    they are found.
+
+    Args:
+        file_paths (Iterable[Union[Path, str]]): The paths of the log files.
+        log_level (str): The log level to filter by.
+        concurrency (int): The maximum number of files scanned at the same time.
+        **settings (Any): Other attributes to set on every parser, like `mode`.
+
+    Yields:
+        Tuple[Path, Any]: The path of the file and a line matching the log level.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    # Bounded, so the scans wait for the consumer instead of filling the memory.
+    queue: asyncio.Queue = asyncio.Queue(
+        maxsize=concurrency * AsyncLogParser.batch_size
+    )
+
+    async def query(file_path: Union[Path, str]) -> None:
+        """Scan a single file and put its lines into the shared queue."""
+        async with semaphore:
+            parser = AsyncLogParser()
+            parser.file_path = file_path
+            parser.log_level = log_level
+            for name, value in settings.items():
+                setattr(parser, name, value)
+            async for line in parser.aparse():
+                await queue.put((parser.file_path, line))
+
+    tasks = [asyncio.create_task(query(file_path)) for file_path in file_paths]
+    # The errors of the queries are returned, so the gathering never fails on its
+    # own and only the first error is raised, once every line was yielded.
+    finished = asyncio.gather(*tasks, return_exceptions=True)
+    getter = None
+    try:
+        while True:
+            getter = asyncio.ensure_future(queue.get())
+            await asyncio.wait({getter, finished}, return_when=asyncio.FIRST_COMPLETED)
+            if not getter.done():
+                break
+            yield getter.result()
+
+        while not queue.empty():
+            yield queue.get_nowait()
+        # Raise the error of a failed query, if any.
+        for result in await finished:
+            if isinstance(result, BaseException):
+                raise result
+    finally:
+        # Stopped early by the consumer, or done: the remaining queries are
+        # cancelled and awaited, so nothing is left pending.
+        if getter is not None:
+            getter.cancel()
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
@@ -0,0 +1,179 @@
+import logging
+import os
+import threading
+from array import array
+from bisect import bisect_left
+from collections import OrderedDict
+from pathlib import Path
+from typing import BinaryIO, Generator, NamedTuple, Optional, Tuple
+
+from .engines import mmap_scan
+from .index import FileIdentity, last_line_end
+
+logger = logging.getLogger("core")
+
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+# The approximate memory taken by an entry besides its offsets.
+ENTRY_OVERHEAD = 256
+
+Key = Tuple[str, int, int, bytes]
+
+
+class CacheEntry(NamedTuple):
+    """The cached matches of a query: the offsets of the matching lines."""
+
+    # The identity of the file, covering the complete lines that were scanned.
+    identity: FileIdentity
+    offsets: array
+
+    @property
+    def nbytes(self) -> int:
+        """The approximate memory taken by the entry."""
+        return ENTRY_OVERHEAD + self.offsets.itemsize * len(self.offsets)
+
+
+class ResultCache:
+    """
+    An in-process LRU cache of query results, storing the byte offsets of the
+    matching lines of a file rather than the lines themselves.
+
+    Entries are keyed on the path, the device and the inode of the file and on the
+    searched token, and are checked against the size, the mtime and the first bytes
+    of the file on every lookup. When the file only grew, the entry is extended by
+    scanning the appended tail. The least recently used entries are evicted to stay
+    under the memory budget.
+
+    Example Usage:
+    ```
+    LogParser.cache = ResultCache(max_bytes=16 * 1024 * 1024)
+    parser = LogParser()
+    parser.file_path = "logs/project.log"
+    parser.log_level = "ERROR"
+    list(parser.parse())  # Scans the file.
+    ```
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES) -> None:
+        """
+        Initialize an empty cache.
+
+        Args:
+            max_bytes (int): The memory budget of the cache in bytes.
+
+        Raises:
+            ValueError: If the memory budget is not positive.
+        """
+        if max_bytes < 1:
+            msg = f"The memory budget must be positive, but got `{max_bytes}`"
+            logger.debug(msg)
+            raise ValueError(msg)
+
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[Key, CacheEntry]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        """Return the number of cached entries."""
+        return len(self._entries)
+
+    def clear(self) -> None:
+        """Drop every cached entry."""
+        with self._lock:
+            self._entries.clear()
+            self.nbytes = 0
+
+    def _lookup(self, key: Key, file: BinaryIO) -> Optional[CacheEntry]:
+        """Return the valid entry of a key, marking it as recently used."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            if entry.identity.compare(file) == "replaced":
+                logger.debug(f"The cached file `{key[0]}` was replaced, dropping it.")
+                self._remove(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def _store(self, key: Key, entry: CacheEntry) -> None:
+        """Store an entry and evict the least recently used ones over the budget."""
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            if entry.nbytes > self.max_bytes:
+                logger.debug(f"The result of `{key[0]}` is larger than the cache.")
+                return
+
+            self._entries[key] = entry
+            self.nbytes += entry.nbytes
+            while self.nbytes > self.max_bytes:
+                evicted_key, evicted = self._entries.popitem(last=False)
+                logger.debug(f"Evicting the cached result of `{evicted_key[0]}`.")
+                self.nbytes -= evicted.nbytes
+
+    def _remove(self, key: Key) -> None:
+        """Remove an entry, the lock must be held."""
+        self.nbytes -= self._entries.pop(key).nbytes
+
+    def scan(
+        self,
+        file: BinaryIO,
+        path: Path,
+        token: bytes,
+        start: int = 0,
+        end: Optional[int] = None,
+    ) -> Generator[Tuple[int, bytes], None, None]:
+        """
+        Yield the lines containing a token, reading the cached offsets and scanning
+        only the part of the file that is not cached yet.
+
+        The result is stored once the scan reaches the end of the file, or the end
+        of a bounded scan. A trailing line without a newline is yielded but not
+        cached, since it may still be in the middle of being written.
+
+        Args:
+            file (BinaryIO): The log file opened in binary mode.
+            path (Path): The path of the log file.
+            token (bytes): The token to search, like the log level.
+            start (int): The byte offset of the first line to yield.
+            end (Optional[int]): The byte offset to stop the scan at. It must be a
+                line boundary, defaults to the end of the file. Only the part of the
+                file before it is scanned and cached.
+
+        Yields:
+            Tuple[int, bytes]: The byte offset of the matching line and its raw bytes.
+        """
+        stat = os.fstat(file.fileno())
+        key = (os.fspath(path), stat.st_dev, stat.st_ino, token)
+        entry = self._lookup(key=key, file=file)
+
+        offsets = entry.offsets if entry is not None else array("Q")
+        cached = entry.identity.size if entry is not None else 0
+        first = bisect_left(offsets, start)
+        stop = len(offsets) if end is None else bisect_left(offsets, end)
+        for offset in offsets[first:stop]:
+            file.seek(offset)
+            yield offset, file.readline()
+
+        complete = last_line_end(file=file, size=stat.st_size)
+        if end is not None:
+            complete = min(complete, end)
+        # The tail is kept apart until the scan completes, so an abandoned scan
+        # leaves the entry as it was.
+        tail = array("Q")
+        for offset, line in mmap_scan(file=file, token=token, start=cached, end=end):
+            if offset < complete:
+                tail.append(offset)
+            if offset >= start:
+                yield offset, line
+
+        if entry is not None and complete <= cached:
+            return
+        identity = FileIdentity.of(file=file, size=complete)
+        self._store(key=key, entry=CacheEntry(identity, offsets + tail))
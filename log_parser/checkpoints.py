@@ -0,0 +1,120 @@
+import logging
+from array import array
+from typing import BinaryIO, Optional, Tuple
+
+from .index import FileIdentity
+
+logger = logging.getLogger("core")
+
+# The number of matches between two checkpoints. Going to any match rescans at
+# most this many matches, and the index takes 8 bytes per this many matches.
+DEFAULT_INTERVAL = 1024
+
+
+class CheckpointIndex:
+    """
+    A sparse in-memory index of the matching lines of a log file, keeping the byte
+    offset of every `interval`-th match only.
+
+    Going to the Nth match seeks to the closest checkpoint before it and rescans
+    less than `interval` matches, so the index of a file with hundreds of millions
+    of matches stays below a megabyte.
+
+    Example Usage:
+    ```
+    checkpoints = CheckpointIndex(interval=1024)
+    for number, (offset, line) in enumerate(matches):
+        checkpoints.record(number=number, offset=offset)
+    number, offset = checkpoints.checkpoint(5000)  # 4096 and its offset
+    ```
+    """
+
+    def __init__(self, interval: int = DEFAULT_INTERVAL) -> None:
+        """
+        Initialize an empty index.
+
+        Args:
+            interval (int): The number of matches between two checkpoints.
+
+        Raises:
+            ValueError: If the interval is not positive.
+        """
+        if interval < 1:
+            msg = f"The checkpoint interval must be positive, but got `{interval}`"
+            logger.debug(msg)
+            raise ValueError(msg)
+
+        self.interval = interval
+        self.reset()
+
+    def reset(self) -> None:
+        """Forget every checkpoint, like when the file was replaced."""
+        self.offsets = array("Q")
+        # The number of matches known so far, all of them once `complete` is set.
+        self.count = 0
+        self.complete = False
+        self.identity: Optional[FileIdentity] = None
+
+    def sync(self, file: BinaryIO) -> str:
+        """
+        Check the index against the current state of the file. A grown file keeps
+        its checkpoints but may have new matches, while a truncated or replaced
+        file loses all of them.
+
+        Args:
+            file (BinaryIO): The log file opened in binary mode.
+
+        Returns:
+            str: `unchanged`, `grown` or `replaced`, like `FileIdentity.compare`.
+        """
+        state = "unchanged"
+        if self.identity is not None:
+            state = self.identity.compare(file=file)
+        if state == "replaced":
+            logger.debug("The log file was replaced, dropping its checkpoints.")
+            self.reset()
+        elif state == "grown":
+            self.complete = False
+        if self.identity is None or state != "unchanged":
+            self.identity = FileIdentity.of(file=file)
+        return state
+
+    def record(self, number: int, offset: int) -> None:
+        """
+        Record a match found by a scan, keeping its offset if it is the first match
+        not known yet and falls on a checkpoint.
+
+        Args:
+            number (int): The number of the match, counted from 0.
+            offset (int): The byte offset of the matching line.
+        """
+        if number == self.count:
+            if number % self.interval == 0:
+                self.offsets.append(offset)
+            self.count += 1
+
+    def finish(self, count: int) -> None:
+        """
+        Record that a scan reached the end of the file.
+
+        Args:
+            count (int): The total number of matches.
+        """
+        self.count = count
+        self.complete = True
+
+    def checkpoint(self, number: int) -> Tuple[int, int]:
+        """
+        Return the closest known checkpoint at or before a match.
+
+        Args:
+            number (int): The number of the match, counted from 0.
+
+        Returns:
+            Tuple[int, int]: The number of the match of the checkpoint and its byte
+                offset, or (0, 0) if there is no checkpoint yet.
+        """
+        position = min(number // self.interval, len(self.offsets) - 1)
+        if position < 0:
+            return 0, 0
+        return position * self.interval, self.offsets[position]
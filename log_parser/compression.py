@@ -0,0 +1,59 @@
+import bz2
+import gzip
+import logging
+import lzma
+from pathlib import Path
+from typing import Any, BinaryIO, Callable, Dict, Optional
+
+logger = logging.getLogger("core")
+
+# The magic bytes at the beginning of each supported compressed format.
+MAGIC_NUMBERS = {
+    b"\x1f\x8b": "gzip",
+    b"BZh": "bz2",
+    b"\xfd7zXZ\x00": "xz",
+}
+# The openers return binary file objects, which the type stubs do not declare as
+# `IO[bytes]`, so their results are typed by `open_decompressed` instead.
+OPENERS: Dict[str, Callable[..., Any]] = {
+    "gzip": gzip.open,
+    "bz2": bz2.open,
+    "xz": lzma.open,
+}
+
+
+def detect_compression(path: Path) -> Optional[str]:
+    """
+    Detect the compression format of a file from its magic bytes, whatever its
+    extension is.
+
+    Args:
+        path (Path): The path of the file.
+
+    Returns:
+        Optional[str]: `gzip`, `bz2` or `xz`, or None for an uncompressed file.
+    """
+    with path.open(mode="rb") as file:
+        head = file.read(max(len(magic) for magic in MAGIC_NUMBERS))
+
+    for magic, compression in MAGIC_NUMBERS.items():
+        if head.startswith(magic):
+            logger.debug(f"Detected {compression} compression for: {path}")
+            return compression
+    return None
+
+
+def open_decompressed(path: Path, compression: str) -> BinaryIO:
+    """
+    Open a compressed file as a binary stream of its decompressed content. The
+    content is decompressed on the fly while it is read.
+
+    Args:
+        path (Path): The path of the compressed file.
+        compression (str): The compression format, as detected by
+            `detect_compression`.
+
+    Returns:
+        BinaryIO: The decompressed binary stream.
+    """
+    return OPENERS[compression](path, mode="rb")
@@ -0,0 +1,440 @@
+import json
+import logging
+import os
+import re
+import sqlite3
+from datetime import datetime
+from pathlib import Path
+from typing import (
+    Any,
+    BinaryIO,
+    Generator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
+
+from painless.mixins import FileMixins
+from .compression import detect_compression, open_decompressed
+from .engines import decode_line, read_blocks, split_lines
+from .filters import And, Equals, Filter, Level, Matches, Not, Or
+from .index import FileIdentity, last_line_end
+from .records import LineFormat, LogFormat
+from .timerange import DEFAULT_DATE_FORMAT
+
+logger = logging.getLogger("core")
+
+# The fields of the log lines stored in their own columns, the other fields of the
+# format are only kept in the line.
+COLUMNS = ("asctime", "levelname", "module", "process", "thread", "message")
+# The number of rows inserted by one `executemany` call.
+BATCH_SIZE = 10_000
+# The number of rows inserted by one transaction, after which the offset of the
+# ingested lines is saved, so an interrupted ingest resumes from there.
+TRANSACTION_SIZE = 500_000
+
+SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS sources (
+    path TEXT PRIMARY KEY,
+    "offset" INTEGER NOT NULL,
+    identity TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS records (
+    id INTEGER PRIMARY KEY,
+    source TEXT NOT NULL,
+    "offset" INTEGER NOT NULL,
+    {", ".join(f"{column} TEXT" for column in COLUMNS)},
+    line TEXT NOT NULL
+);
+"""
+INDEXES = {
+    "records_source": 'records (source, "offset")',
+    "records_level": "records (levelname, asctime)",
+    "records_time": "records (asctime)",
+    "records_module": "records (module)",
+}
+
+
+def _regexp(pattern: str, value: Optional[str]) -> bool:
+    """The REGEXP function of SQLite, searching the pattern in the value."""
+    return value is not None and re.search(pattern, value) is not None
+
+
+class LogDatabase(FileMixins):
+    """
+    A local SQLite database of parsed log lines, for the logs that are queried
+    many times in different ways, like the logs of a postmortem.
+
+    The lines are ingested in large transactions of batched inserts, with the
+    database in the WAL mode. The indexes are created after the rows of a bulk
+    ingest are inserted, which is much faster than keeping them up to date row by
+    row. The database remembers the offset of the last ingested line of every
+    file, so ingesting a grown file again only reads the appended lines, and
+    ingesting a replaced or truncated file drops its old lines first.
+
+    The lines not following the log format, like the lines of tracebacks, are
+    kept without their fields, so they only match the queries on the whole line.
+    The timestamps are compared as text, which follows the time order of the
+    default date format.
+
+    Example Usage:
+    ```
+    with LogDatabase(db_path="logs/postmortem.db") as database:
+        database.ingest(file_path="logs/project.log")
+        for line in database.select(parse_query("level>=ERROR and module=db")):
+            print(line, end="")
+    ```
+    """
+
+    def __init__(
+        self, db_path: Union[Path, str], log_format: Optional[LineFormat] = None
+    ) -> None:
+        """
+        Open the database, creating it if it does not exist.
+
+        Args:
+            db_path (Union[Path, str]): The path of the SQLite database file.
+            log_format (Optional[LineFormat]): The format of the ingested lines,
+                defaults to the format of `logging.toml`.
+        """
+        self.db_path = self.convert_to_path(path=db_path)
+        self.log_format = log_format or LogFormat()
+        # The transactions are explicit, see `ingest`.
+        self.connection = sqlite3.connect(self.db_path, isolation_level=None)
+        self.connection.create_function("regexp", 2, _regexp, deterministic=True)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.executescript(SCHEMA)
+
+    def __enter__(self) -> "LogDatabase":
+        """Return the database itself, closed when the block exits."""
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        """Close the database."""
+        self.close()
+
+    def close(self) -> None:
+        """Close the connection to the database."""
+        self.connection.close()
+
+    def sources(self) -> List[Tuple[str, int]]:
+        """
+        Return the ingested files with the offset of the end of their ingested
+        lines.
+
+        Returns:
+            List[Tuple[str, int]]: The paths of the files and their offsets.
+        """
+        return self.connection.execute(
+            'SELECT path, "offset" FROM sources ORDER BY path'
+        ).fetchall()
+
+    def ingest(self, file_path: Union[Path, str]) -> int:
+        """
+        Ingest the complete lines of a log file added since its last ingest.
+
+        Compressed files can not be resumed, so they are ingested again as a whole
+        only when they changed.
+
+        Args:
+            file_path (Union[Path, str]): The path of the log file.
+
+        Returns:
+            int: The number of ingested lines.
+
+        Raises:
+            FileNotFoundError: If the log file does not exist.
+            PermissionError: If the log file can not be read.
+        """
+        path = self.convert_to_path(path=file_path).resolve()
+        source = str(path)
+        with path.open(mode="rb") as file:
+            compression = detect_compression(path=path)
+            offset = self._resume_offset(
+                source=source, file=file, resumable=compression is None
+            )
+            size = os.fstat(file.fileno()).st_size
+            if compression is None:
+                end = last_line_end(file=file, size=size)
+                if end <= offset:
+                    return 0
+                blocks = read_blocks(file=file, start=offset, end=end)
+                return self._insert(
+                    source=source, file=file, blocks=blocks, offset=offset, size=None
+                )
+            if offset:
+                return 0
+            with open_decompressed(path=path, compression=compression) as stream:
+                blocks = read_blocks(file=stream)
+                return self._insert(
+                    source=source, file=file, blocks=blocks, offset=0, size=size
+                )
+
+    def _resume_offset(self, source: str, file: BinaryIO, resumable: bool) -> int:
+        """
+        Find the offset to resume the ingest of a file from, dropping the lines of
+        the file if it was replaced or truncated since they were ingested.
+
+        Args:
+            source (str): The resolved path of the file.
+            file (BinaryIO): The file opened in binary mode.
+            resumable (bool): Whether the lines appended to the file can be
+                ingested on their own, which a compressed file can not.
+
+        Returns:
+            int: The offset of the first line to ingest.
+        """
+        row = self.connection.execute(
+            'SELECT "offset", identity FROM sources WHERE path = ?', (source,)
+        ).fetchone()
+        if row is None and resumable:
+            return 0
+        if row is not None:
+            offset, identity = row
+            state = FileIdentity(**json.loads(identity)).compare(file)
+            if state == "unchanged" or (state == "grown" and resumable):
+                return offset
+            logger.debug(f"The log file `{source}` changed, ingesting it again.")
+
+        # The source of a file that can not be resumed is only saved once it is
+        # completely ingested, so the lines of an interrupted ingest are dropped.
+        self.connection.execute("BEGIN")
+        self.connection.execute("DELETE FROM records WHERE source = ?", (source,))
+        self.connection.execute("DELETE FROM sources WHERE path = ?", (source,))
+        self.connection.execute("COMMIT")
+        return 0
+
+    def _insert(
+        self,
+        source: str,
+        file: BinaryIO,
+        blocks: Generator[bytes, None, None],
+        offset: int,
+        size: Optional[int],
+    ) -> int:
+        """
+        Insert the lines of the given blocks in batches, committing them every
+        `TRANSACTION_SIZE` lines with the offset of the end of the committed lines.
+        The offset of a file that can not be resumed, given with its `size`, is
+        only saved with the last lines.
+
+        Args:
+            source (str): The resolved path of the file.
+            file (BinaryIO): The file opened in binary mode, for its identity.
+            blocks (Generator[bytes, None, None]): The blocks of complete lines,
+                starting at the offset.
+            offset (int): The offset of the first line of the blocks.
+            size (Optional[int]): The number of bytes of the file covered by its
+                identity once ingested, defaults to the offset of the last line.
+
+        Returns:
+            int: The number of inserted lines.
+        """
+        # Rebuilding the indexes pays off when the table will at least double.
+        ingested = self.connection.execute(
+            'SELECT COALESCE(SUM("offset"), 0) FROM sources'
+        ).fetchone()[0]
+        if os.fstat(file.fileno()).st_size - offset >= ingested:
+            self._drop_indexes()
+
+        split = self.log_format.split
+        positions = [
+            self.log_format.fields.index(column)
+            if column in self.log_format.fields
+            else None
+            for column in COLUMNS
+        ]
+        empty = (None,) * len(COLUMNS)
+        statement = (
+            f'INSERT INTO records (source, "offset", {", ".join(COLUMNS)}, line) '
+            f"VALUES (?, ?, {', '.join('?' * len(COLUMNS))}, ?)"
+        )
+
+        inserted = uncommitted = 0
+        rows: List[Tuple[Any, ...]] = []
+        cursor = self.connection.cursor()
+        cursor.execute("BEGIN")
+        try:
+            for block in blocks:
+                for raw_line in split_lines(block):
+                    line = decode_line(raw_line, errors="replace")
+                    values = split(line.rstrip("\r\n"))
+                    if values is None:
+                        fields: Tuple[Any, ...] = empty
+                    else:
+                        fields = tuple(
+                            None if position is None else values[position]
+                            for position in positions
+                        )
+                    rows.append((source, offset, *fields, line))
+                    offset += len(raw_line)
+                    if len(rows) < BATCH_SIZE:
+                        continue
+                    cursor.executemany(statement, rows)
+                    inserted += len(rows)
+                    uncommitted += len(rows)
+                    rows.clear()
+                    if uncommitted >= TRANSACTION_SIZE:
+                        if size is None:
+                            self._save_offset(cursor, source, file, offset, size)
+                        cursor.execute("COMMIT")
+                        cursor.execute("BEGIN")
+                        uncommitted = 0
+            cursor.executemany(statement, rows)
+            inserted += len(rows)
+            self._save_offset(cursor, source, file, offset, size)
+            cursor.execute("COMMIT")
+        except BaseException:
+            cursor.execute("ROLLBACK")
+            raise
+        finally:
+            self._create_indexes()
+        logger.debug(f"Ingested {inserted} lines of `{source}` into `{self.db_path}`")
+        return inserted
+
+    @staticmethod
+    def _save_offset(
+        cursor: sqlite3.Cursor,
+        source: str,
+        file: BinaryIO,
+        offset: int,
+        size: Optional[int],
+    ) -> None:
+        """Save the offset of the end of the ingested lines of a file."""
+        identity = FileIdentity.of(file=file, size=offset if size is None else size)
+        cursor.execute(
+            'INSERT OR REPLACE INTO sources (path, "offset", identity) '
+            "VALUES (?, ?, ?)",
+            (source, offset, json.dumps(identity._asdict())),
+        )
+
+    def _drop_indexes(self) -> None:
+        """Drop the indexes before a bulk ingest."""
+        for name in INDEXES:
+            self.connection.execute(f"DROP INDEX IF EXISTS {name}")
+
+    def _create_indexes(self) -> None:
+        """Create the missing indexes, after the rows of a bulk ingest."""
+        for name, columns in INDEXES.items():
+            self.connection.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {columns}")
+
+    def select(
+        self,
+        expression: Optional[Filter] = None,
+        sources: Optional[Sequence[Union[Path, str]]] = None,
+        start_time: Optional[datetime] = None,
+        end_time: Optional[datetime] = None,
+        date_format: str = DEFAULT_DATE_FORMAT,
+        limit: Optional[int] = None,
+    ) -> Generator[str, None, None]:
+        """
+        Yield the ingested lines matching a filter expression, in the order they
+        were ingested.
+
+        Args:
+            expression (Optional[Filter]): The filter of the lines, like
+                `Level("ERROR")`, defaults to every line.
+            sources (Optional[Sequence[Union[Path, str]]]): The paths of the files
+                to select the lines of, defaults to every ingested file.
+            start_time (Optional[datetime]): The time of the first line.
+            end_time (Optional[datetime]): The time of the last line.
+            date_format (str): The format of the timestamps of the lines.
+            limit (Optional[int]): The maximum number of lines.
+
+        Yields:
+            str: The matching lines.
+
+        Raises:
+            ValueError: If the expression checks a field without a column.
+        """
+        where, parameters = self._where(
+            expression, sources, start_time, end_time, date_format
+        )
+        statement = f"SELECT line FROM records WHERE {where} ORDER BY id"
+        if limit is not None:
+            statement += " LIMIT ?"
+            parameters.append(limit)
+        for (line,) in self.connection.execute(statement, parameters):
+            yield line
+
+    def count(
+        self,
+        expression: Optional[Filter] = None,
+        sources: Optional[Sequence[Union[Path, str]]] = None,
+        start_time: Optional[datetime] = None,
+        end_time: Optional[datetime] = None,
+        date_format: str = DEFAULT_DATE_FORMAT,
+    ) -> int:
+        """
+        Count the ingested lines matching a filter expression, see `select`.
+
+        Returns:
+            int: The number of matching lines.
+        """
+        where, parameters = self._where(
+            expression, sources, start_time, end_time, date_format
+        )
+        statement = f"SELECT COUNT(*) FROM records WHERE {where}"
+        return self.connection.execute(statement, parameters).fetchone()[0]
+
+    def _where(
+        self,
+        expression: Optional[Filter],
+        sources: Optional[Sequence[Union[Path, str]]],
+        start_time: Optional[datetime],
+        end_time: Optional[datetime],
+        date_format: str,
+    ) -> Tuple[str, List[Any]]:
+        """Build the WHERE clause of a query with its parameters."""
+        conditions = []
+        parameters: List[Any] = []
+        if expression is not None:
+            conditions.append(self._condition(expression, parameters))
+        if sources is not None:
+            paths = [str(self.convert_to_path(path=path).resolve()) for path in sources]
+            conditions.append(f"source IN ({', '.join('?' * len(paths))})")
+            parameters.extend(paths)
+        if start_time is not None:
+            conditions.append("asctime >= ?")
+            parameters.append(start_time.strftime(date_format))
+        if end_time is not None:
+            conditions.append("asctime <= ?")
+            parameters.append(end_time.strftime(date_format))
+        return " AND ".join(conditions) or "1", parameters
+
+    def _condition(self, node: Filter, parameters: List[Any]) -> str:
+        """
+        Translate a filter expression into an SQL condition, adding its values to
+        the parameters. The lines without fields match no condition, even negated,
+        like in the compiled filters.
+        """
+        if isinstance(node, Level):
+            parameters.extend(node.levels)
+            placeholders = ", ".join("?" * len(node.levels))
+            if self.log_format.level_by_field:
+                # Like `is_level`, the levels of these formats are in any case.
+                return f"(UPPER(levelname) IN ({placeholders}))"
+            return f"(levelname IN ({placeholders}))"
+        if isinstance(node, Equals):
+            parameters.append(node.value)
+            return f"({self._column(node.name)} = ?)"
+        if isinstance(node, Matches):
+            parameters.append(node.pattern)
+            return f"({self._column(node.name)} REGEXP ?)"
+        if isinstance(node, (And, Or)):
+            operator = " AND " if isinstance(node, And) else " OR "
+            children = [self._condition(child, parameters) for child in node.children]
+            return f"({operator.join(children)})"
+        if isinstance(node, Not):
+            return f"(NOT {self._condition(node.child, parameters)})"
+        raise ValueError(f"Unknown filter: {node!r}")
+
+    @staticmethod
+    def _column(name: str) -> str:
+        """Return the column of a field, checking that there is one."""
+        if name not in COLUMNS:
+            raise ValueError(f"Valid fields are: {COLUMNS}, but got `{name}`")
+        return name
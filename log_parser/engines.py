@@ -0,0 +1,357 @@
+import mmap
+import os
+from collections import deque
+from pathlib import Path
+from time import perf_counter
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    BinaryIO,
+    Callable,
+    Deque,
+    Generator,
+    Iterable,
+    List,
+    Optional,
+    Tuple,
+    Union,
+)
+
+if TYPE_CHECKING:  # pragma: no cover
+    from concurrent.futures import Executor, Future, ProcessPoolExecutor
+
+DEFAULT_CHUNK_SIZE = 64 * 1024 * 1024  # 64 MB
+DEFAULT_BLOCK_SIZE = 4 * 1024 * 1024  # 4 MB
+
+
+def find_lines(
+    buffer: Union[bytes, mmap.mmap], token: bytes, start: int, end: int
+) -> Generator[Tuple[int, bytes], None, None]:
+    """
+    Find the lines of a buffer that contain the given token, without splitting the
+    buffer into lines.
+
+    Args:
+        buffer (Union[bytes, mmap.mmap]): The buffer to search in.
+        token (bytes): The byte sequence to search for.
+        start (int): The offset of the first line to search, a line boundary.
+        end (int): The offset to stop searching at, a line boundary.
+
+    Yields:
+        Tuple[int, bytes]: The offset of the matching line in the buffer and its
+            bytes, including the trailing newline if there is one.
+    """
+    position = start
+    while position < end:
+        hit = buffer.find(token, position, end)
+        if hit == -1:
+            return
+
+        newline = buffer.rfind(b"\n", position, hit)
+        line_start = position if newline == -1 else newline + 1
+        newline = buffer.find(b"\n", hit, end)
+        line_end = end if newline == -1 else newline + 1
+
+        yield line_start, buffer[line_start:line_end]
+        position = line_end
+
+
+def mmap_scan(
+    file: BinaryIO, token: bytes, start: int = 0, end: Optional[int] = None
+) -> Generator[Tuple[int, bytes], None, None]:
+    """
+    Scan a memory-mapped file for lines containing the given token.
+
+    The token is searched on the raw bytes with `mmap.find`, so lines that do not
+    contain it are skipped without ever being split or decoded.
+
+    Args:
+        file (BinaryIO): A file object opened in binary mode.
+        token (bytes): The byte sequence to search for.
+        start (int): The byte offset of the first line to scan.
+        end (Optional[int]): The byte offset to stop scanning at. It must be a line
+            boundary, defaults to the end of the file.
+
+    Yields:
+        Tuple[int, bytes]: The byte offset of the matching line and its raw bytes,
+            including the trailing newline if there is one.
+    """
+    size = os.fstat(file.fileno()).st_size
+    end = size if end is None else min(end, size)
+    # An empty file can not be memory-mapped.
+    if start >= end:
+        return
+
+    with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        yield from find_lines(buffer=mapped, token=token, start=start, end=end)
+
+
+def read_blocks(
+    file: Union[BinaryIO, mmap.mmap],
+    start: Optional[int] = None,
+    end: Optional[int] = None,
+    block_size: int = DEFAULT_BLOCK_SIZE,
+) -> Generator[bytes, None, None]:
+    """
+    Read a file in large blocks made of complete lines, for the scans that need
+    every line rather than the ones containing a token.
+
+    Args:
+        file (Union[BinaryIO, mmap.mmap]): A binary stream or a memory-mapped file.
+        start (Optional[int]): The byte offset of the first line to read, defaults
+            to the current position of the stream, which is then not seeked.
+        end (Optional[int]): The byte offset to stop reading at, a line boundary,
+            defaults to the end of the stream.
+        block_size (int): The number of bytes to read at a time.
+
+    Yields:
+        bytes: Blocks of complete lines. Only the last block may end without a
+            newline.
+    """
+    if start is not None:
+        file.seek(start)
+    remaining = None if end is None else end - (start or 0)
+    pending = b""
+    while remaining is None or remaining > 0:
+        size = block_size if remaining is None else min(block_size, remaining)
+        block = file.read(size)
+        if not block:
+            break
+        if remaining is not None:
+            remaining -= len(block)
+
+        pending += block
+        complete = pending.rfind(b"\n") + 1
+        if complete:
+            yield pending[:complete]
+            pending = pending[complete:]
+
+    if pending:
+        yield pending
+
+
+def split_lines(block: bytes) -> Generator[bytes, None, None]:
+    """
+    Split a block into its lines, keeping their newlines. Unlike
+    `bytes.splitlines`, only `\\n` ends a line, like in the other scans, so a
+    `\\r` or a form feed inside a line does not split it.
+
+    Args:
+        block (bytes): A block of lines, like the ones of read_blocks.
+
+    Yields:
+        bytes: The lines of the block. Only the last one may have no newline.
+    """
+    position = 0
+    size = len(block)
+    while position < size:
+        end = block.find(b"\n", position) + 1 or size
+        yield block[position:end]
+        position = end
+
+
+def decode_line(line: bytes, errors: str = "strict") -> str:
+    """
+    Decode a raw line, ending a CRLF line with `\\n`, like the text stream of the
+    `line` mode does, so every mode yields the same lines.
+
+    Args:
+        line (bytes): The raw line, with its newline if it has one.
+        errors (str): How to handle the bytes that are not valid UTF-8.
+
+    Returns:
+        str: The decoded line.
+    """
+    if line.endswith(b"\r\n"):
+        line = line[:-2] + b"\n"
+    return line.decode("utf-8", errors=errors)
+
+
+def stream_scan(
+    file: BinaryIO, token: bytes, block_size: int = DEFAULT_BLOCK_SIZE
+) -> Generator[Tuple[int, bytes], None, None]:
+    """
+    Scan a stream that can not be memory-mapped, like a decompressed file, for
+    lines containing the given token.
+
+    The stream is read in large blocks and the token is searched on each block
+    with `find`, so only the bytes of one block are held in memory at a time.
+
+    Args:
+        file (BinaryIO): A readable binary stream, scanned from its current position.
+        token (bytes): The byte sequence to search for.
+        block_size (int): The number of bytes to read at a time.
+
+    Yields:
+        Tuple[int, bytes]: The offset of the matching line in the stream, counted
+            from where the scan started, and its raw bytes.
+    """
+    offset = 0
+    for block in read_blocks(file=file, block_size=block_size):
+        for line_start, line in find_lines(block, token, 0, len(block)):
+            yield offset + line_start, line
+        offset += len(block)
+
+
+def split_ranges(
+    file: BinaryIO, chunk_size: int, start: int = 0, end: Optional[int] = None
+) -> Generator[Tuple[int, int], None, None]:
+    """
+    Split a file into byte ranges of roughly `chunk_size` bytes, aligned to line
+    boundaries so that no line is shared between two ranges.
+
+    Args:
+        file (BinaryIO): A seekable file object opened in binary mode.
+        chunk_size (int): The approximate size of each range in bytes.
+        start (int): The byte offset of the first line to split from.
+        end (Optional[int]): The byte offset to stop at, a line boundary, defaults
+            to the end of the file.
+
+    Yields:
+        Tuple[int, int]: The start and end offsets of each range.
+    """
+    size = os.fstat(file.fileno()).st_size
+    size = size if end is None else min(end, size)
+    while start < size:
+        boundary = start + chunk_size
+        if boundary >= size:
+            boundary = size
+        else:
+            # Move the boundary to the beginning of the next line.
+            file.seek(boundary - 1)
+            file.readline()
+            boundary = min(file.tell(), size)
+        yield start, boundary
+        start = boundary
+
+
+def _scan_range(
+    file_path: Path, token: bytes, start: int, end: int
+) -> List[Tuple[int, bytes]]:
+    """
+    Scan a single byte range of a file, meant to run inside a worker process.
+
+    Returns:
+        List[Tuple[int, bytes]]: The matching lines of the range with their offsets.
+    """
+    with file_path.open(mode="rb") as file:
+        return list(mmap_scan(file=file, token=token, start=start, end=end))
+
+
+def _profile_range(
+    file_path: Path, token: bytes, start: int, end: int
+) -> Tuple[List[Tuple[int, bytes]], Tuple[int, int, float, float]]:
+    """
+    Scan a single byte range of a file like `_scan_range`, timing the read and the
+    search of the range apart, meant to run inside a worker process.
+
+    Returns:
+        Tuple[List[Tuple[int, bytes]], Tuple[int, int, float, float]]: The matching
+            lines of the range, and its bytes, lines, read time and match time.
+    """
+    started = perf_counter()
+    with file_path.open(mode="rb") as file:
+        file.seek(start)
+        block = file.read(end - start)
+    read = perf_counter()
+    matches = [
+        (start + line_start, line)
+        for line_start, line in find_lines(block, token, 0, len(block))
+    ]
+    lines = block.count(b"\n") + (not block.endswith(b"\n"))
+    return matches, (len(block), lines, read - started, perf_counter() - read)
+
+
+def process_pool(workers: int) -> "ProcessPoolExecutor":
+    """
+    Start the pool of worker processes of a parallel scan. The pool is imported
+    here, since multiprocessing is slow to import and only the `parallel` mode,
+    the statistics and the sketches need it.
+
+    Args:
+        workers (int): The number of worker processes.
+
+    Returns:
+        ProcessPoolExecutor: The pool, to shut down once the scan is done.
+    """
+    from concurrent.futures import ProcessPoolExecutor
+
+    return ProcessPoolExecutor(max_workers=workers)
+
+
+def bounded_map(
+    executor: "Executor",
+    function: Callable[..., Any],
+    arguments: Iterable[Tuple[Any, ...]],
+    limit: int,
+) -> Generator[Any, None, None]:
+    """
+    Run a function on a pool for every tuple of arguments, with at most `limit`
+    calls in flight, so the results waiting to be read stay bounded.
+
+    Args:
+        executor (Executor): The pool running the calls.
+        function (Callable[..., Any]): The function, importable by the workers.
+        arguments (Iterable[Tuple[Any, ...]]): The arguments of every call.
+        limit (int): The maximum number of calls in flight.
+
+    Yields:
+        Any: The results of the calls, in the order of their arguments.
+    """
+    pending: Deque["Future"] = deque()
+    for call in arguments:
+        pending.append(executor.submit(function, *call))
+        if len(pending) >= limit:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+
+def parallel_scan(
+    file: BinaryIO,
+    file_path: Path,
+    token: bytes,
+    start: int = 0,
+    end: Optional[int] = None,
+    workers: Optional[int] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    metrics: Optional[Any] = None,
+) -> Generator[Tuple[int, bytes], None, None]:
+    """
+    Scan a file for lines containing the given token across a pool of processes.
+
+    The file is split into line-aligned ranges that are scanned concurrently, and
+    the matches are yielded in the original file order. Only `2 * workers` ranges
+    are in flight at a time, so memory stays bounded however large the file is.
+
+    Args:
+        file (BinaryIO): The file opened in binary mode, used to split the ranges.
+        file_path (Path): The path of the file, opened again by each worker.
+        token (bytes): The byte sequence to search for.
+        start (int): The byte offset of the first line to scan.
+        end (Optional[int]): The byte offset to stop scanning at, a line boundary,
+            defaults to the end of the file.
+        workers (Optional[int]): The number of worker processes, defaults to the
+            number of CPUs.
+        chunk_size (int): The approximate size of each range in bytes.
+        metrics (Optional[ScanMetrics]): The metrics to add the counters of every
+            range to, measured inside the workers, if the scan is profiled.
+
+    Yields:
+        Tuple[int, bytes]: The byte offset of the matching line and its raw bytes.
+    """
+    workers = workers or os.cpu_count() or 1
+    worker = _scan_range if metrics is None else _profile_range
+    ranges = split_ranges(file=file, chunk_size=chunk_size, start=start, end=end)
+    executor = process_pool(workers=workers)
+    try:
+        arguments = ((file_path, token, s, e) for s, e in ranges)
+        for result in bounded_map(executor, worker, arguments, 2 * workers):
+            if metrics is None:
+                yield from result
+                continue
+            matches, counters = result
+            metrics.add(*counters)
+            yield from matches
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
@@ -0,0 +1,446 @@
+import logging
+import mmap
+import os
+import re
+from typing import Any, BinaryIO, Dict, Generator, List, Optional, Tuple, Union
+
+from .engines import read_blocks
+from .records import LineFormat
+
+logger = logging.getLogger("core")
+
+# The log levels from the least to the most severe, for the `level>=` queries.
+LEVEL_ORDER = ("DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL")
+# The field names of the queries that stand for another field of the format.
+FIELD_ALIASES = {"level": "levelname"}
+# The characters that make a pattern more than a literal text.
+REGEX_SPECIALS = re.compile(r"[.^$*+?{}\[\]\\|()]")
+QUERY_TOKEN = re.compile(
+    r"""\s*(?:(?P<paren>[()])|(?P<op>>=|<=|!=|=|~)|"(?P<quoted>(?:[^"\\]|\\.)*)"|"""
+    r"""(?P<word>[^\s()=!<>~"]+))"""
+)
+
+
+class Filter:
+    """
+    The base class of the filter expressions, combined with `&`, `|` and `~` like
+    `Level("ERROR", "CRITICAL") & Equals("module", "db")`, or parsed from a query
+    like `level=ERROR|CRITICAL and module=db` by `parse_query`.
+    """
+
+    def __and__(self, other: "Filter") -> "Filter":
+        """Match the lines matching both filters."""
+        return And(self, other)
+
+    def __or__(self, other: "Filter") -> "Filter":
+        """Match the lines matching either filter."""
+        return Or(self, other)
+
+    def __invert__(self) -> "Filter":
+        """Match the lines not matching the filter."""
+        return Not(self)
+
+    def __eq__(self, other: object) -> bool:
+        """Compare two filters of the same kind by their attributes."""
+        if type(other) is not type(self):
+            return NotImplemented
+        return vars(self) == vars(other)
+
+    def __repr__(self) -> str:
+        """Return the representation of the filter with its attributes."""
+        values = ", ".join(repr(value) for value in vars(self).values())
+        return f"{type(self).__name__}({values})"
+
+
+class Level(Filter):
+    """The lines whose `levelname` field is one of the given levels."""
+
+    def __init__(self, *levels: str) -> None:
+        self.levels = tuple(level.upper() for level in levels)
+
+
+class Equals(Filter):
+    """The lines whose field is the given value, like the `module` or `process`."""
+
+    def __init__(self, name: str, value: str) -> None:
+        self.name = FIELD_ALIASES.get(name, name)
+        self.value = str(value)
+
+
+class Matches(Filter):
+    """The lines whose field contains a match of a regular expression."""
+
+    def __init__(self, name: str, pattern: str) -> None:
+        self.name = FIELD_ALIASES.get(name, name)
+        self.pattern = pattern
+
+
+class And(Filter):
+    """The lines matching every one of the filters."""
+
+    def __init__(self, *children: Filter) -> None:
+        self.children = children
+
+
+class Or(Filter):
+    """The lines matching any of the filters."""
+
+    def __init__(self, *children: Filter) -> None:
+        self.children = children
+
+
+class Not(Filter):
+    """The lines following the format that do not match the filter."""
+
+    def __init__(self, child: Filter) -> None:
+        self.child = child
+
+
+def parse_query(query: str) -> Filter:
+    """
+    Parse a query into a filter expression.
+
+    A query is made of conditions on the fields, combined with `and`, `or`, `not`
+    and parentheses, `and` binding tighter than `or`:
+    - `level=ERROR|CRITICAL`: the level is one of the given ones.
+    - `level>=WARNING` or `level<=INFO`: the level is at least or at most this one.
+    - `module=db`, `process!=42`: the field is, or is not, the given value.
+    - `message~"timed? out"`: the field contains a match of the regular expression.
+    Values containing spaces or parentheses are double-quoted.
+
+    Args:
+        query (str): The query, like `level>=WARNING and module=db`.
+
+    Returns:
+        Filter: The filter expression of the query.
+
+    Raises:
+        ValueError: If the query is not valid.
+    """
+    tokens = _tokenize_query(query)
+    position = 0
+
+    def peek() -> Optional[Tuple[str, str]]:
+        return tokens[position] if position < len(tokens) else None
+
+    def take() -> Tuple[str, str]:
+        nonlocal position
+        token = peek()
+        if token is None:
+            raise ValueError(f"The query ended unexpectedly: `{query}`")
+        position += 1
+        return token
+
+    def is_keyword(word: str) -> bool:
+        token = peek()
+        return token is not None and token[0] == "word" and token[1].lower() == word
+
+    def expression() -> Filter:
+        children = [term()]
+        while is_keyword("or"):
+            take()
+            children.append(term())
+        return children[0] if len(children) == 1 else Or(*children)
+
+    def term() -> Filter:
+        children = [factor()]
+        while is_keyword("and"):
+            take()
+            children.append(factor())
+        return children[0] if len(children) == 1 else And(*children)
+
+    def factor() -> Filter:
+        if is_keyword("not"):
+            take()
+            return Not(factor())
+        kind, value = take()
+        if (kind, value) == ("paren", "("):
+            inner = expression()
+            if take() != ("paren", ")"):
+                raise ValueError(f"A parenthesis is not closed: `{query}`")
+            return inner
+        if kind != "word":
+            raise ValueError(f"Expected a field name, got `{value}`: `{query}`")
+        operator_kind, operator = take()
+        value_kind, operand = take()
+        if operator_kind != "op" or value_kind not in ("word", "quoted"):
+            raise ValueError(f"Expected a condition on `{value}`: `{query}`")
+        return _condition(name=value.lower(), operator=operator, value=operand)
+
+    result = expression()
+    extra = peek()
+    if extra is not None:
+        raise ValueError(f"Unexpected `{extra[1]}` in the query: `{query}`")
+    return result
+
+
+def _tokenize_query(query: str) -> List[Tuple[str, str]]:
+    """Split a query into its parentheses, operators, words and quoted values."""
+    tokens = []
+    position = 0
+    query = query.rstrip()
+    while position < len(query):
+        match = QUERY_TOKEN.match(query, position)
+        if match is None:
+            raise ValueError(f"Invalid query at `{query[position:]}`: `{query}`")
+        kind = match.lastgroup or "word"
+        value = match.group(kind)
+        if kind == "quoted":
+            # Only the quotes and the backslashes are escaped, so the escapes of
+            # the regular expressions are kept.
+            value = re.sub(r'\\(["\\])', r"\1", value)
+        tokens.append((kind, value))
+        position = match.end()
+    return tokens
+
+
+def _condition(name: str, operator: str, value: str) -> Filter:
+    """Build the filter of a single condition of a query."""
+    field = FIELD_ALIASES.get(name, name)
+    if operator == "~":
+        try:
+            re.compile(value)
+        except re.error as error:
+            raise ValueError(f"Invalid regular expression `{value}`: {error}") from None
+        return Matches(field, value)
+
+    if field != "levelname":
+        if operator not in ("=", "!="):
+            raise ValueError(f"Only the level can be compared with `{operator}`")
+        condition: Filter = Equals(field, value)
+        return Not(condition) if operator == "!=" else condition
+
+    levels = [level.upper() for level in value.split("|")]
+    for level in levels:
+        if level not in LEVEL_ORDER:
+            raise ValueError(f"Valid levels are: {LEVEL_ORDER}, but got `{level}`")
+    if operator in (">=", "<="):
+        if len(levels) != 1:
+            raise ValueError(f"Only one level can be compared with `{operator}`")
+        rank = LEVEL_ORDER.index(levels[0])
+        if operator == ">=":
+            levels = list(LEVEL_ORDER[rank:])
+        else:
+            levels = list(LEVEL_ORDER[: rank + 1])
+    condition = Level(*levels)
+    return Not(condition) if operator == "!=" else condition
+
+
+class Matcher:
+    """
+    A filter expression compiled for a log format into a single function, which
+    splits a line once and checks every condition on its fields, and a literal
+    prefilter run on the raw bytes before it.
+
+    The prefilter is a set of literal texts, one of which every matching line
+    contains, like the levels of a level condition or the value of an equality.
+    The lines without any of them are skipped without being decoded or split.
+
+    Example Usage:
+    ```
+    matcher = Matcher(parse_query("level>=WARNING and module=db"), LogFormat())
+    with open("logs/project.log", mode="rb") as file:
+        for offset, line in matcher.scan(file):
+            print(line)
+    ```
+    """
+
+    def __init__(self, expression: Filter, log_format: LineFormat) -> None:
+        """
+        Compile a filter expression for a log format.
+
+        Args:
+            expression (Filter): The filter expression.
+            log_format (LineFormat): The format of the log lines.
+
+        Raises:
+            ValueError: If the expression checks a field the format does not have.
+        """
+        self.expression = expression
+        self.log_format = log_format
+
+        self._constants: Dict[str, Any] = {}
+        self._count = 0
+        source = self._source(expression)
+        code = (
+            "def match(line):\n"
+            f"    values = split(line, {self._count})\n"
+            f"    return values is not None and {source}\n"
+        )
+        namespace = dict(self._constants, split=log_format.split)
+        exec(compile(code, "<filter>", "exec"), namespace)
+        self.match = namespace["match"]
+        self.source = code
+
+        literals = self._literals(expression)
+        self.literals = None if literals is None else tuple(sorted(literals))
+        self.prefilter = None
+        if literals:
+            alternatives = sorted(literals, key=len, reverse=True)
+            self.prefilter = re.compile(b"|".join(map(re.escape, alternatives)))
+
+    def _constant(self, value: Any) -> str:
+        """Add a constant to the namespace of the function, returning its name."""
+        name = f"c{len(self._constants)}"
+        self._constants[name] = value
+        return name
+
+    def _field(self, name: str) -> str:
+        """Return the expression of the value of a field, splitting up to it."""
+        index = self.log_format.index(name)
+        self._count = max(self._count, index + 1)
+        return f"values[{index}]"
+
+    def _source(self, node: Filter) -> str:
+        """Return the Python expression checking a filter on the field values."""
+        if isinstance(node, Level):
+            levels = self._constant(frozenset(node.levels))
+            if self.log_format.level_by_field:
+                # Like `is_level`, the levels of these formats are in any case.
+                return f"({self._field('levelname')}.upper() in {levels})"
+            return f"({self._field('levelname')} in {levels})"
+        if isinstance(node, Equals):
+            return f"({self._field(node.name)} == {node.value!r})"
+        if isinstance(node, Matches):
+            search = self._constant(re.compile(node.pattern).search)
+            return f"({search}({self._field(node.name)}) is not None)"
+        if isinstance(node, And):
+            return "(" + " and ".join(map(self._source, node.children)) + ")"
+        if isinstance(node, Or):
+            return "(" + " or ".join(map(self._source, node.children)) + ")"
+        if isinstance(node, Not):
+            return f"(not {self._source(node.child)})"
+        raise ValueError(f"Unknown filter: {node!r}")
+
+    def _literals(self, node: Filter) -> Optional[frozenset]:
+        """
+        Return the literal texts one of which every line matching a filter
+        contains, or None if there are no such texts.
+        """
+        if isinstance(node, Level):
+            tokens = frozenset(map(self.log_format.level_token, node.levels))
+            return None if b"" in tokens else tokens
+        if isinstance(node, Equals):
+            return frozenset([node.value.encode("utf-8")]) if node.value else None
+        if isinstance(node, Matches):
+            if node.pattern and not REGEX_SPECIALS.search(node.pattern):
+                return frozenset([node.pattern.encode("utf-8")])
+            return None
+        if isinstance(node, And):
+            # Any child will do, the one with the fewest and longest texts is the
+            # most selective.
+            candidates = [
+                literals
+                for literals in map(self._literals, node.children)
+                if literals is not None
+            ]
+            if not candidates:
+                return None
+            return min(
+                candidates,
+                key=lambda literals: (len(literals), -min(map(len, literals))),
+            )
+        if isinstance(node, Or):
+            union: frozenset = frozenset()
+            for child in node.children:
+                literals = self._literals(child)
+                if literals is None:
+                    return None
+                union |= literals
+            return union
+        return None
+
+    def find(
+        self, buffer: Union[bytes, mmap.mmap], start: int, end: int
+    ) -> Generator[Tuple[int, bytes], None, None]:
+        """
+        Find the matching lines of a buffer, running the prefilter on the raw
+        bytes and the fused function on the lines it lets through.
+
+        Args:
+            buffer (Union[bytes, mmap.mmap]): The buffer to search in.
+            start (int): The offset of the first line to search, a line boundary.
+            end (int): The offset to stop searching at, a line boundary.
+
+        Yields:
+            Tuple[int, bytes]: The offset of the matching line in the buffer and its
+                bytes, including the trailing newline if there is one.
+        """
+        match = self.match
+        prefilter = self.prefilter
+        position = start
+        while position < end:
+            if prefilter is None:
+                hit = position
+            else:
+                found = prefilter.search(buffer, position, end)
+                if found is None:
+                    return
+                hit = found.start()
+
+            newline = buffer.rfind(b"\n", position, hit)
+            line_start = position if newline == -1 else newline + 1
+            newline = buffer.find(b"\n", hit, end)
+            line_end = end if newline == -1 else newline + 1
+
+            line = buffer[line_start:line_end]
+            if match(line.decode("utf-8", errors="replace")):
+                yield line_start, line
+            position = line_end
+
+    def scan(
+        self, file: BinaryIO, start: int = 0, end: Optional[int] = None
+    ) -> Generator[Tuple[int, bytes], None, None]:
+        """
+        Scan a memory-mapped file for the matching lines.
+
+        Args:
+            file (BinaryIO): A file object opened in binary mode.
+            start (int): The byte offset of the first line to scan.
+            end (Optional[int]): The byte offset to stop scanning at, a line
+                boundary, defaults to the end of the file.
+
+        Yields:
+            Tuple[int, bytes]: The byte offset of the matching line and its raw bytes.
+        """
+        size = os.fstat(file.fileno()).st_size
+        end = size if end is None else min(end, size)
+        if start >= end:
+            return
+
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            yield from self.find(buffer=mapped, start=start, end=end)
+
+    def stream_scan(self, file: BinaryIO) -> Generator[Tuple[int, bytes], None, None]:
+        """
+        Scan a stream that can not be memory-mapped, like a decompressed file, for
+        the matching lines, in large blocks.
+
+        Args:
+            file (BinaryIO): A readable binary stream, scanned from its position.
+
+        Yields:
+            Tuple[int, bytes]: The offset of the matching line in the stream, counted
+                from where the scan started, and its raw bytes.
+        """
+        offset = 0
+        for block in read_blocks(file=file):
+            for line_start, line in self.find(buffer=block, start=0, end=len(block)):
+                yield offset + line_start, line
+            offset += len(block)
+
+
+def compile_filter(expression: Union[Filter, str], log_format: LineFormat) -> Matcher:
+    """
+    Compile a filter expression, or a query, for a log format.
+
+    Args:
+        expression (Union[Filter, str]): The filter expression or its query.
+        log_format (LineFormat): The format of the log lines.
+
+    Returns:
+        Matcher: The compiled filter.
+    """
+    if isinstance(expression, str):
+        expression = parse_query(expression)
+    return Matcher(expression=expression, log_format=log_format)
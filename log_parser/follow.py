@@ -0,0 +1,99 @@
+import logging
+import os
+import time
+from pathlib import Path
+from typing import BinaryIO, Generator, Tuple
+
+from .engines import find_lines
+
+logger = logging.getLogger("core")
+
+READ_SIZE = 1024 * 1024  # 1 MB
+
+
+def _is_rotated(file: BinaryIO, file_path: Path) -> bool:
+    """
+    Check whether the path now points to another file than the opened one, which
+    is what a `RotatingFileHandler` does when it renames the log file.
+    """
+    try:
+        stat = file_path.stat()
+    except FileNotFoundError:
+        # The old file was renamed and the new one is not created yet.
+        return False
+    opened = os.fstat(file.fileno())
+    return (stat.st_dev, stat.st_ino) != (opened.st_dev, opened.st_ino)
+
+
+def follow_scan(
+    file_path: Path,
+    token: bytes,
+    start: int = 0,
+    poll_interval: float = 0.05,
+    max_poll_interval: float = 1.0,
+) -> Generator[Tuple[int, bytes], None, None]:
+    """
+    Follow a log file like `tail -F`, yielding the lines containing the given token
+    as they are appended, and never ending by itself.
+
+    Only complete lines are yielded while the file is written to. When the path
+    is rotated (it points to a new inode) the rest of the old file is read before
+    switching to the new one, so no line is lost or duplicated, and when the file
+    is truncated in place it is read again from the beginning.
+
+    The standard library offers no portable file change notification, so the file
+    is polled, but the interval backs off exponentially from `poll_interval` to
+    `max_poll_interval` while the file is idle and resets as soon as data arrives.
+
+    Args:
+        file_path (Path): The path of the log file.
+        token (bytes): The byte sequence to search for.
+        start (int): The byte offset to start following the first file from.
+        poll_interval (float): The initial wait in seconds when there is no data.
+        max_poll_interval (float): The longest wait in seconds between two checks.
+
+    Yields:
+        Tuple[int, bytes]: The byte offset of the matching line in its file and its
+            raw bytes.
+    """
+    file = file_path.open(mode="rb")
+    try:
+        file.seek(start)
+        offset = start
+        pending = b""
+        interval = poll_interval
+        while True:
+            chunk = file.read(READ_SIZE)
+            if chunk:
+                interval = poll_interval
+                pending += chunk
+                complete = pending.rfind(b"\n") + 1
+                for line_start, line in find_lines(pending, token, 0, complete):
+                    yield offset + line_start, line
+                offset += complete
+                pending = pending[complete:]
+                continue
+
+            if _is_rotated(file=file, file_path=file_path):
+                # Lines may have been appended between the last read and the
+                # rotation, and the old file is complete now, so read the rest of
+                # it including a trailing line without a newline.
+                pending += file.read()
+                for line_start, line in find_lines(pending, token, 0, len(pending)):
+                    yield offset + line_start, line
+                logger.debug(f"The followed file `{file_path}` was rotated.")
+                file.close()
+                file = file_path.open(mode="rb")
+                offset, pending = 0, b""
+                continue
+
+            if os.fstat(file.fileno()).st_size < offset + len(pending):
+                logger.debug(f"The followed file `{file_path}` was truncated.")
+                file.seek(0)
+                offset, pending = 0, b""
+                continue
+
+            time.sleep(interval)
+            interval = min(interval * 2, max_poll_interval)
+    finally:
+        file.close()
@@ -0,0 +1,279 @@
+import json
+import logging
+import os
+import zlib
+from array import array
+from bisect import bisect_left
+from pathlib import Path
+from typing import (
+    BinaryIO,
+    Dict,
+    Generator,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
+
+from painless.mixins import FileMixins
+from .engines import read_blocks
+
+logger = logging.getLogger("core")
+
+HEAD_SIZE = 1024
+
+
+class FileIdentity(NamedTuple):
+    """
+    The identity of a log file, used to find out whether the file is still the same
+    file, has only grown since, or was truncated or replaced.
+    """
+
+    device: int
+    inode: int
+    size: int
+    mtime: int
+    # The CRC32 of the first bytes of the file, protecting against reused inodes.
+    head: int
+
+    @classmethod
+    def of(cls, file: BinaryIO, size: Optional[int] = None) -> "FileIdentity":
+        """
+        Build the identity of an opened file.
+
+        Args:
+            file (BinaryIO): A seekable file object opened in binary mode.
+            size (Optional[int]): The number of bytes that the identity covers,
+                defaults to the current size of the file.
+
+        Returns:
+            FileIdentity: The identity of the file.
+        """
+        stat = os.fstat(file.fileno())
+        size = stat.st_size if size is None else size
+        return cls(
+            device=stat.st_dev,
+            inode=stat.st_ino,
+            size=size,
+            mtime=stat.st_mtime_ns,
+            head=_head_checksum(file=file, size=size),
+        )
+
+    def compare(self, file: BinaryIO) -> str:
+        """
+        Compare the identity with the current state of a file.
+
+        Args:
+            file (BinaryIO): A seekable file object opened in binary mode.
+
+        Returns:
+            str: `unchanged` if the file is the same, `grown` if bytes were only
+                appended to it, or `replaced` if it was truncated or replaced.
+        """
+        stat = os.fstat(file.fileno())
+        if (stat.st_dev, stat.st_ino) != (self.device, self.inode):
+            return "replaced"
+        if stat.st_size < self.size:
+            return "replaced"
+        if _head_checksum(file=file, size=self.size) != self.head:
+            return "replaced"
+        if stat.st_size == self.size:
+            # The same size with another mtime means it was rewritten in place.
+            return "unchanged" if stat.st_mtime_ns == self.mtime else "replaced"
+        return "grown"
+
+
+def _head_checksum(file: BinaryIO, size: int) -> int:
+    """Return the CRC32 of the first bytes of the file, up to `size` bytes."""
+    file.seek(0)
+    return zlib.crc32(file.read(min(size, HEAD_SIZE)))
+
+
+def last_line_end(file: BinaryIO, size: int) -> int:
+    """
+    Find the end of the last complete line of a file.
+
+    Args:
+        file (BinaryIO): A seekable file object opened in binary mode.
+        size (int): The size of the file.
+
+    Returns:
+        int: The offset right after the last newline, or 0 if there is none.
+    """
+    block_size = 64 * 1024
+    end = size
+    while end > 0:
+        start = max(0, end - block_size)
+        file.seek(start)
+        newline = file.read(end - start).rfind(b"\n")
+        if newline != -1:
+            return start + newline + 1
+        end = start
+    return 0
+
+
+class OffsetIndex(FileMixins):
+    """
+    A persistent sidecar index storing the byte offsets of the lines of each log
+    level in a log file.
+
+    The index is saved in a hidden file next to the log file (`.project.log.idx`
+    for `project.log`), together with the identity of the file it was built for.
+    It is extended when the log file only grew and rebuilt when it was truncated
+    or replaced.
+
+    Example Usage:
+    ```
+    index = OffsetIndex(file_path="logs/project.log", levels=LogParser.valid_levels)
+    with index.file_path.open(mode="rb") as file:
+        for offset, line in index.scan(file=file, level="ERROR"):
+            print(offset, line)
+    ```
+    """
+
+    def __init__(self, file_path: Union[Path, str], levels: Sequence[str]) -> None:
+        """
+        Initialize the index of a log file.
+
+        Args:
+            file_path (Union[Path, str]): The path of the log file.
+            levels (Sequence[str]): The log levels to index.
+        """
+        self.file_path = self.convert_to_path(path=file_path)
+        self.levels = tuple(levels)
+        self.identity: Optional[FileIdentity] = None
+        self.offsets: Dict[str, array] = self._empty_offsets()
+
+    @property
+    def index_path(self) -> Path:
+        """
+        The path of the sidecar index file.
+
+        Returns:
+            Path: The sidecar path next to the log file.
+        """
+        return self.file_path.with_name(f".{self.file_path.name}.idx")
+
+    def _empty_offsets(self) -> Dict[str, array]:
+        """Return an empty offset array for every indexed level."""
+        return {level: array("Q") for level in self.levels}
+
+    def load(self) -> None:
+        """
+        Load the sidecar index from the disk. A missing or corrupted sidecar is
+        ignored, leaving the index empty.
+        """
+        try:
+            with self.index_path.open(mode="rb") as index_file:
+                header = json.loads(index_file.readline())
+                offsets = self._empty_offsets()
+                for level in self.levels:
+                    offsets[level].fromfile(index_file, header["counts"][level])
+                self.identity = FileIdentity(**header["identity"])
+                self.offsets = offsets
+        except (OSError, ValueError, KeyError, TypeError, EOFError) as error:
+            logger.debug(f"Ignoring the sidecar index `{self.index_path}`: {error}")
+            self.reset()
+
+    def save(self) -> None:
+        """
+        Write the index to the sidecar file. The file is written to a temporary
+        path first and moved in place, so readers never see a partial index.
+        """
+        if self.identity is None:
+            return
+
+        header = {
+            "identity": self.identity._asdict(),
+            "counts": {level: len(self.offsets[level]) for level in self.levels},
+        }
+        # The temporary path is unique to the process, so concurrent saves do not
+        # write to the same file.
+        temp_path = self.index_path.with_name(
+            f"{self.index_path.name}.{os.getpid()}.tmp"
+        )
+        try:
+            with temp_path.open(mode="wb") as index_file:
+                index_file.write(json.dumps(header).encode("utf-8") + b"\n")
+                for level in self.levels:
+                    self.offsets[level].tofile(index_file)
+            os.replace(temp_path, self.index_path)
+        except OSError as error:
+            logger.debug(f"Could not save the index `{self.index_path}`: {error}")
+
+    def reset(self) -> None:
+        """Drop every indexed offset."""
+        self.identity = None
+        self.offsets = self._empty_offsets()
+
+    def scan(
+        self,
+        file: BinaryIO,
+        level: str,
+        start: int = 0,
+        end: Optional[int] = None,
+    ) -> Generator[Tuple[int, bytes], None, None]:
+        """
+        Yield the lines of a log level, using the index where it is valid and
+        scanning only the part of the file that is not indexed yet.
+
+        The newly scanned part is read once, every line being recorded for each
+        level it contains, and the sidecar is saved once the scan completes. A
+        trailing line without a newline is yielded but not indexed, since it may
+        still be in the middle of being written.
+
+        Args:
+            file (BinaryIO): The log file opened in binary mode.
+            level (str): The log level to yield the lines of.
+            start (int): The byte offset of the first line to yield.
+            end (Optional[int]): The byte offset to stop at, a line boundary,
+                defaults to the end of the file. The file is only indexed up to
+                there, the rest of it is indexed by the next scan reaching it.
+
+        Yields:
+            Tuple[int, bytes]: The byte offset of the matching line and its raw bytes.
+        """
+        self.load()
+        if self.identity is not None and self.identity.compare(file) == "replaced":
+            logger.debug(f"The log file `{self.file_path}` was replaced, reindexing.")
+            self.reset()
+
+        indexed = self.identity.size if self.identity is not None else 0
+        offsets = self.offsets[level]
+        first = bisect_left(offsets, start)
+        stop = len(offsets) if end is None else bisect_left(offsets, end)
+        for offset in offsets[first:stop]:
+            file.seek(offset)
+            yield offset, file.readline()
+
+        size = os.fstat(file.fileno()).st_size
+        scan_end = size if end is None else min(end, size)
+        complete = min(last_line_end(file=file, size=size), scan_end)
+        if scan_end <= indexed:
+            return
+
+        tokens = [
+            (other_level.encode("utf-8"), self.offsets[other_level])
+            for other_level in self.levels
+        ]
+        token = level.encode("utf-8")
+        block_offset = indexed
+        for block in read_blocks(file=file, start=indexed, end=scan_end):
+            line_start = 0
+            while line_start < len(block):
+                line_end = block.find(b"\n", line_start) + 1 or len(block)
+                line = block[line_start:line_end]
+                offset = block_offset + line_start
+                if offset < complete:
+                    for other_token, other_offsets in tokens:
+                        if other_token in line:
+                            other_offsets.append(offset)
+                if offset >= start and token in line:
+                    yield offset, line
+                line_start = line_end
+            block_offset += len(block)
+
+        if complete > indexed or self.identity is None:
+            self.identity = FileIdentity.of(file=file, size=complete)
+            self.save()
@@ -0,0 +1,392 @@
+import json
+import logging
+import os
+import re
+from array import array
+from pathlib import Path
+from typing import (
+    Any,
+    BinaryIO,
+    Dict,
+    Generator,
+    Iterable,
+    List,
+    NamedTuple,
+    Optional,
+    Set,
+    Tuple,
+    Union,
+)
+
+from painless.mixins import FileMixins
+from .engines import mmap_scan, read_blocks, split_lines
+from .index import FileIdentity, last_line_end
+
+logger = logging.getLogger("core")
+
+TOKEN_PATTERN = re.compile(rb"[0-9A-Za-z_]+")
+# The largest byte range indexed into one segment, which bounds the memory of a
+# build. The last segment is rebuilt with the appended lines until it is full.
+SEGMENT_SIZE = 64 * 1024 * 1024  # 64 MB
+
+
+def tokenize(text: Union[str, bytes]) -> Set[bytes]:
+    """
+    Split a text into its lowercase keyword tokens, the runs of letters, digits
+    and underscores, so `order_id=12345` gives `order_id` and `12345`.
+
+    Args:
+        text (Union[str, bytes]): The text of a line or of a query.
+
+    Returns:
+        Set[bytes]: The distinct tokens of the text.
+    """
+    if isinstance(text, str):
+        text = text.encode("utf-8")
+    return set(TOKEN_PATTERN.findall(text.lower()))
+
+
+def encode_postings(offsets: Iterable[int], base: int) -> bytes:
+    """
+    Compress an ascending list of line offsets into the varints of the gaps
+    between them, most of which take one or two bytes.
+
+    Args:
+        offsets (Iterable[int]): The ascending offsets.
+        base (int): The offset the first gap is counted from.
+
+    Returns:
+        bytes: The encoded postings.
+    """
+    encoded = bytearray()
+    previous = base
+    for offset in offsets:
+        gap = offset - previous
+        previous = offset
+        while gap >= 0x80:
+            encoded.append((gap & 0x7F) | 0x80)
+            gap >>= 7
+        encoded.append(gap)
+    return bytes(encoded)
+
+
+def decode_postings(encoded: bytes, base: int) -> array:
+    """
+    Decode the postings compressed by `encode_postings`.
+
+    Args:
+        encoded (bytes): The encoded postings.
+        base (int): The offset the first gap is counted from.
+
+    Returns:
+        array: The ascending offsets.
+    """
+    offsets = array("Q")
+    previous = base
+    gap = shift = 0
+    for byte in encoded:
+        gap |= (byte & 0x7F) << shift
+        if byte & 0x80:
+            shift += 7
+            continue
+        previous += gap
+        offsets.append(previous)
+        gap = shift = 0
+    return offsets
+
+
+class Segment(NamedTuple):
+    """
+    The postings of the lines of a byte range of a log file, as stored in the
+    sidecar: where its postings start in the sidecar, and for every token the
+    position and the length of its postings.
+    """
+
+    start: int
+    end: int
+    identity: FileIdentity
+    position: int
+    terms: Dict[str, Tuple[int, int]]
+
+
+class KeywordIndex(FileMixins):
+    """
+    A persistent sidecar inverted index mapping the keyword tokens of the lines
+    of a log file to the compressed lists of their byte offsets.
+
+    The index is saved in a hidden file next to the log file (`.project.log.kwx`
+    for `project.log`) as a sequence of segments, each covering a byte range of
+    the file with the identity of the file it was built for. Only the lines
+    appended since the last build are indexed, and the whole index is dropped
+    when the file was truncated or replaced.
+
+    A query intersects the postings of its keywords and of the log level, as a
+    token, and reads only the lines of the intersection.
+
+    Example Usage:
+    ```
+    index = KeywordIndex(file_path="logs/project.log")
+    with index.file_path.open(mode="rb") as file:
+        for offset, line in index.search(file, keywords=["order_id", "12345"]):
+            print(offset, line)
+    ```
+    """
+
+    def __init__(self, file_path: Union[Path, str]) -> None:
+        """
+        Initialize the index of a log file.
+
+        Args:
+            file_path (Union[Path, str]): The path of the log file.
+        """
+        self.file_path = self.convert_to_path(path=file_path)
+        self.segments: List[Segment] = []
+
+    @property
+    def index_path(self) -> Path:
+        """
+        The path of the sidecar index file.
+
+        Returns:
+            Path: The sidecar path next to the log file.
+        """
+        return self.file_path.with_name(f".{self.file_path.name}.kwx")
+
+    @property
+    def indexed(self) -> int:
+        """The offset of the end of the indexed lines."""
+        return self.segments[-1].end if self.segments else 0
+
+    def load(self) -> None:
+        """
+        Load the segment headers of the sidecar, not their postings. A segment
+        that was only partly written is ignored with the ones after it.
+        """
+        self.segments = []
+        try:
+            with self.index_path.open(mode="rb") as index_file:
+                size = os.fstat(index_file.fileno()).st_size
+                while True:
+                    header_line = index_file.readline()
+                    if not header_line:
+                        break
+                    header = json.loads(header_line)
+                    position = index_file.tell()
+                    if position + header["size"] > size:
+                        raise ValueError("the last segment is incomplete")
+                    self.segments.append(
+                        Segment(
+                            start=header["start"],
+                            end=header["end"],
+                            identity=FileIdentity(**header["identity"]),
+                            position=position,
+                            terms={
+                                term: (start, length)
+                                for term, (start, length) in header["terms"].items()
+                            },
+                        )
+                    )
+                    index_file.seek(position + header["size"])
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError, KeyError, TypeError) as error:
+            logger.debug(f"Ignoring the rest of the index `{self.index_path}`: {error}")
+
+    def reset(self) -> None:
+        """Drop the whole index, from the memory and from the disk."""
+        self.segments = []
+        try:
+            self.index_path.unlink()
+        except FileNotFoundError:
+            pass
+        except OSError as error:
+            logger.debug(f"Could not remove the index `{self.index_path}`: {error}")
+
+    def update(self, file: BinaryIO) -> None:
+        """
+        Bring the index up to date with the complete lines of the log file,
+        indexing only the appended lines, or everything if the file was replaced.
+
+        Args:
+            file (BinaryIO): The log file opened in binary mode.
+        """
+        self.load()
+        if self.segments and self.segments[-1].identity.compare(file) == "replaced":
+            logger.debug(f"The log file `{self.file_path}` was replaced, reindexing.")
+            self.reset()
+
+        size = os.fstat(file.fileno()).st_size
+        complete = last_line_end(file=file, size=size)
+        if complete <= self.indexed:
+            return
+
+        # Rebuild the last segment with the appended lines while it is not full,
+        # so growing files do not end up with many tiny segments.
+        keep = len(self.segments)
+        if keep and self.segments[-1].end - self.segments[-1].start < SEGMENT_SIZE:
+            keep -= 1
+        start = self.segments[keep].start if keep < len(self.segments) else self.indexed
+
+        try:
+            with self.index_path.open(mode="r+b" if keep else "wb") as out:
+                # Drop the rebuilt segment and any partly written one after it.
+                out.seek(self._header_start(keep))
+                out.truncate()
+                while start < complete:
+                    end = min(start + SEGMENT_SIZE, complete)
+                    end = self._line_boundary(file=file, offset=end, limit=complete)
+                    self._write_segment(file=file, out=out, start=start, end=end)
+                    start = end
+        except OSError as error:
+            logger.debug(f"Could not save the index `{self.index_path}`: {error}")
+        self.load()
+
+    def _header_start(self, number: int) -> int:
+        """Return the position of the header of a segment in the sidecar."""
+        if number == 0:
+            return 0
+        previous = self.segments[number - 1]
+        return previous.position + sum(length for _, length in previous.terms.values())
+
+    @staticmethod
+    def _line_boundary(file: BinaryIO, offset: int, limit: int) -> int:
+        """Move an offset to the beginning of the next line, up to a limit."""
+        if offset >= limit:
+            return limit
+        file.seek(offset - 1)
+        file.readline()
+        return min(file.tell(), limit)
+
+    def _write_segment(
+        self, file: BinaryIO, out: BinaryIO, start: int, end: int
+    ) -> None:
+        """
+        Index the lines of a byte range of the log file and append the segment to
+        the sidecar.
+
+        Args:
+            file (BinaryIO): The log file opened in binary mode.
+            out (BinaryIO): The sidecar opened for writing at its end.
+            start (int): The offset of the first line of the range.
+            end (int): The offset of the end of the range, a line boundary.
+        """
+        postings: Dict[bytes, array] = {}
+        offset = start
+        for block in read_blocks(file=file, start=start, end=end):
+            for line in split_lines(block):
+                for token in set(TOKEN_PATTERN.findall(line.lower())):
+                    offsets = postings.get(token)
+                    if offsets is None:
+                        offsets = postings[token] = array("Q")
+                    offsets.append(offset)
+                offset += len(line)
+
+        terms: Dict[str, Any] = {}
+        blobs = []
+        position = 0
+        for token, offsets in postings.items():
+            encoded = encode_postings(offsets=offsets, base=start)
+            terms[token.decode("ascii")] = (position, len(encoded))
+            blobs.append(encoded)
+            position += len(encoded)
+
+        header = {
+            "start": start,
+            "end": end,
+            "identity": FileIdentity.of(file=file, size=end)._asdict(),
+            "terms": terms,
+            "size": position,
+        }
+        out.write(json.dumps(header).encode("utf-8") + b"\n")
+        out.writelines(blobs)
+
+    def postings(self, token: bytes) -> array:
+        """
+        Read the offsets of the lines containing a token, from every segment.
+
+        Args:
+            token (bytes): A lowercase keyword token.
+
+        Returns:
+            array: The ascending offsets of the lines.
+        """
+        offsets = array("Q")
+        term = token.decode("ascii")
+        with self.index_path.open(mode="rb") as index_file:
+            for segment in self.segments:
+                found = segment.terms.get(term)
+                if found is None:
+                    continue
+                index_file.seek(segment.position + found[0])
+                encoded = index_file.read(found[1])
+                offsets.extend(decode_postings(encoded=encoded, base=segment.start))
+        return offsets
+
+    def _postings_size(self, token: bytes) -> int:
+        """Return the encoded size of the postings of a token, in every segment."""
+        term = token.decode("ascii")
+        return sum(segment.terms.get(term, (0, 0))[1] for segment in self.segments)
+
+    def search(
+        self,
+        file: BinaryIO,
+        keywords: Iterable[str],
+        level: Optional[str] = None,
+        start: int = 0,
+        end: Optional[int] = None,
+    ) -> Generator[Tuple[int, bytes], None, None]:
+        """
+        Yield the lines containing every keyword, and the log level if one is
+        given, updating the index first.
+
+        The keywords match whole tokens, whatever their case, so only their
+        postings are intersected. The level is checked on the lines read, as
+        written anywhere in the line like in the other scans, so `DB_ERROR` matches
+        the `ERROR` level although it is another token. The trailing line
+        without a newline is not indexed and is checked on its own.
+
+        Args:
+            file (BinaryIO): The log file opened in binary mode.
+            keywords (Iterable[str]): The keywords, split into tokens.
+            level (Optional[str]): The log level the lines must contain.
+            start (int): The byte offset of the first line to yield.
+            end (Optional[int]): The byte offset to stop yielding lines at,
+                defaults to the end of the file.
+
+        Yields:
+            Tuple[int, bytes]: The byte offset of the matching line and its raw bytes.
+        """
+        self.update(file=file)
+        tokens = set()
+        for keyword in keywords:
+            tokens |= tokenize(keyword)
+        token = b"" if level is None else level.encode("utf-8")
+
+        if not tokens:
+            yield from mmap_scan(file=file, token=token, start=start, end=end)
+            return
+
+        indexed = self.indexed
+        hits: Optional[Set[int]] = None
+        if self.segments:
+            # Intersected from the shortest postings, read only while any offset
+            # is left, so the long postings are often never read.
+            for word in sorted(tokens, key=self._postings_size):
+                offsets = self.postings(token=word)
+                hits = set(offsets) if hits is None else hits.intersection(offsets)
+                if not hits:
+                    break
+        for offset in sorted(hits or ()):
+            if offset < start or (end is not None and offset >= end):
+                continue
+            file.seek(offset)
+            line = file.readline()
+            if token in line:
+                yield offset, line
+
+        if end is not None and end <= indexed:
+            return
+        # The lines after the index, only a trailing partial line once updated.
+        for offset, line in mmap_scan(file=file, token=token, start=indexed, end=end):
+            if offset >= start and tokens <= tokenize(line):
+                yield offset, line
@@ -1,10 +1,48 @@
 import logging
+import mmap
+import os
+import sys
+from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Generator
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    BinaryIO,
+    Callable,
+    Generator,
+    Iterable,
+    Iterator,
+    Optional,
+    Tuple,
+    Union,
+)
 
 from painless.mixins import FileMixins
+from .checkpoints import DEFAULT_INTERVAL, CheckpointIndex
+from .compression import detect_compression, open_decompressed
+from .engines import (
+    DEFAULT_CHUNK_SIZE,
+    decode_line,
+    mmap_scan,
+    parallel_scan,
+    read_blocks,
+    stream_scan,
+)
+from .records import LineFormat, LogEntry, LogFormat
+from .timerange import DEFAULT_DATE_FORMAT, line_time, time_range
+from .rotation import rotation_family
 from .utils.messages import ErrorMessages
 
+# The modules of the optional features are imported where they are used, so a
+# plain scan, like the one of the interactive mode, starts without them.
+if TYPE_CHECKING:
+    from .cache import ResultCache
+    from .filters import Filter, Matcher
+    from .metrics import ScanMetrics
+    from .sketches import LogSketch
+    from .stats import LogStats
+    from .templates import TemplateMiner
+
 logger = logging.getLogger("core")
 
 
@@ -15,6 +53,56 @@ class LogParser(FileMixins):
     """
 
     valid_levels = ("DEBUG", "INFO", "ERROR", "WARNING", "CRITICAL")
+    valid_modes = ("line", "mmap", "parallel")
+
+    # Settings of the `parallel` mode: the number of worker processes (defaults to
+    # the number of CPUs) and the approximate size of each scanned chunk in bytes.
+    workers: Optional[int] = None
+    chunk_size: int = DEFAULT_CHUNK_SIZE
+
+    # Keep a sidecar index of the line offsets of every level next to the log file,
+    # so repeated queries jump straight to the matching lines.
+    use_index: bool = False
+
+    # Only keep the lines containing every one of these keywords, as whole tokens
+    # whatever their case. With `use_keyword_index`, the lines are found through a
+    # sidecar inverted index of the tokens of the file instead of a full scan.
+    keywords: Tuple[str, ...] = ()
+    use_keyword_index: bool = False
+
+    # An in-process cache of the offsets of the matching lines, shared by every
+    # parser it is set on, so repeated queries only scan what was appended since.
+    cache: Optional["ResultCache"] = None
+
+    # Keep following the log file like `tail -F` instead of ending at its end.
+    follow: bool = False
+
+    # Parse the matching lines into structured records of the log format, checking
+    # the level by its field instead of anywhere in the line. A format setting
+    # `level_by_field`, like `JsonFormat`, always checks the level by its field.
+    structured: bool = False
+    log_format: LineFormat = LogFormat()
+
+    # Only parse the lines between these times, both included. The log file must be
+    # written in timestamp order, so the range is found by a binary search.
+    start_time: Optional[datetime] = None
+    end_time: Optional[datetime] = None
+    date_format: str = DEFAULT_DATE_FORMAT
+
+    # Gather the metrics of the scans into `metrics`, reporting them to the hook
+    # after every chunk when one is set. The scans are not instrumented otherwise.
+    profile: bool = False
+    metrics_hook: Optional[Callable[["ScanMetrics"], None]] = None
+    metrics: Optional["ScanMetrics"] = None
+
+    # The number of matches between two checkpoints of the navigation methods.
+    checkpoint_interval: int = DEFAULT_INTERVAL
+
+    # The offset of the next unread byte of the current file in the byte modes.
+    _offset = 0
+    _mode = "line"
+    _rotation = False
+    _query: Optional["Filter"] = None
 
     @property
     def file_path(self) -> Path:
@@ -27,17 +115,43 @@ class LogParser(FileMixins):
         return self._file_path
 
     @file_path.setter
-    def file_path(self, value: str) -> None:
+    def file_path(self, value: Union[Path, str]) -> None:
         """
         Setter for the file_path attribute. Convert the provided file_path
         to a path object.
 
         Args:
-            value (str): The new file_path.
+            value (Union[Path, str]): The new file_path.
         """
         self._file_path = self.convert_to_path(path=value)
+        self._reset_scan()
+        self._reset_navigation()
         logger.debug(f"User provided file path for logging: {value}")
 
+    @property
+    def rotation(self) -> bool:
+        """
+        The property for the rotation. The file path is then treated as a rotation
+        family, either a base path whose rotated files are `<name>.1` to `<name>.N`
+        or a glob pattern, parsed as one stream.
+
+        Returns:
+            bool: Whether the file path is a rotation family, False by default.
+        """
+        return self._rotation
+
+    @rotation.setter
+    def rotation(self, value: bool) -> None:
+        """
+        Setter for the rotation attribute.
+
+        Args:
+            value (bool): The new rotation.
+        """
+        self._rotation = value
+        self._reset_scan()
+        logger.debug(f"User set the rotation to: {self._rotation}")
+
     @property
     def log_level(self) -> str:
         """
@@ -69,31 +183,1006 @@ class LogParser(FileMixins):
             raise ValueError(msg)
 
         self._log_level = value.upper()
+        self._reset_navigation()
         logger.debug(f"User set the log level to: {self._log_level}")
 
+    @property
+    def mode(self) -> str:
+        """
+        The property for the scan mode.
+
+        Returns:
+            str: The scan mode, `line` by default.
+        """
+        return self._mode
+
+    @mode.setter
+    def mode(self, value: str) -> None:
+        """
+        Setter for the scan mode attribute. Validates that the provided mode is valid.
+
+        Args:
+            value (str): The new scan mode.
+
+        Raises:
+            ValueError: If the provided mode is not in the valid_modes attribute.
+        """
+        if value.lower() not in self.valid_modes:
+            msg = ErrorMessages.INVALID_MODE.format(
+                valid_modes=self.valid_modes, value=value
+            )
+            logger.debug(msg)
+            raise ValueError(msg)
+
+        self._mode = value.lower()
+        self._reset_scan()
+        logger.debug(f"User set the scan mode to: {self._mode}")
+
+    @property
+    def query(self) -> Optional["Filter"]:
+        """
+        The property for the filter expression, which replaces the log level when
+        it is set.
+
+        Returns:
+            Optional[Filter]: The filter expression, None by default.
+        """
+        return self._query
+
+    @query.setter
+    def query(self, value: Union["Filter", str, None]) -> None:
+        """
+        Setter for the filter expression attribute. Parses the provided query, like
+        `level>=WARNING and module=db`, see `parse_query`.
+
+        Args:
+            value (Union[Filter, str, None]): The new filter expression or its query.
+
+        Raises:
+            ValueError: If the provided query is not valid.
+        """
+        if isinstance(value, str):
+            from .filters import parse_query
+
+            try:
+                value = parse_query(value)
+            except ValueError as error:
+                msg = str(error)
+                logger.debug(msg)
+                raise ValueError(msg) from None
+
+        self._query = value
+        self._reset_navigation()
+        logger.debug(f"User set the query to: {self._query!r}")
+
     def parse(self) -> Generator:
         """
         Lazily parses the log file and yields lines matching the specified log level.
 
+        The scan engine is selected by the `mode` attribute. In the `line` mode every
+        line is decoded and checked, while in the `mmap` mode the file is
+        memory-mapped and only the lines containing the log level are decoded. The
+        `parallel` mode scans line-aligned chunks of the file in worker processes
+        and yields the matches in the original file order.
+
+        When `use_index` is set, the lines are read through the sidecar offset index
+        of the file, whatever the mode is, and likewise through the in-process
+        result `cache` when one is set. When `follow` is set, the generator never
+        ends: it waits for new lines to be appended and follows the log file across
+        rotations. When `rotation` is set, the file path is treated as a rotation
+        family and its members are parsed one after another, from the oldest to the
+        newest.
+
+        Files compressed with gzip, bz2 or xz are detected by their magic bytes and
+        decompressed on the fly, in large blocks, whatever the mode is.
+
+        When `keywords` are set, only the lines containing all of them are kept,
+        found through the sidecar inverted index when `use_keyword_index` is set.
+
+        When a `query` is set, it replaces the log level: it is compiled once for the
+        `log_format` into a single function checking every condition on the split
+        fields, run only on the lines containing one of its literal texts, like the
+        levels of a level condition. The file is then scanned on its raw bytes.
+
+        When `structured` is set, the lines are checked by their `levelname` field
+        in the `log_format` and yielded as structured records. The lines of a format
+        setting `level_by_field`, like JSON lines, are always checked by their
+        `levelname` field, so a message containing the log level does not match.
+
+        When `start_time` or `end_time` is set, the byte range of the time window is
+        found by a binary search on the timestamps and only that range is scanned,
+        on the raw bytes even in the `line` mode. Compressed and followed files can
+        not be searched, so their lines are checked one by one instead.
+
+        When `profile` is set or a `metrics_hook` is given, the bytes read, the
+        lines scanned, the matches and the time spent reading, decoding and
+        matching are counted in `metrics`. The byte scans then read the file in
+        blocks, so these times can be told apart, while the indexes and the cache
+        count only the lines they look up.
+
         Yields:
-            str: Log lines matching the specified log level.
+            str | LogEntry: Log lines matching the specified log level, or their
+                records in the structured mode.
         """
+        if self.metrics is None and (self.profile or self.metrics_hook is not None):
+            from .metrics import ScanMetrics
+
+            self.metrics = ScanMetrics(hook=self.metrics_hook)
+
         try:
-            # Check that is the log file is opened before and is it saved or not. This
-            # is for preventing the file to be reopened every time the next() is
-            # called on the generator.
-            if not hasattr(self, "_log_file"):
-                self._log_file = self.file_path.open(mode="r", encoding="utf-8")
+            # Save the files left to parse, so calling parse() again resumes from the
+            # file and the position the previous generator stopped at.
+            if not hasattr(self, "_members"):
+                if self.rotation:
+                    self._members = rotation_family(path=self.file_path)
+                else:
+                    self._members = [self.file_path]
 
-            for line in self._log_file:
-                if self.log_level in line:
-                    logger.debug("User goes to next line of the log file.")
-                    yield line
+            while self._members:
+                path = self._members[0]
+                timed = self.start_time is not None or self.end_time is not None
+                if hasattr(self, "_stream") or detect_compression(path=path):
+                    lines = self._parse_compressed(path=path)
+                    lines = self._parse_time_window(lines) if timed else lines
+                elif self.follow and len(self._members) == 1:
+                    lines = self._parse_follow(path=path)
+                    lines = self._parse_time_window(lines) if timed else lines
+                elif (
+                    timed
+                    or self.query is not None
+                    or self.use_keyword_index
+                    or self.use_index
+                    or self.cache is not None
+                    or self.mode in ("mmap", "parallel")
+                ):
+                    lines = self._parse_bytes(path=path)
+                else:
+                    lines = self._parse_lines(path=path)
+
+                if self.keywords:
+                    lines = self._parse_keywords(lines=lines)
+                if self.structured:
+                    lines = self._parse_records(lines=lines)
+                elif self.log_format.level_by_field:
+                    lines = self._parse_levels(lines=lines)
+                yield from lines
+
+                self._members.pop(0)
+                self._offset = 0
+                if hasattr(self, "_stream"):
+                    del self._stream
+        except FileNotFoundError:
+            print(ErrorMessages.WRONG_PATH)
+            logger.info(ErrorMessages.WRONG_PATH_LOG.format(path=self.file_path))
+        except PermissionError:
+            print(ErrorMessages.NO_PERMISSION)
+            logger.info(ErrorMessages.NO_PERMISSION_LOG.format(path=self.file_path))
+
+    def stats(self, bucket_size: timedelta = timedelta(minutes=1)) -> "LogStats":
+        """
+        Count the lines of the log file by time bucket, level, module and process
+        in a single pass, whatever the log level is.
+
+        The file is read with the engine of the `mode`: in large blocks in the
+        `line` mode, from the memory-mapped file in the `mmap` mode, or in chunks
+        across worker processes in the `parallel` mode. The rotation family and the
+        time window are honored, like in parse().
+
+        Args:
+            bucket_size (timedelta): The size of the time buckets.
+
+        Returns:
+            LogStats: The statistics of the log file.
+        """
+        from .stats import LogStats
+
+        stats = LogStats(
+            log_format=self.log_format,
+            date_format=self.date_format,
+            bucket_size=bucket_size,
+        )
+        try:
+            if self.rotation:
+                paths = rotation_family(path=self.file_path)
+            else:
+                paths = [self.file_path]
+            for path in paths:
+                self._collect_stats(stats=stats, path=path)
+        except FileNotFoundError:
+            print(ErrorMessages.WRONG_PATH)
+            logger.info(ErrorMessages.WRONG_PATH_LOG.format(path=self.file_path))
+        except PermissionError:
+            print(ErrorMessages.NO_PERMISSION)
+            logger.info(ErrorMessages.NO_PERMISSION_LOG.format(path=self.file_path))
+        return stats
+
+    def sketch(
+        self,
+        capacity: int = 1000,
+        precision: int = 14,
+        sample_size: int = 10,
+        seed: Optional[int] = None,
+    ) -> "LogSketch":
+        """
+        Summarize the lines matching the log level in a fixed memory, whatever the
+        size of the log file: the most frequent messages, the number of distinct
+        modules and processes, and a uniform sample of the lines.
+
+        The summaries are approximate, see `LogSketch` for their error bounds. In
+        the `parallel` mode every chunk is summarized in a worker process and the
+        summaries are merged. The rotation family and the time window are honored,
+        like in parse().
+
+        Args:
+            capacity (int): The number of message counters.
+            precision (int): The precision of the distinct counts.
+            sample_size (int): The number of sampled lines.
+            seed (Optional[int]): The seed of the sample, for reproducible samples.
+
+        Returns:
+            LogSketch: The summaries of the matching lines.
+        """
+        from .sketches import LogSketch
+
+        # The lines of a query were already checked by its own conditions.
+        sketch = LogSketch(
+            log_format=self.log_format,
+            level=None if self.query is not None else self.log_level,
+            capacity=capacity,
+            precision=precision,
+            sample_size=sample_size,
+            seed=seed,
+        )
+        try:
+            if self.rotation:
+                paths = rotation_family(path=self.file_path)
+            else:
+                paths = [self.file_path]
+            for path in paths:
+                self._collect_sketch(sketch=sketch, path=path, seed=seed)
+        except FileNotFoundError:
+            print(ErrorMessages.WRONG_PATH)
+            logger.info(ErrorMessages.WRONG_PATH_LOG.format(path=self.file_path))
+        except PermissionError:
+            print(ErrorMessages.NO_PERMISSION)
+            logger.info(ErrorMessages.NO_PERMISSION_LOG.format(path=self.file_path))
+        return sketch
+
+    def templates(self, max_templates: int = 1000) -> "TemplateMiner":
+        """
+        Group the lines matching the log level into message templates, so a storm
+        of nearly identical lines collapses into one line with its count and its
+        first and last timestamps.
+
+        The lines are read in a scan of their own, so the position of parse() and
+        of the navigation methods is kept. The rotation family and the time window
+        are honored, like in parse().
+
+        Args:
+            max_templates (int): The maximum number of templates kept.
+
+        Returns:
+            TemplateMiner: The templates of the matching lines.
+        """
+        from .templates import TemplateMiner
+
+        # The lines of a query were already checked by its own conditions.
+        miner = TemplateMiner(
+            log_format=self.log_format,
+            max_templates=max_templates,
+            level=None if self.query is not None else self.log_level,
+        )
+        try:
+            if self.rotation:
+                paths = rotation_family(path=self.file_path)
+            else:
+                paths = [self.file_path]
+            for path in paths:
+                miner.update(self._matching_lines(path=path))
         except FileNotFoundError:
             print(ErrorMessages.WRONG_PATH)
             logger.info(ErrorMessages.WRONG_PATH_LOG.format(path=self.file_path))
         except PermissionError:
             print(ErrorMessages.NO_PERMISSION)
             logger.info(ErrorMessages.NO_PERMISSION_LOG.format(path=self.file_path))
+        return miner
+
+    def goto(self, number: int) -> Optional[Any]:
+        """
+        Go to a matching line by its number, independently of parse().
+
+        The byte offset of every `checkpoint_interval`-th match is kept in a sparse
+        checkpoint index while scanning, so going to any match already scanned
+        seeks to the closest checkpoint and rescans less than the interval. Going
+        forward from the current match continues the current scan instead.
+
+        Args:
+            number (int): The number of the matching line, counted from 0.
+
+        Returns:
+            str | LogEntry | None: The matching line, or its record in the
+                structured mode, or None if there is no such match.
+
+        Raises:
+            ValueError: If the file is compressed or a rotation family, which can
+                not be seeked.
+        """
+        path = self.file_path
+        if self.rotation or detect_compression(path=path):
+            msg = ErrorMessages.NO_NAVIGATION
+            logger.debug(msg)
+            raise ValueError(msg)
+
+        # The checkpoints of another filter number other matches, start over.
+        if getattr(self, "_checkpoints_key", None) != self._navigation_key():
+            self._reset_navigation()
+            self._checkpoints = CheckpointIndex(interval=self.checkpoint_interval)
+            self._checkpoints_key = self._navigation_key()
+        with path.open(mode="rb") as file:
+            # The scan of a grown file would stop at its old end, restart it.
+            if self._checkpoints.sync(file=file) != "unchanged":
+                self._close_cursor()
+
+        if number < 0:
+            return None
+        if self._checkpoints.complete and number >= self._checkpoints.count:
+            return None
+
+        checkpoint, offset = self._checkpoints.checkpoint(number)
+        current = getattr(self, "_cursor_number", None)
+        if current is None or not checkpoint <= current < number:
+            self._close_cursor()
+            self._cursor = self._navigate(path=path, number=checkpoint, offset=offset)
+            self._cursor_number = checkpoint - 1
+
+        for self._cursor_number, line in self._cursor:
+            if self._cursor_number == number:
+                self._position = number
+                return line
+
+        self._close_cursor()
+        return None
+
+    def first(self) -> Optional[Any]:
+        """Go to the first matching line, see goto()."""
+        return self.goto(0)
+
+    def last(self) -> Optional[Any]:
+        """
+        Go to the last matching line, see goto(). The matches after the last
+        checkpoint are scanned once to count them, and again when the file grows.
+        """
+        # Scan up to the end of the file, unless the count of the matches is known.
+        self.goto(sys.maxsize)
+        return self.goto(self._checkpoints.count - 1)
+
+    def next_match(self) -> Optional[Any]:
+        """Go to the matching line after the current one, see goto()."""
+        return self.goto(getattr(self, "_position", -1) + 1)
+
+    def previous_match(self) -> Optional[Any]:
+        """Go to the matching line before the current one, see goto()."""
+        return self.goto(getattr(self, "_position", 0) - 1)
+
+    @property
+    def position(self) -> Optional[int]:
+        """
+        The number of the current matching line of the navigation methods.
+
+        Returns:
+            Optional[int]: The number, counted from 0, or None before any move.
+        """
+        return getattr(self, "_position", None)
+
+    def _navigate(self, path: Path, number: int, offset: int) -> Generator:
+        """
+        Scan the matches of a log file from a checkpoint, numbering them and
+        recording their checkpoints.
+
+        Args:
+            path (Path): The path of the log file.
+            number (int): The number of the match at the checkpoint.
+            offset (int): The byte offset of the checkpoint.
+
+        Yields:
+            Tuple[int, Any]: The number of every match and its line or record.
+        """
+        with path.open(mode="rb") as file:
+            start, end = self._byte_range(file=file)
+            matches = self._scan_bytes(
+                file=file,
+                path=path,
+                start=max(offset, start),
+                end=end,
+                parallel=False,
+            )
+            for match_offset, raw_line in matches:
+                line: Any = decode_line(raw_line)
+                if self.keywords and not self._has_keywords(line=line):
+                    continue
+                if self.structured:
+                    line = self._to_record(line=line)
+                    if line is None:
+                        continue
+                elif self.log_format.level_by_field and not self._is_level(line=line):
+                    continue
+                self._checkpoints.record(number=number, offset=match_offset)
+                yield number, line
+                number += 1
+            self._checkpoints.finish(count=number)
+
+    def _reset_scan(self) -> None:
+        """
+        Close the scan saved by the previous calls to parse(), so the next call
+        starts over with the new file path, rotation or mode.
+        """
+        for name in ("_log_file", "_stream", "_follower"):
+            if hasattr(self, name):
+                getattr(self, name).close()
+                delattr(self, name)
+        if hasattr(self, "_members"):
+            del self._members
+        self._offset = 0
+
+    def _navigation_key(self) -> Tuple[Any, ...]:
+        """
+        Return the settings selecting the matches of the navigation methods, so
+        their checkpoints are dropped when any of them changes.
+        """
+        return (
+            getattr(self, "_log_level", None),
+            self.query,
+            self.keywords,
+            self.structured,
+            self.log_format,
+            self.start_time,
+            self.end_time,
+            self.date_format,
+            self.checkpoint_interval,
+        )
+
+    def _reset_navigation(self) -> None:
+        """
+        Drop the checkpoints, the scan and the position of the navigation methods,
+        so the next move starts over with the new file path or filter.
+        """
+        self._close_cursor()
+        for name in ("_checkpoints", "_checkpoints_key", "_position"):
+            if hasattr(self, name):
+                delattr(self, name)
+
+    def _close_cursor(self) -> None:
+        """Close the scan of the navigation methods, if any."""
+        if hasattr(self, "_cursor"):
+            self._cursor.close()
+            del self._cursor
+            del self._cursor_number
+
+    def _collect_stats(self, stats: "LogStats", path: Path) -> None:
+        """
+        Count the lines of a single log file into the given statistics.
+
+        Args:
+            stats (LogStats): The statistics to count the lines into.
+            path (Path): The path of the log file.
+        """
+        compression = detect_compression(path=path)
+        if compression is not None:
+            with open_decompressed(path=path, compression=compression) as file:
+                if self.start_time is None and self.end_time is None:
+                    stats.update_blocks(read_blocks(file=file))
+                    return
+                # A decompressed stream can not be searched, so the time window is
+                # checked line by line.
+                lines = (
+                    line.decode("utf-8", errors="replace")
+                    for block in read_blocks(file=file)
+                    for line in block.split(b"\n")
+                    if line
+                )
+                stats.update(self._parse_time_window(lines))
+            return
+
+        with path.open(mode="rb") as file:
+            start, end = 0, os.fstat(file.fileno()).st_size
+            if self.start_time is not None or self.end_time is not None:
+                start, end = time_range(
+                    file=file,
+                    log_format=self.log_format,
+                    start_time=self.start_time,
+                    end_time=self.end_time,
+                    date_format=self.date_format,
+                )
+            if start >= end:
+                return
+
+            if self.mode == "parallel":
+                from .stats import parallel_stats
+
+                parallel_stats(
+                    stats=stats,
+                    file_path=path,
+                    start=start,
+                    end=end,
+                    workers=self.workers,
+                    chunk_size=self.chunk_size,
+                )
+            elif self.mode == "mmap":
+                with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                    stats.update_blocks(read_blocks(file=mapped, start=start, end=end))
+            else:
+                stats.update_blocks(read_blocks(file=file, start=start, end=end))
+
+    def _collect_sketch(
+        self, sketch: "LogSketch", path: Path, seed: Optional[int] = None
+    ) -> None:
+        """
+        Summarize the matching lines of a single log file into the given sketch.
+
+        Args:
+            sketch (LogSketch): The sketch to add the matching lines to.
+            path (Path): The path of the log file.
+            seed (Optional[int]): The seed of the samples of the worker processes.
+        """
+        parallel = self.mode == "parallel" and not self.use_index and not self.keywords
+        if self.query is not None:
+            parallel = False
+        if not parallel or self.cache is not None or detect_compression(path=path):
+            sketch.update(self._matching_lines(path=path))
+            return
+
+        with path.open(mode="rb") as file:
+            start, end = self._byte_range(file=file)
+            if end is None:
+                end = os.fstat(file.fileno()).st_size
+        if start < end:
+            from .sketches import parallel_sketch
+
+            parallel_sketch(
+                sketch=sketch,
+                file_path=path,
+                level=self.log_level,
+                start=start,
+                end=end,
+                workers=self.workers,
+                chunk_size=self.chunk_size,
+                seed=seed,
+            )
+
+    def _matching_lines(self, path: Path) -> Generator:
+        """
+        Scan the matching lines of a single log file from its beginning, apart
+        from the persistent scan of parse().
+
+        Args:
+            path (Path): The path of the log file.
+
+        Yields:
+            str: Log lines matching the specified log level.
+        """
+        compression = detect_compression(path=path)
+        if compression is not None:
+            with open_decompressed(path=path, compression=compression) as file:
+                matches: Iterator[Tuple[int, bytes]]
+                if self.query is not None:
+                    matches = self._compiled().stream_scan(file=file)
+                else:
+                    token = self.log_format.level_token(self.log_level)
+                    matches = stream_scan(file=file, token=token)
+                lines = (self._decode(line) for _, line in matches)
+                if self.start_time is not None or self.end_time is not None:
+                    lines = self._parse_time_window(lines)
+                if self.keywords:
+                    lines = self._parse_keywords(lines=lines)
+                if self.log_format.level_by_field:
+                    lines = self._parse_levels(lines=lines)
+                for line in lines:
+                    yield line
+            return
+
+        with path.open(mode="rb") as file:
+            start, end = self._byte_range(file=file)
+            matches = self._scan_bytes(file=file, path=path, start=start, end=end)
+            lines = (self._decode(line) for _, line in matches)
+            if self.keywords:
+                lines = self._parse_keywords(lines=lines)
+            if self.log_format.level_by_field:
+                lines = self._parse_levels(lines=lines)
+            for line in lines:
+                yield line
+
+    def _parse_time_window(self, lines: Iterable[str]) -> Generator:
+        """
+        Keep the lines between the start and the end times, for the files that can
+        not be searched. The lines without a timestamp are dropped.
+
+        Args:
+            lines (Iterable[str]): The lines containing the log level.
+
+        Yields:
+            str: The lines inside the time window.
+        """
+        for line in lines:
+            timestamp = line_time(
+                line=line, log_format=self.log_format, date_format=self.date_format
+            )
+            if timestamp is None:
+                continue
+            if self.start_time is not None and timestamp < self.start_time:
+                continue
+            if self.end_time is not None and timestamp > self.end_time:
+                return
+            yield line
+
+    def _parse_records(self, lines: Iterable[str]) -> Generator:
+        """
+        Keep the lines whose `levelname` field is the log level and parse them into
+        structured records. Only the fields up to the level are split for the lines
+        that are dropped.
+
+        Args:
+            lines (Iterable[str]): The lines containing the log level.
+
+        Yields:
+            LogEntry: The records of the lines matching the log level.
+        """
+        for line in lines:
+            record = self._to_record(line=line)
+            if record is not None:
+                yield record
+
+    def _parse_levels(self, lines: Iterable[str]) -> Generator:
+        """
+        Keep the lines whose `levelname` field is the log level, dropping the ones
+        that only contain it, like in their message.
+
+        Args:
+            lines (Iterable[str]): The lines containing the log level.
+
+        Yields:
+            str: The lines of the log level.
+        """
+        for line in lines:
+            if self._is_level(line=line):
+                yield line
+
+    def _parse_keywords(self, lines: Iterable[str]) -> Generator:
+        """
+        Keep the lines containing every keyword as a whole token.
+
+        Args:
+            lines (Iterable[str]): The lines containing the log level.
+
+        Yields:
+            str: The lines containing the keywords.
+        """
+        for line in lines:
+            if self._has_keywords(line=line):
+                yield line
+
+    def _has_keywords(self, line: str) -> bool:
+        """Check that a line contains every keyword as a whole token."""
+        from .keywords import tokenize
+
+        tokens = set()
+        for keyword in self.keywords:
+            tokens |= tokenize(keyword)
+        return tokens <= tokenize(line)
+
+    def _is_level(self, line: str) -> bool:
+        """
+        Check that the `levelname` field of a line is the log level. The lines of
+        a query were already checked by its own conditions.
+        """
+        if self.query is not None:
+            return True
+        return self.log_format.is_level(line, self.log_level)
+
+    def _compiled(self) -> "Matcher":
+        """
+        Return the query compiled for the log format, compiling it again only when
+        the query or the format changed.
+
+        Returns:
+            Matcher: The compiled query.
+        """
+        query = self.query
+        if query is None:
+            msg = "There is no query to compile, set the query first."
+            logger.debug(msg)
+            raise ValueError(msg)
+
+        matcher = getattr(self, "_matcher", None)
+        if (
+            matcher is None
+            or matcher.expression is not query
+            or matcher.log_format is not self.log_format
+        ):
+            from .filters import Matcher
+
+            matcher = self._matcher = Matcher(
+                expression=query, log_format=self.log_format
+            )
+        return matcher
+
+    def _to_record(self, line: str) -> Optional[LogEntry]:
+        """
+        Parse a line into a structured record if its `levelname` field is the log
+        level, reading only the level otherwise.
+
+        Returns:
+            Optional[LogEntry]: The record, or None if the line does not match.
+        """
+        if not self._is_level(line=line):
+            return None
+        return self.log_format.parse(line)
+
+    def _parse_lines(self, path: Path) -> Generator:
+        """
+        Lazily parses a log file by decoding and checking every line of it.
+
+        Args:
+            path (Path): The path of the log file.
+
+        Yields:
+            str: Log lines matching the specified log level.
+        """
+        # Check that is the log file is opened before and is it saved or not. This
+        # is for preventing the file to be reopened every time the next() is
+        # called on the generator.
+        if not hasattr(self, "_log_file"):
+            self._log_file = path.open(mode="r", encoding="utf-8")
+
+        token = self.log_format.level_token(self.log_level).decode("utf-8")
+        if self.metrics is None:
+            for line in self._log_file:
+                if token in line:
+                    yield line
         else:
-            self._log_file.close()
+            from .metrics import profiled_lines
+
+            lines = profiled_lines(
+                lines=self._log_file, token=token, metrics=self.metrics
+            )
+            for line in lines:
+                yield line
+
+        self._log_file.close()
+        del self._log_file
+
+    def _parse_bytes(self, path: Path) -> Generator:
+        """
+        Lazily parses a log file by searching the log level on the raw bytes of
+        the file, using the sidecar index or the engine of the `mmap` or the
+        `parallel` mode, limited to the byte range of the time window if any.
+
+        Args:
+            path (Path): The path of the log file.
+
+        Yields:
+            str: Log lines matching the specified log level.
+        """
+        with path.open(mode="rb") as file:
+            start, end = self._byte_range(file=file)
+            self._offset = max(self._offset, start)
+            matches = self._scan_bytes(
+                file=file, path=path, start=self._offset, end=end
+            )
+            if self.metrics is None:
+                for offset, line in matches:
+                    self._offset = offset + len(line)
+                    yield decode_line(line)
+            else:
+                for offset, line in matches:
+                    self._offset = offset + len(line)
+                    yield self.metrics.decode(line)
+
+    def _byte_range(self, file: BinaryIO) -> Tuple[int, Optional[int]]:
+        """
+        Find the byte range to scan, the one of the time window if any.
+
+        Args:
+            file (BinaryIO): The log file opened in binary mode.
+
+        Returns:
+            Tuple[int, Optional[int]]: The offset to start at and the offset to stop
+                at, or None for the end of the file.
+        """
+        if self.start_time is None and self.end_time is None:
+            return 0, None
+        return time_range(
+            file=file,
+            log_format=self.log_format,
+            start_time=self.start_time,
+            end_time=self.end_time,
+            date_format=self.date_format,
+        )
+
+    def _scan_bytes(
+        self,
+        file: BinaryIO,
+        path: Path,
+        start: int,
+        end: Optional[int],
+        parallel: bool = True,
+    ) -> Iterator[Tuple[int, bytes]]:
+        """
+        Select the engine searching the log level on the raw bytes of a file.
+
+        Args:
+            file (BinaryIO): The log file opened in binary mode.
+            path (Path): The path of the log file.
+            start (int): The offset to start at.
+            end (Optional[int]): The offset to stop at, or None for the end.
+            parallel (bool): Whether the `parallel` mode may start worker processes,
+                not worth it for short scans.
+
+        Returns:
+            Iterator[Tuple[int, bytes]]: The offsets and the raw matching lines.
+        """
+        if self.keywords and self.use_keyword_index:
+            from .keywords import KeywordIndex
+
+            keyword_index = KeywordIndex(file_path=path)
+            # The level of a format checking it by its field is checked after.
+            level: Optional[str] = None
+            if self.query is None and not self.log_format.level_by_field:
+                level = self.log_level
+            matches: Iterator[Tuple[int, bytes]] = keyword_index.search(
+                file=file,
+                keywords=self.keywords,
+                level=level,
+                start=start,
+                end=end,
+            )
+            matches = self._profiled_lookups(matches)
+            if self.query is None:
+                return matches
+            match = self._compiled().match
+            return (
+                (offset, line)
+                for offset, line in matches
+                if match(line.decode("utf-8", errors="replace"))
+            )
+        if self.query is not None:
+            # The query is not a single token, so it has its own fused scan.
+            matcher = self._compiled()
+            if self.metrics is not None:
+                from .metrics import profiled_scan
+
+                return profiled_scan(
+                    file=file,
+                    token=b"",
+                    metrics=self.metrics,
+                    start=start,
+                    end=end,
+                    find=matcher.find,
+                )
+            return matcher.scan(file=file, start=start, end=end)
+        # The sidecar index finds the levels as written, not by their field.
+        if self.use_index and not self.log_format.level_by_field:
+            from .index import OffsetIndex
+
+            index = OffsetIndex(file_path=path, levels=self.valid_levels)
+            matches = index.scan(file=file, level=self.log_level, start=start, end=end)
+            return self._profiled_lookups(matches)
+
+        token = self.log_format.level_token(self.log_level)
+        if self.cache is not None:
+            matches = self.cache.scan(
+                file=file, path=path, token=token, start=start, end=end
+            )
+            return self._profiled_lookups(matches)
+        if parallel and self.mode == "parallel":
+            return parallel_scan(
+                file=file,
+                file_path=path,
+                token=token,
+                start=start,
+                end=end,
+                workers=self.workers,
+                chunk_size=self.chunk_size,
+                metrics=self.metrics,
+            )
+        if self.metrics is not None:
+            from .metrics import profiled_scan
+
+            return profiled_scan(
+                file=file, token=token, metrics=self.metrics, start=start, end=end
+            )
+        return mmap_scan(file=file, token=token, start=start, end=end)
+
+    def _parse_compressed(self, path: Path) -> Generator:
+        """
+        Lazily parses a compressed log file, decompressing it in large blocks and
+        searching the log level on the decompressed bytes.
+
+        Args:
+            path (Path): The path of the compressed log file.
+
+        Yields:
+            str: Log lines matching the specified log level.
+        """
+        # A decompressed stream can not be seeked cheaply, so the scan itself is
+        # saved and shared by every call to parse(), like the follower.
+        if not hasattr(self, "_stream"):
+            self._stream = self._scan_compressed(path=path)
+
+        for line in self._stream:
+            yield self._decode(line)
+
+    def _scan_compressed(self, path: Path) -> Generator:
+        """
+        Scan a compressed log file, closing it once the scan completes.
+
+        Args:
+            path (Path): The path of the compressed log file.
+
+        Yields:
+            bytes: The raw log lines matching the specified log level.
+        """
+        compression = detect_compression(path=path)
+        # The file may have been replaced by an uncompressed one since it was
+        # detected, it is then read as it is.
+        if compression is None:
+            stream: BinaryIO = path.open(mode="rb")
+        else:
+            stream = open_decompressed(path=path, compression=compression)
+        with stream as file:
+            if self.query is not None:
+                for _, line in self._compiled().stream_scan(file=file):
+                    yield line
+                return
+            token = self.log_format.level_token(self.log_level)
+            if self.metrics is None:
+                matches = stream_scan(file=file, token=token)
+            else:
+                from .metrics import profiled_scan
+
+                matches = profiled_scan(file=file, token=token, metrics=self.metrics)
+            for _, line in matches:
+                yield line
+
+    def _parse_follow(self, path: Path) -> Generator:
+        """
+        Lazily parses a log file and keeps yielding the matching lines appended
+        to it, across rotations of the file.
+
+        Args:
+            path (Path): The path of the log file.
+
+        Yields:
+            str: Log lines matching the specified log level.
+        """
+        # The follower keeps its own position across rotations, so it is saved and
+        # shared by every call to parse(), like the `_log_file` of the `line` mode.
+        if not hasattr(self, "_follower"):
+            from .follow import follow_scan
+
+            token = (
+                b""
+                if self.query is not None
+                else self.log_format.level_token(self.log_level)
+            )
+            self._follower = follow_scan(file_path=path, token=token)
+
+        for _, raw_line in self._follower:
+            line = self._decode(raw_line)
+            if self.query is None or self._compiled().match(line):
+                yield line
+
+    def _decode(self, line: bytes) -> str:
+        """Decode a raw matching line, through the metrics if they are gathered."""
+        if self.metrics is None:
+            return decode_line(line)
+        return self.metrics.decode(line)
+
+    def _profiled_lookups(
+        self, matches: Iterator[Tuple[int, bytes]]
+    ) -> Iterator[Tuple[int, bytes]]:
+        """Count the lines found by an index, if the metrics are gathered."""
+        if self.metrics is None:
+            return matches
+        from .metrics import profiled_lookups
+
+        return profiled_lookups(matches=matches, metrics=self.metrics)
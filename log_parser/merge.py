@@ -0,0 +1,273 @@
+import heapq
+import logging
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Generator,
+    Iterable,
+    List,
+    Optional,
+    Tuple,
+    Union,
+)
+
+from .log_file_parser import LogParser
+from .records import LogEntry
+from .timerange import line_time
+from .utils.messages import ErrorMessages
+
+# Imported where they are used, like in the single file parser.
+if TYPE_CHECKING:
+    from .sketches import LogSketch
+    from .stats import LogStats
+    from .templates import TemplateMiner
+
+logger = logging.getLogger("core")
+
+
+class MergedLogParser(LogParser):
+    """
+    A LogParser over many log files, like the logs of the processes of a service,
+    yielding their matching lines as one stream in timestamp order.
+
+    Every file is filtered lazily by its own LogParser with the same settings, and
+    the streams are merged with a heap holding one line per file, so the memory
+    stays proportional to the number of files however large they are.
+
+    Example Usage:
+    ```
+    parser = MergedLogParser()
+    parser.file_paths = ["logs/worker1.log", "logs/worker2.log"]
+    parser.log_level = "ERROR"
+    for line in parser.parse():
+        print(line)
+    ```
+    """
+
+    # The settings copied from the merged parser to the parser of every file. The
+    # files are not followed, since the merge would wait on one file forever, and
+    # the merged stream can not be navigated, so `follow` and `checkpoint_interval`
+    # are not copied.
+    shared_settings = (
+        "_mode",
+        "_query",
+        "workers",
+        "chunk_size",
+        "use_index",
+        "keywords",
+        "use_keyword_index",
+        "cache",
+        "_rotation",
+        "structured",
+        "log_format",
+        "start_time",
+        "end_time",
+        "date_format",
+    )
+
+    @property
+    def file_paths(self) -> List[Path]:
+        """
+        The property for the file_paths.
+
+        Returns:
+            List[Path]: The paths of the merged log files.
+        """
+        return self._file_paths
+
+    @file_paths.setter
+    def file_paths(self, value: Iterable[Union[Path, str]]) -> None:
+        """
+        Setter for the file_paths attribute. Convert every provided path to a path
+        object.
+
+        Args:
+            value (Iterable[Union[Path, str]]): The new file_paths.
+        """
+        self._file_paths = [self.convert_to_path(path=path) for path in value]
+        # The merge of the previous files would resume from their positions.
+        if hasattr(self, "_merged"):
+            self._merged.close()
+            del self._merged
+        logger.debug(f"User provided file paths for merging: {self._file_paths}")
+
+    def parse(self) -> Generator:
+        """
+        Lazily parses every log file and yields their lines matching the specified
+        log level, ordered by their timestamps.
+
+        A line without a timestamp, like a line of a traceback, keeps the position
+        of the last timestamp of its file.
+
+        Yields:
+            str | LogEntry: Log lines matching the specified log level, or their
+                records in the structured mode.
+        """
+        # The merge is saved and shared by every call to parse(), like the single
+        # file generator, so a new call resumes the stream.
+        if self.metrics is None and (self.profile or self.metrics_hook is not None):
+            from .metrics import ScanMetrics
+
+            self.metrics = ScanMetrics(hook=self.metrics_hook)
+        if not hasattr(self, "_merged"):
+            self._merged = self._merge()
+
+        for line in self._merged:
+            yield line
+
+    def goto(self, number: int) -> Optional[Any]:
+        """
+        Refuse to go to a matching line, since the merged stream of many files can
+        not be seeked. The other navigation methods go through this one.
+
+        Raises:
+            ValueError: Always, only a single uncompressed log file can be navigated.
+        """
+        msg = ErrorMessages.NO_NAVIGATION
+        logger.debug(msg)
+        raise ValueError(msg)
+
+    def stats(self, bucket_size: timedelta = timedelta(minutes=1)) -> "LogStats":
+        """
+        Count the lines of every log file by time bucket, level, module and
+        process. The counts do not depend on the order of the lines, so the
+        statistics of every file are collected on their own and merged.
+
+        Args:
+            bucket_size (timedelta): The size of the time buckets.
+
+        Returns:
+            LogStats: The statistics of all of the log files.
+        """
+        from .stats import LogStats
+
+        stats = LogStats(
+            log_format=self.log_format,
+            date_format=self.date_format,
+            bucket_size=bucket_size,
+        )
+        for parser in self._parsers():
+            stats.merge(parser.stats(bucket_size=bucket_size))
+        return stats
+
+    def sketch(
+        self,
+        capacity: int = 1000,
+        precision: int = 14,
+        sample_size: int = 10,
+        seed: Optional[int] = None,
+    ) -> "LogSketch":
+        """
+        Summarize the matching lines of every log file in a fixed memory. The
+        summaries of every file are built on their own and merged, see
+        `LogParser.sketch`.
+
+        Returns:
+            LogSketch: The summaries of the matching lines of all of the log files.
+        """
+        from .sketches import LogSketch
+
+        sketch = LogSketch(
+            log_format=self.log_format,
+            capacity=capacity,
+            precision=precision,
+            sample_size=sample_size,
+            seed=seed,
+        )
+        for number, parser in enumerate(self._parsers()):
+            # The files get their own seeds, so their samples are independent.
+            file_seed = None if seed is None else seed + number
+            file_sketch = parser.sketch(
+                capacity=capacity,
+                precision=precision,
+                sample_size=sample_size,
+                seed=file_seed,
+            )
+            sketch.merge(file_sketch)
+        return sketch
+
+    def templates(self, max_templates: int = 1000) -> "TemplateMiner":
+        """
+        Group the matching lines of every log file into message templates. The
+        templates of every file are mined on their own and merged, see
+        `LogParser.templates`.
+
+        Returns:
+            TemplateMiner: The templates of all of the log files.
+        """
+        from .templates import TemplateMiner
+
+        miner = TemplateMiner(log_format=self.log_format, max_templates=max_templates)
+        for parser in self._parsers():
+            miner.merge(parser.templates(max_templates=max_templates))
+        return miner
+
+    def _parsers(self) -> List[LogParser]:
+        """Build the parser of every log file, with the settings of this one."""
+        parsers = []
+        for path in self.file_paths:
+            parser = LogParser()
+            parser.file_path = path
+            if "_log_level" in vars(self):
+                parser.log_level = self.log_level
+            for name in self.shared_settings:
+                if name in vars(self):
+                    setattr(parser, name, getattr(self, name))
+            # Every file adds its counters to the same metrics.
+            parser.metrics = self.metrics
+            parsers.append(parser)
+        return parsers
+
+    def _merge(self) -> Generator:
+        """
+        Merge the streams of the log files with a heap.
+
+        Yields:
+            str | LogEntry: The merged lines.
+        """
+        streams = [parser.parse() for parser in self._parsers()]
+
+        last_times = [datetime.min] * len(streams)
+        heap: List[Tuple[datetime, int, Any]] = []
+        for index in range(len(streams)):
+            self._push(heap, streams, last_times, index)
+
+        while heap:
+            _, index, line = heapq.heappop(heap)
+            yield line
+            self._push(heap, streams, last_times, index)
+
+    def _push(
+        self,
+        heap: List[Tuple[datetime, int, Any]],
+        streams: List[Generator],
+        last_times: List[datetime],
+        index: int,
+    ) -> None:
+        """Push the next line of a stream into the heap, if it has any left."""
+        line = next(streams[index], None)
+        if line is None:
+            return
+
+        timestamp = self._timestamp(line)
+        if timestamp is not None:
+            last_times[index] = timestamp
+        # The index breaks the ties, so lines themselves are never compared.
+        heapq.heappush(heap, (last_times[index], index, line))
+
+    def _timestamp(self, line: Union[str, LogEntry]) -> Optional[datetime]:
+        """Return the timestamp of a line or of a structured record."""
+        if isinstance(line, LogEntry):
+            # The fields of a record depend on its format, which may have no time.
+            asctime = getattr(line, "asctime", None)
+            if asctime is None:
+                return None
+            try:
+                return datetime.strptime(str(asctime), self.date_format)
+            except ValueError:
+                return None
+        return line_time(
+            line=line, log_format=self.log_format, date_format=self.date_format
+        )
@@ -0,0 +1,245 @@
+import logging
+from time import perf_counter
+from typing import (
+    BinaryIO,
+    Callable,
+    Dict,
+    Generator,
+    Iterable,
+    Iterator,
+    Optional,
+    Tuple,
+)
+
+from .engines import DEFAULT_BLOCK_SIZE, decode_line, find_lines, read_blocks
+
+logger = logging.getLogger("core")
+
+# The number of lines of the `line` mode counted before the metrics are reported.
+LINES_PER_CHUNK = 64 * 1024
+
+
+class ScanMetrics:
+    """
+    The counters of a scan: the bytes read, the lines scanned, the matches and the
+    seconds spent reading, decoding and matching.
+
+    The counters are updated once per chunk of the file rather than once per line,
+    and the `hook` is called with the metrics after every chunk, so it can export
+    them to a monitoring system or print a progress report.
+
+    Example Usage:
+    ```
+    parser = LogParser()
+    parser.metrics_hook = lambda metrics: print(metrics.as_dict())
+    list(parser.parse())
+    parser.metrics.lines_scanned  # The lines of the whole file.
+    ```
+    """
+
+    __slots__ = (
+        "bytes_read",
+        "lines_scanned",
+        "matches",
+        "read_time",
+        "decode_time",
+        "match_time",
+        "hook",
+    )
+    counters = __slots__[:-1]
+
+    def __init__(self, hook: Optional[Callable[["ScanMetrics"], None]] = None) -> None:
+        """
+        Initialize the counters to zero.
+
+        Args:
+            hook (Optional[Callable[[ScanMetrics], None]]): The function called with
+                the metrics after every chunk.
+        """
+        self.bytes_read = 0
+        self.lines_scanned = 0
+        self.matches = 0
+        self.read_time = 0.0
+        self.decode_time = 0.0
+        self.match_time = 0.0
+        self.hook = hook
+
+    def __repr__(self) -> str:
+        """Return the representation of the metrics with all of their counters."""
+        counters = ", ".join(
+            f"{name}={value!r}" for name, value in self.as_dict().items()
+        )
+        return f"ScanMetrics({counters})"
+
+    def as_dict(self) -> Dict[str, float]:
+        """Return the counters as a dictionary."""
+        return {name: getattr(self, name) for name in self.counters}
+
+    def add(
+        self,
+        bytes_read: int = 0,
+        lines_scanned: int = 0,
+        read_time: float = 0.0,
+        match_time: float = 0.0,
+    ) -> None:
+        """
+        Add the counters of a chunk and report them to the hook.
+
+        Args:
+            bytes_read (int): The bytes read in the chunk.
+            lines_scanned (int): The lines in the chunk.
+            read_time (float): The seconds spent reading the chunk.
+            match_time (float): The seconds spent searching the chunk.
+        """
+        self.bytes_read += bytes_read
+        self.lines_scanned += lines_scanned
+        self.read_time += read_time
+        self.match_time += match_time
+        if self.hook is not None:
+            self.hook(self)
+
+    def decode(self, line: bytes) -> str:
+        """
+        Decode a matching line, counting it and the time spent decoding it.
+
+        Args:
+            line (bytes): The raw matching line.
+
+        Returns:
+            str: The decoded line.
+        """
+        started = perf_counter()
+        decoded = decode_line(line)
+        self.decode_time += perf_counter() - started
+        self.matches += 1
+        return decoded
+
+
+def profiled_scan(
+    file: BinaryIO,
+    token: bytes,
+    metrics: ScanMetrics,
+    start: Optional[int] = None,
+    end: Optional[int] = None,
+    block_size: int = DEFAULT_BLOCK_SIZE,
+    find: Optional[Callable[[bytes, int, int], Iterable[Tuple[int, bytes]]]] = None,
+) -> Generator[Tuple[int, bytes], None, None]:
+    """
+    Scan a file for lines containing a token in blocks, timing the reads and the
+    searches of every block apart. Used instead of the other engines when the
+    scan is profiled.
+
+    Args:
+        file (BinaryIO): A binary stream.
+        token (bytes): The byte sequence to search for.
+        metrics (ScanMetrics): The metrics to add the counters of every block to.
+        start (Optional[int]): The byte offset of the first line to scan, defaults
+            to the current position of the stream.
+        end (Optional[int]): The byte offset to stop scanning at, a line boundary,
+            defaults to the end of the stream.
+        block_size (int): The number of bytes to read at a time.
+        find (Optional[Callable]): The function finding the matching lines of a
+            block, like `Matcher.find`, instead of searching the token.
+
+    Yields:
+        Tuple[int, bytes]: The offset of the matching line, counted from `start`
+            if it is given or else from where the scan started, and its raw bytes.
+    """
+    offset = start or 0
+    blocks = read_blocks(file=file, start=start, end=end, block_size=block_size)
+    while True:
+        started = perf_counter()
+        block = next(blocks, None)
+        read = perf_counter()
+        if block is None:
+            return
+
+        if find is None:
+            found = list(find_lines(block, token, 0, len(block)))
+        else:
+            found = list(find(block, 0, len(block)))
+        metrics.add(
+            bytes_read=len(block),
+            lines_scanned=block.count(b"\n") + (not block.endswith(b"\n")),
+            read_time=read - started,
+            match_time=perf_counter() - read,
+        )
+        for line_start, line in found:
+            yield offset + line_start, line
+        offset += len(block)
+
+
+def profiled_lines(
+    lines: Iterable[str], token: str, metrics: ScanMetrics
+) -> Generator[str, None, None]:
+    """
+    Check the lines of a text stream for a token, counting the lines, their
+    UTF-8 bytes and the matches, like the byte engines. A text stream reads,
+    decodes and checks the lines in one step, so its whole time is counted as read
+    time.
+
+    Args:
+        lines (Iterable[str]): The lines of the text stream.
+        token (str): The text to search for.
+        metrics (ScanMetrics): The metrics to add the counters of every chunk to.
+
+    Yields:
+        str: The lines containing the token.
+    """
+    count = size = 0
+    elapsed = 0.0
+    started = perf_counter()
+    for line in lines:
+        count += 1
+        # The length of an ASCII line is its size, without encoding it.
+        size += len(line) if line.isascii() else len(line.encode("utf-8"))
+        if token in line:
+            metrics.matches += 1
+            elapsed += perf_counter() - started
+            yield line
+            started = perf_counter()
+        if count == LINES_PER_CHUNK:
+            elapsed += perf_counter() - started
+            metrics.add(bytes_read=size, lines_scanned=count, read_time=elapsed)
+            count = size = 0
+            elapsed = 0.0
+            started = perf_counter()
+
+    elapsed += perf_counter() - started
+    metrics.add(bytes_read=size, lines_scanned=count, read_time=elapsed)
+
+
+def profiled_lookups(
+    matches: Iterator[Tuple[int, bytes]], metrics: ScanMetrics
+) -> Generator[Tuple[int, bytes], None, None]:
+    """
+    Count the lines returned by an index, like the keyword or the offset index,
+    which seeks to the lines it has recorded instead of scanning the file. Only
+    these lines are read, so only they and their bytes are counted, and the time
+    spent looking them up is counted as read time.
+
+    Args:
+        matches (Iterator[Tuple[int, bytes]]): The offsets and the raw lines found
+            by the index.
+        metrics (ScanMetrics): The metrics to add the counters of every chunk to.
+
+    Yields:
+        Tuple[int, bytes]: The offsets and the raw lines, unchanged.
+    """
+    count = size = 0
+    elapsed = 0.0
+    while True:
+        started = perf_counter()
+        match = next(matches, None)
+        elapsed += perf_counter() - started
+        if match is None:
+            break
+        count += 1
+        size += len(match[1])
+        yield match
+        if count == LINES_PER_CHUNK:
+            metrics.add(bytes_read=size, lines_scanned=count, read_time=elapsed)
+            count = size = 0
+            elapsed = 0.0
+
+    metrics.add(bytes_read=size, lines_scanned=count, read_time=elapsed)
@@ -0,0 +1,471 @@
+import json
+import logging
+import os
+import re
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Dict,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Type,
+    Union,
+)
+
+logger = logging.getLogger("core")
+
+# The format of the `coreFormatter` in `logging.toml`.
+DEFAULT_FORMAT = (
+    "%(asctime)s - %(levelname)s - %(module)s - %(process)d - %(thread)d - %(message)s"
+)
+FIELD_PATTERN = re.compile(
+    r"%\((?P<name>\w+)\)[#0+ -]*\d*(?:\.\d+)?(?P<conversion>[diouxXeEfFgGcrsa])"
+)
+CONVERTERS: Dict[str, Callable[[str], Any]] = {"d": int, "i": int, "u": int}
+
+# The fields of the JSON lines and the keys they are looked up by, in order, like
+# the `level` key of many JSON loggers for the `levelname` field.
+DEFAULT_JSON_KEYS: Dict[str, Tuple[str, ...]] = {
+    "asctime": ("asctime", "timestamp", "time"),
+    "levelname": ("levelname", "level"),
+    "module": ("module",),
+    "process": ("process",),
+    "thread": ("thread",),
+    "message": ("message", "msg"),
+}
+JSON_CONVERTERS: Dict[str, Callable[[str], Any]] = {"process": int, "thread": int}
+
+
+class LogEntry:
+    """
+    The base class of the structured records of a log format. Every log format
+    builds its own subclass with one slot per field, so records take no more
+    memory than a tuple of their fields.
+    """
+
+    __slots__: Tuple[str, ...] = ()
+
+    def __init__(self, *values: Any) -> None:
+        """Initialize the record with the values of its fields, in order."""
+        for name, value in zip(self.__slots__, values):
+            setattr(self, name, value)
+
+    def __eq__(self, other: object) -> bool:
+        """Compare two records of the same format field by field."""
+        if type(other) is not type(self):
+            return NotImplemented
+        return self.as_tuple() == other.as_tuple()
+
+    def __repr__(self) -> str:
+        """Return the representation of the record with all of its fields."""
+        fields = ", ".join(f"{name}={getattr(self, name)!r}" for name in self.__slots__)
+        return f"{type(self).__name__}({fields})"
+
+    def as_tuple(self) -> Tuple[Any, ...]:
+        """Return the values of the fields of the record, in order."""
+        return tuple(getattr(self, name) for name in self.__slots__)
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Return the fields of the record as a dictionary."""
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    if TYPE_CHECKING:
+
+        def __getattr__(self, name: str) -> Any:
+            """Type the fields of the subclasses, which are only known at runtime."""
+
+
+class LineFormat:
+    """
+    The base class of the formats of the log lines, splitting lines into the
+    values of their `fields`, which the statistics, the sketches, the templates and
+    the time-range queries read.
+
+    When `level_by_field` is set, the parser keeps only the lines whose
+    `levelname` field is the log level, instead of every line containing it.
+    """
+
+    fields: Tuple[str, ...] = ()
+    level_by_field = False
+
+    def index(self, name: str) -> int:
+        """
+        Return the position of a field in the format.
+
+        Raises:
+            ValueError: If the format has no such field.
+        """
+        try:
+            return self.fields.index(name)
+        except ValueError:
+            msg = f"The log format has no `{name}` field: {self!r}"
+            logger.debug(msg)
+            raise ValueError(msg) from None
+
+    def level_token(self, level: str) -> bytes:
+        """
+        Return the bytes every line of a log level contains, searched on the raw
+        lines before their level is checked.
+
+        Args:
+            level (str): The log level, in upper case.
+
+        Returns:
+            bytes: The token, empty to check every line.
+        """
+        return level.encode("utf-8")
+
+    def is_level(self, line: str, level: str) -> bool:
+        """
+        Check that the `levelname` field of a line is the given log level.
+
+        Args:
+            line (str): The log line.
+            level (str): The log level, in upper case.
+
+        Returns:
+            bool: Whether the line is of the log level.
+        """
+        return self.field(line, "levelname") == level
+
+    def split(self, line: str, count: Optional[int] = None) -> Optional[List[str]]:
+        """
+        Split a line into the raw values of its fields.
+
+        Args:
+            line (str): The log line, with or without its trailing newline.
+            count (Optional[int]): Split only the first `count` fields, defaults to
+                all of them.
+
+        Returns:
+            Optional[List[str]]: The values of the fields, or None if the line does
+                not follow the format, like the lines of a traceback.
+        """
+        raise NotImplementedError
+
+    def field(self, line: str, name: str) -> Optional[str]:
+        """
+        Return the raw value of a single field of a line, splitting the line only
+        up to that field.
+
+        Returns:
+            Optional[str]: The value of the field, or None if the line does not
+                follow the format.
+        """
+        index = self.index(name)
+        values = self.split(line, count=index + 1)
+        return None if values is None else values[index]
+
+    def parse(self, line: str) -> Optional[LogEntry]:
+        """
+        Parse a line into a structured record.
+
+        Returns:
+            Optional[LogEntry]: The record, or None if the line does not follow the
+                format.
+        """
+        raise NotImplementedError
+
+
+class LogFormat(LineFormat):
+    """
+    A log line format built from a `logging` format string, splitting lines into
+    their fields by the literal separators between the fields.
+
+    Lines are split lazily: `field` only scans up to the requested field, so
+    checking the level of a line does not split its message.
+
+    Example Usage:
+    ```
+    log_format = LogFormat("%(asctime)s - %(levelname)s - %(message)s")
+    log_format.field("2024-01-01 10:00:00 - ERROR - Failed", "levelname")  # ERROR
+    record = log_format.parse("2024-01-01 10:00:00 - ERROR - Failed")
+    record.message  # Failed
+    ```
+    """
+
+    def __init__(self, format_string: str = DEFAULT_FORMAT) -> None:
+        """
+        Initialize the log format from a `logging` format string.
+
+        Args:
+            format_string (str): The format string, like `%(levelname)s - %(message)s`.
+
+        Raises:
+            ValueError: If the format has no field, or two fields are not separated
+                by a literal, so they can not be told apart.
+        """
+        matches = list(FIELD_PATTERN.finditer(format_string))
+        if not matches:
+            raise ValueError(f"The log format has no field: `{format_string}`")
+
+        self.format_string = format_string
+        self.fields = tuple(match.group("name") for match in matches)
+        self.converters = tuple(
+            CONVERTERS.get(match.group("conversion")) for match in matches
+        )
+        first, last = matches[0].start(), matches[-1].end()
+        self.prefix = format_string[:first]
+        self.suffix = format_string[last:]
+        # The text between the end of every field and the start of the next one.
+        bounds = zip(
+            (match.end() for match in matches), (match.start() for match in matches[1:])
+        )
+        self.separators = tuple(format_string[end:start] for end, start in bounds)
+        if not all(self.separators):
+            raise ValueError(f"The log format has adjacent fields: `{format_string}`")
+
+        self.record_class: Type[LogEntry] = type(
+            "LogEntry", (LogEntry,), {"__slots__": self.fields}
+        )
+
+    def __reduce__(self) -> Tuple[Type["LogFormat"], Tuple[str]]:
+        """Pickle the format by its format string, its record class is rebuilt."""
+        return type(self), (self.format_string,)
+
+    def __repr__(self) -> str:
+        """Return the representation of the format with its format string."""
+        return f"LogFormat({self.format_string!r})"
+
+    def split(self, line: str, count: Optional[int] = None) -> Optional[List[str]]:
+        """
+        Split a line into the raw values of its fields.
+
+        Args:
+            line (str): The log line, with or without its trailing newline.
+            count (Optional[int]): Split only the first `count` fields, defaults to
+                all of them.
+
+        Returns:
+            Optional[List[str]]: The values of the fields, or None if the line does
+                not follow the format, like the lines of a traceback.
+        """
+        line = line.rstrip("\r\n")
+        if not line.startswith(self.prefix):
+            return None
+
+        last = len(self.fields) - 1
+        count = len(self.fields) if count is None else count
+        values = []
+        position = len(self.prefix)
+        for index in range(count):
+            if index == last:
+                # The last field takes the rest of the line, separators included.
+                end = len(line) - len(self.suffix)
+                if end < position or not line.endswith(self.suffix):
+                    return None
+                values.append(line[position:end])
+                break
+
+            separator = self.separators[index]
+            end = line.find(separator, position)
+            if end == -1:
+                return None
+            values.append(line[position:end])
+            position = end + len(separator)
+        return values
+
+    def parse(self, line: str) -> Optional[LogEntry]:
+        """
+        Parse a line into a structured record, converting the numeric fields.
+
+        Returns:
+            Optional[LogEntry]: The record, or None if the line does not follow the
+                format.
+        """
+        values = self.split(line)
+        if values is None:
+            return None
+
+        converted: List[Any] = []
+        for value, converter in zip(values, self.converters):
+            if converter is None:
+                converted.append(value)
+                continue
+            try:
+                converted.append(converter(value))
+            except ValueError:
+                return None
+        return self.record_class(*converted)
+
+
+class JsonFormat(LineFormat):
+    """
+    A format of JSON lines, one object per line, like the logs of the services
+    using a JSON formatter.
+
+    The lines without a level key are skipped on their raw bytes, and the level
+    of the others is found on the raw line by a pattern matching its key, without
+    decoding the object, and only the lines of the log level are decoded in full.
+    A line with nested objects is decoded, since the key may also be found inside
+    them. The lines of the log level are told apart from the ones merely
+    containing it, like in a message, so `level_by_field` is set, and the levels
+    are compared whatever their case, like `error` or `Error`.
+
+    Example Usage:
+    ```
+    log_format = JsonFormat(keys={"levelname": "severity"})
+    log_format.field('{"severity": "ERROR", "message": "Failed"}', "levelname")
+    record = log_format.parse('{"severity": "ERROR", "message": "Failed"}')
+    record.message  # Failed
+    ```
+    """
+
+    level_by_field = True
+
+    def __init__(
+        self, keys: Optional[Dict[str, Union[str, Sequence[str]]]] = None
+    ) -> None:
+        """
+        Initialize the format from the keys of its fields.
+
+        Args:
+            keys (Optional[Dict[str, Union[str, Sequence[str]]]]): The JSON keys of
+                the fields, or the keys tried in order, overriding the ones of
+                `DEFAULT_JSON_KEYS`. New fields are added after the default ones.
+        """
+        merged = dict(DEFAULT_JSON_KEYS)
+        for name, key in (keys or {}).items():
+            merged[name] = (key,) if isinstance(key, str) else tuple(key)
+        self.keys = merged
+        self.fields = tuple(merged)
+        self.record_class: Type[LogEntry] = type(
+            "LogEntry", (LogEntry,), {"__slots__": self.fields}
+        )
+        # The text every key of the level starts with, like `"level` for the
+        # `levelname` and `level` keys, which every line with a level contains.
+        self._level_key = os.path.commonprefix(
+            [f'"{key}"' for key in merged["levelname"]]
+        ).encode("utf-8")
+        # A string or a number value of a key, one pattern per key in the order
+        # they are tried. A quote escaped by a backslash is part of a string, so it
+        # never starts a key. The keys are only at the top level of an object
+        # without nested objects, so the patterns are only used on those.
+        self._patterns = {
+            name: tuple(
+                re.compile(
+                    r'(?<!\\)"%s"\s*:\s*("(?:[^"\\]|\\.)*"|-?\d+(?:\.\d+)?)'
+                    % re.escape(key)
+                )
+                for key in field_keys
+            )
+            for name, field_keys in merged.items()
+        }
+
+    def __reduce__(self) -> Tuple[Type["JsonFormat"], Tuple[Dict[str, Any]]]:
+        """Pickle the format by its keys, its record class is rebuilt."""
+        return type(self), (self.keys,)
+
+    def __repr__(self) -> str:
+        """Return the representation of the format with its keys."""
+        return f"JsonFormat({self.keys!r})"
+
+    def _decode(self, line: str) -> Optional[Dict[str, Any]]:
+        """Decode a line into its object, or None if it is not a JSON object."""
+        try:
+            value = json.loads(line)
+        except ValueError:
+            return None
+        return value if isinstance(value, dict) else None
+
+    def _value(self, data: Dict[str, Any], name: str) -> Optional[Any]:
+        """Return the value of a field of a decoded object, by its first key."""
+        for key in self.keys[name]:
+            if key in data:
+                return data[key]
+        return None
+
+    def split(self, line: str, count: Optional[int] = None) -> Optional[List[str]]:
+        """
+        Decode a line into the values of its fields as text, an empty text for the
+        missing ones.
+
+        Args:
+            line (str): The log line, with or without its trailing newline.
+            count (Optional[int]): Return only the first `count` fields, defaults to
+                all of them.
+
+        Returns:
+            Optional[List[str]]: The values of the fields, or None if the line is
+                not a JSON object.
+        """
+        data = self._decode(line)
+        if data is None:
+            return None
+        values = []
+        for name in self.fields[:count]:
+            value = self._value(data, name)
+            values.append("" if value is None else str(value))
+        return values
+
+    def field(self, line: str, name: str) -> Optional[str]:
+        """
+        Return the value of a single field of a line as text, matching its keys on
+        the raw line of a flat object, or decoding the line when it has nested
+        objects or the patterns do not find the field.
+
+        Returns:
+            Optional[str]: The value of the field, or None if the line is not a JSON
+                object or has no such field.
+        """
+        self.index(name)
+        if line.count("{") == 1:
+            for key, pattern in zip(self.keys[name], self._patterns[name]):
+                match = pattern.search(line)
+                if match is None:
+                    if f'"{key}"' in line:
+                        # Another value, like `null`, which the decoding handles.
+                        break
+                    continue
+                value = match.group(1)
+                if not value.startswith('"'):
+                    return value
+                if "\\" not in value:
+                    return value[1:-1]
+                return json.loads(value)
+
+        data = self._decode(line)
+        if data is None:
+            return None
+        value = self._value(data, name)
+        return None if value is None else str(value)
+
+    def level_token(self, level: str) -> bytes:
+        """
+        Return the text the keys of the level start with, since the levels of JSON
+        lines are written in any case. The lines without a level key are skipped
+        on their raw bytes, and the level of the others is checked by its field.
+        """
+        return self._level_key
+
+    def is_level(self, line: str, level: str) -> bool:
+        """Check that the `levelname` field of a line is the level, in any case."""
+        value = self.field(line, "levelname")
+        return value is not None and value.upper() == level
+
+    def parse(self, line: str) -> Optional[LogEntry]:
+        """
+        Decode a line into a structured record, converting the process and the
+        thread ids. The missing fields are None.
+
+        Returns:
+            Optional[LogEntry]: The record, or None if the line is not a JSON object.
+        """
+        data = self._decode(line)
+        if data is None:
+            return None
+
+        values: List[Any] = []
+        for name in self.fields:
+            value = self._value(data, name)
+            converter = JSON_CONVERTERS.get(name)
+            if converter is not None and value is not None:
+                try:
+                    value = converter(value)
+                except (TypeError, ValueError):
+                    return None
+            values.append(value)
+        return self.record_class(*values)
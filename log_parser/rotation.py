@@ -0,0 +1,62 @@
+import glob
+import logging
+import re
+from pathlib import Path
+from typing import List, Tuple
+
+logger = logging.getLogger("core")
+
+# The rotation number, optionally followed by the extension of a compressed file.
+ROTATION_SUFFIX = re.compile(r"\.(\d+)(\.[A-Za-z0-9]+)?$")
+
+
+def _rotation_key(path: Path) -> Tuple[int, int]:
+    """
+    Sort key putting the members of a rotation family in chronological order.
+
+    A `RotatingFileHandler` renames `project.log` to `project.log.1`, `.1` to `.2`
+    and so on, so the higher the suffix is, the older the file is. Files without a
+    numeric suffix are ordered by their modification time.
+    """
+    match = ROTATION_SUFFIX.search(path.name)
+    number = int(match.group(1)) if match else 0
+    return -number, path.stat().st_mtime_ns
+
+
+def rotation_family(path: Path) -> List[Path]:
+    """
+    Collect the members of a rotated log set, from the oldest to the newest.
+
+    Args:
+        path (Path): Either the base path of the family (`logs/project.log`), whose
+            rotated members are `project.log.1` to `project.log.N`, or a glob
+            pattern (`logs/project.log*`).
+
+    Returns:
+        List[Path]: The existing members of the family in chronological order.
+
+    Raises:
+        FileNotFoundError: If the family has no member at all.
+    """
+    if glob.has_magic(str(path)):
+        members = [
+            member
+            for member in path.parent.glob(path.name)
+            # Skip hidden files, like the sidecar offset indexes.
+            if member.is_file() and not member.name.startswith(".")
+        ]
+    else:
+        members = [
+            member
+            for member in path.parent.glob(f"{glob.escape(path.name)}.*")
+            if ROTATION_SUFFIX.search(member.name) and member.is_file()
+        ]
+        if path.is_file():
+            members.append(path)
+
+    if not members:
+        raise FileNotFoundError(f"No log file matches `{path}`")
+
+    members.sort(key=_rotation_key)
+    logger.debug(f"Found {len(members)} log files for the rotation family: {path}")
+    return members
@@ -0,0 +1,493 @@
+import hashlib
+import heapq
+import logging
+import math
+import os
+import random
+from pathlib import Path
+from typing import Any, Dict, Hashable, Iterable, List, Optional, Tuple
+
+from .engines import (
+    bounded_map,
+    decode_line,
+    mmap_scan,
+    process_pool,
+    split_ranges,
+)
+from .records import LineFormat, LogFormat
+
+logger = logging.getLogger("core")
+
+
+class HeavyHitters:
+    """
+    The approximate most frequent items of a stream, in a fixed number of counters
+    (the Misra-Gries summary, the dual of space-saving).
+
+    Every count is a lower bound: the true count of an item is between its count
+    and its count plus `error`, and `error` is at most `total / (capacity + 1)`.
+    So every item more frequent than that is in the summary. Summaries of
+    different streams are merged with the same guarantee on the combined stream.
+
+    Example Usage:
+    ```
+    hitters = HeavyHitters(capacity=1000)
+    hitters.update(["a", "b", "a"])
+    hitters.top(1)  # [("a", 2)]
+    ```
+    """
+
+    def __init__(self, capacity: int = 1000) -> None:
+        """
+        Initialize an empty summary.
+
+        Args:
+            capacity (int): The number of counters kept, up to twice as many are
+                held between two prunes.
+
+        Raises:
+            ValueError: If the capacity is not positive.
+        """
+        if capacity < 1:
+            msg = f"The capacity must be positive, but got `{capacity}`"
+            logger.debug(msg)
+            raise ValueError(msg)
+
+        self.capacity = capacity
+        self.counts: Dict[Hashable, int] = {}
+        self.total = 0
+        # The largest undercount of any item.
+        self.error = 0
+
+    def update(self, items: Iterable[Hashable]) -> None:
+        """
+        Count the given items.
+
+        Args:
+            items (Iterable[Hashable]): The items of the stream.
+        """
+        counts = self.counts
+        limit = 2 * self.capacity
+        for item in items:
+            self.total += 1
+            counts[item] = counts.get(item, 0) + 1
+            if len(counts) > limit:
+                self._prune()
+                counts = self.counts
+
+    def _prune(self) -> None:
+        """
+        Subtract the (capacity + 1)-th largest count from every counter and drop
+        the ones left at zero, so at most `capacity` counters remain.
+        """
+        if len(self.counts) <= self.capacity:
+            return
+        cut = heapq.nlargest(self.capacity + 1, self.counts.values())[-1]
+        self.counts = {
+            item: count - cut for item, count in self.counts.items() if count > cut
+        }
+        self.error += cut
+
+    def merge(self, other: "HeavyHitters") -> None:
+        """
+        Add the counts of another summary, like the one of another file.
+
+        Args:
+            other (HeavyHitters): The summary to merge into this one.
+        """
+        for item, count in other.counts.items():
+            self.counts[item] = self.counts.get(item, 0) + count
+        self.total += other.total
+        self.error += other.error
+        self._prune()
+
+    def top(self, count: int = 20) -> List[Tuple[Hashable, int]]:
+        """
+        Return the most frequent items.
+
+        Args:
+            count (int): The number of items to return.
+
+        Returns:
+            List[Tuple[Hashable, int]]: The items and their lower bound counts,
+                the most frequent first.
+        """
+        return heapq.nlargest(count, self.counts.items(), key=lambda item: item[1])
+
+
+class HyperLogLog:
+    """
+    The approximate number of distinct items of a stream, in `2 ** precision`
+    one-byte registers.
+
+    The relative standard error of the estimate is `1.04 / sqrt(2 ** precision)`,
+    0.81% with the default precision of 14, which takes 16 KB. Sketches of the same
+    precision are merged without any loss of accuracy.
+
+    Example Usage:
+    ```
+    distinct = HyperLogLog(precision=14)
+    distinct.update(["a", "b", "a"])
+    round(distinct.estimate())  # 2
+    ```
+    """
+
+    def __init__(self, precision: int = 14) -> None:
+        """
+        Initialize an empty sketch.
+
+        Args:
+            precision (int): The number of bits of the hash indexing the registers,
+                between 4 and 18.
+
+        Raises:
+            ValueError: If the precision is out of range.
+        """
+        if not 4 <= precision <= 18:
+            msg = f"The precision must be between 4 and 18, but got `{precision}`"
+            logger.debug(msg)
+            raise ValueError(msg)
+
+        self.precision = precision
+        self.registers = bytearray(1 << precision)
+
+    def update(self, items: Iterable[Hashable]) -> None:
+        """
+        Add the given items.
+
+        Args:
+            items (Iterable[Hashable]): The items of the stream, hashed by their
+                string representation.
+        """
+        precision = self.precision
+        registers = self.registers
+        bits = 64 - precision
+        for item in items:
+            digest = hashlib.blake2b(str(item).encode("utf-8"), digest_size=8)
+            value = int.from_bytes(digest.digest(), "big")
+            index = value >> bits
+            rest = value & ((1 << bits) - 1)
+            # The position of the leftmost 1 bit of the rest of the hash.
+            rank = bits - rest.bit_length() + 1
+            if rank > registers[index]:
+                registers[index] = rank
+
+    def merge(self, other: "HyperLogLog") -> None:
+        """
+        Add the items of another sketch of the same precision.
+
+        Args:
+            other (HyperLogLog): The sketch to merge into this one.
+
+        Raises:
+            ValueError: If the precisions differ.
+        """
+        if other.precision != self.precision:
+            msg = "Only sketches of the same precision can be merged"
+            logger.debug(msg)
+            raise ValueError(msg)
+        self.registers = bytearray(map(max, self.registers, other.registers))
+
+    def estimate(self) -> float:
+        """
+        Estimate the number of distinct items.
+
+        Returns:
+            float: The estimated number of distinct items.
+        """
+        size = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / size)
+        estimate = alpha * size * size / sum(2.0**-rank for rank in self.registers)
+        zeros = self.registers.count(0)
+        if estimate <= 2.5 * size and zeros:
+            # Linear counting is more accurate for small cardinalities.
+            return size * math.log(size / zeros)
+        return estimate
+
+
+class Reservoir:
+    """
+    A uniform random sample of a stream, of a fixed size.
+
+    Every item gets a random key and the items with the smallest keys are kept,
+    so every item of the stream has the same chance to be sampled, and samples of
+    different streams are merged into a uniform sample of the combined stream.
+
+    Example Usage:
+    ```
+    reservoir = Reservoir(size=10, seed=0)
+    reservoir.update(lines)
+    reservoir.sample()  # 10 lines of the stream, in no particular order.
+    ```
+    """
+
+    def __init__(self, size: int = 10, seed: Optional[int] = None) -> None:
+        """
+        Initialize an empty sample.
+
+        Args:
+            size (int): The number of items kept.
+            seed (Optional[int]): The seed of the random keys, for reproducible
+                samples.
+        """
+        self.size = size
+        self.seen = 0
+        # A max-heap of the kept items by their keys, as negated keys.
+        self._heap: List[Tuple[float, int, Any]] = []
+        self._random = random.Random(seed)
+
+    def update(self, items: Iterable[Any]) -> None:
+        """
+        Offer the given items to the sample.
+
+        Args:
+            items (Iterable[Any]): The items of the stream.
+        """
+        heap = self._heap
+        for item in items:
+            self.seen += 1
+            key = self._random.random()
+            if len(heap) < self.size:
+                heapq.heappush(heap, (-key, self.seen, item))
+            elif -key > heap[0][0]:
+                heapq.heapreplace(heap, (-key, self.seen, item))
+
+    def merge(self, other: "Reservoir") -> None:
+        """
+        Combine the sample of another stream into this one.
+
+        Args:
+            other (Reservoir): The sample to merge into this one.
+        """
+        offset = self.seen
+        merged = self._heap + [
+            (key, offset + order, item) for key, order, item in other._heap
+        ]
+        self._heap = heapq.nlargest(self.size, merged)
+        heapq.heapify(self._heap)
+        self.seen += other.seen
+
+    def sample(self) -> List[Any]:
+        """
+        Return the sampled items.
+
+        Returns:
+            List[Any]: The sampled items, in the order they were seen.
+        """
+        return [item for _, _, item in sorted(self._heap, key=lambda kept: kept[1])]
+
+
+class LogSketch:
+    """
+    Approximate analytics of log lines in a fixed memory: the most frequent
+    messages, the number of distinct modules and processes, and example lines.
+
+    When a `level` is given, only the lines whose `levelname` field is that level
+    are added, like in the structured mode, so a line merely mentioning the level,
+    like in its message, is left out.
+
+    Example Usage:
+    ```
+    sketch = LogSketch()
+    sketch.update(lines)
+    sketch.summary(top=20)
+    ```
+    """
+
+    def __init__(
+        self,
+        log_format: Optional[LineFormat] = None,
+        level: Optional[str] = None,
+        capacity: int = 1000,
+        precision: int = 14,
+        sample_size: int = 10,
+        seed: Optional[int] = None,
+    ) -> None:
+        """
+        Initialize empty sketches.
+
+        Args:
+            log_format (Optional[LineFormat]): The format of the log lines, defaults
+                to the format of `logging.toml`.
+            level (Optional[str]): The log level of the lines added, defaults to
+                every level.
+            capacity (int): The number of message counters, see `HeavyHitters`.
+            precision (int): The precision of the distinct counts, see
+                `HyperLogLog`.
+            sample_size (int): The number of example lines kept.
+            seed (Optional[int]): The seed of the example lines.
+        """
+        self.log_format = log_format or LogFormat()
+        self.level = level
+        self.messages = HeavyHitters(capacity=capacity)
+        self.modules = HyperLogLog(precision=precision)
+        self.processes = HyperLogLog(precision=precision)
+        self.samples = Reservoir(size=sample_size, seed=seed)
+        # The lines that do not follow the format, like the lines of tracebacks.
+        self.skipped = 0
+
+        self._indexes = tuple(
+            self.log_format.index(name) for name in ("module", "process", "message")
+        )
+
+    def update(self, lines: Iterable[str]) -> None:
+        """
+        Add the given lines to the sketches.
+
+        Args:
+            lines (Iterable[str]): The log lines.
+        """
+        module_index, process_index, message_index = self._indexes
+        split, is_level = self.log_format.split, self.log_format.is_level
+        level = self.level
+        modules, processes, messages, samples = [], [], [], []
+        for line in lines:
+            values = split(line)
+            if values is None:
+                self.skipped += 1
+                continue
+            if level is not None and not is_level(line, level):
+                continue
+            modules.append(values[module_index])
+            processes.append(values[process_index])
+            messages.append(values[message_index])
+            samples.append(line)
+            if len(samples) >= 4096:
+                self._add(modules, processes, messages, samples)
+                modules, processes, messages, samples = [], [], [], []
+        self._add(modules, processes, messages, samples)
+
+    def _add(
+        self,
+        modules: List[str],
+        processes: List[str],
+        messages: List[str],
+        samples: List[str],
+    ) -> None:
+        """Add a batch of split lines to every sketch."""
+        self.modules.update(set(modules))
+        self.processes.update(set(processes))
+        self.messages.update(messages)
+        self.samples.update(samples)
+
+    def merge(self, other: "LogSketch") -> None:
+        """
+        Add the sketches of other lines, like the ones of another file or chunk.
+
+        Args:
+            other (LogSketch): The sketches to merge into these ones.
+        """
+        self.messages.merge(other.messages)
+        self.modules.merge(other.modules)
+        self.processes.merge(other.processes)
+        self.samples.merge(other.samples)
+        self.skipped += other.skipped
+
+    def summary(self, top: int = 20) -> Dict[str, Any]:
+        """
+        Summarize the sketches.
+
+        Args:
+            top (int): The number of most frequent messages.
+
+        Returns:
+            Dict[str, Any]: The lines, the most frequent messages with the bound of
+                their error, the distinct counts and the example lines.
+        """
+        return {
+            "lines": self.messages.total,
+            "skipped": self.skipped,
+            "top_messages": [
+                {"message": message, "count": count}
+                for message, count in self.messages.top(top)
+            ],
+            "count_error": self.messages.error,
+            "distinct_modules": round(self.modules.estimate()),
+            "distinct_processes": round(self.processes.estimate()),
+            "samples": self.samples.sample(),
+        }
+
+
+def _sketch_range(
+    file_path: Path,
+    level: str,
+    start: int,
+    end: int,
+    log_format: LineFormat,
+    settings: Dict[str, int],
+    seed: Optional[int] = None,
+) -> LogSketch:
+    """
+    Build the sketches of the lines of a log level in a byte range of a file,
+    meant to run inside a worker process.
+
+    Returns:
+        LogSketch: The sketches of the range.
+    """
+    sketch = LogSketch(log_format=log_format, level=level, seed=seed, **settings)
+    token = log_format.level_token(level)
+    with file_path.open(mode="rb") as file:
+        matches = mmap_scan(file=file, token=token, start=start, end=end)
+        sketch.update(decode_line(line, errors="replace") for _, line in matches)
+    return sketch
+
+
+def parallel_sketch(
+    sketch: LogSketch,
+    file_path: Path,
+    level: str,
+    start: int,
+    end: int,
+    workers: Optional[int],
+    chunk_size: int,
+    seed: Optional[int] = None,
+) -> None:
+    """
+    Build the sketches of the matching lines of a byte range of a file across a
+    pool of processes, merging the sketches of every chunk into the given one.
+
+    Args:
+        sketch (LogSketch): The sketches to merge the ones of the chunks into.
+        file_path (Path): The path of the log file.
+        level (str): The log level to search for.
+        start (int): The byte offset of the first line.
+        end (int): The byte offset to stop at, a line boundary.
+        workers (Optional[int]): The number of worker processes, defaults to the
+            number of CPUs.
+        chunk_size (int): The approximate size of each chunk in bytes.
+        seed (Optional[int]): The seed of the samples. The chunks get their own
+            seeds derived from it, so their samples are independent.
+    """
+    with file_path.open(mode="rb") as file:
+        ranges = list(
+            split_ranges(file=file, chunk_size=chunk_size, start=start, end=end)
+        )
+
+    settings = {
+        "capacity": sketch.messages.capacity,
+        "precision": sketch.modules.precision,
+        "sample_size": sketch.samples.size,
+    }
+    workers = workers or os.cpu_count() or 1
+    arguments = (
+        (
+            file_path,
+            level,
+            range_start,
+            range_end,
+            sketch.log_format,
+            settings,
+            None if seed is None else seed + number,
+        )
+        for number, (range_start, range_end) in enumerate(ranges)
+    )
+    # Only `2 * workers` chunks are in flight, like in `parallel_scan`.
+    with process_pool(workers=workers) as executor:
+        results = bounded_map(
+            executor=executor,
+            function=_sketch_range,
+            arguments=arguments,
+            limit=2 * workers,
+        )
+        for chunk_sketch in results:
+            sketch.merge(chunk_sketch)
@@ -0,0 +1,329 @@
+import csv
+import logging
+import os
+from array import array
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, TextIO, Tuple
+
+from .engines import bounded_map, process_pool, read_blocks, split_ranges
+from .records import LineFormat, LogFormat
+from .timerange import DEFAULT_DATE_FORMAT
+
+logger = logging.getLogger("core")
+
+EPOCH = datetime(1970, 1, 1)
+# The number of parsed timestamps kept to map the next lines to their bucket.
+MAX_CACHED_TIMESTAMPS = 100_000
+# The bits of every interned field in the code of a combination.
+FIELD_BITS = 32
+
+Key = Tuple[datetime, str, str, int]
+
+
+class LogStats:
+    """
+    One-pass aggregation of log lines, counting them by time bucket, level, module
+    and process.
+
+    The level, the module and the process of a line are interned into small
+    indices, which are packed into the code of their combination, and the lines
+    are counted in an array by combination, which is flushed into the table
+    whenever the time bucket changes. Since log files are written in timestamp
+    order, the table is only touched once per bucket and combination instead of
+    once per line, and the bucket of a line is reused from the previous line while
+    its timestamp repeats.
+
+    Example Usage:
+    ```
+    stats = LogStats(bucket_size=timedelta(minutes=1))
+    stats.update(lines)
+    for bucket, module, count in stats.table("bucket", "module"):
+        print(bucket, module, count)
+    ```
+    """
+
+    dimensions = ("bucket", "level", "module", "process")
+
+    def __init__(
+        self,
+        log_format: Optional[LineFormat] = None,
+        date_format: str = DEFAULT_DATE_FORMAT,
+        bucket_size: timedelta = timedelta(minutes=1),
+    ) -> None:
+        """
+        Initialize empty statistics.
+
+        Args:
+            log_format (Optional[LineFormat]): The format of the log lines, defaults
+                to the format of `logging.toml`.
+            date_format (str): The `strftime` format of the `asctime` field.
+            bucket_size (timedelta): The size of the time buckets.
+        """
+        self.log_format = log_format or LogFormat()
+        self.date_format = date_format
+        self.bucket_seconds = max(int(bucket_size.total_seconds()), 1)
+        # The lines that do not follow the format, like the lines of tracebacks.
+        self.skipped = 0
+
+        self._indexes = tuple(
+            self.log_format.index(name)
+            for name in ("asctime", "levelname", "module", "process")
+        )
+        self._split_count = max(self._indexes) + 1
+        self._counts: Dict[Key, int] = {}
+        self._timestamps: Dict[str, datetime] = {}
+        self._levels: Dict[str, int] = {}
+        self._modules: Dict[str, int] = {}
+        self._processes: Dict[str, int] = {}
+        # The counter of every combination, by the packed indices of its fields.
+        self._codes: Dict[int, int] = {}
+        self._keys: List[Tuple[str, str, str]] = []
+        self._counters = array("Q")
+        self._bucket: Optional[datetime] = None
+
+    def _to_bucket(self, asctime: str) -> Optional[datetime]:
+        """Return the beginning of the time bucket of a timestamp."""
+        bucket = self._timestamps.get(asctime)
+        if bucket is not None:
+            return bucket
+
+        try:
+            timestamp = datetime.strptime(asctime, self.date_format)
+        except ValueError:
+            return None
+        seconds = int((timestamp - EPOCH).total_seconds())
+        bucket = EPOCH + timedelta(seconds=seconds - seconds % self.bucket_seconds)
+        if len(self._timestamps) >= MAX_CACHED_TIMESTAMPS:
+            self._timestamps.clear()
+        self._timestamps[asctime] = bucket
+        return bucket
+
+    def _flush(self) -> None:
+        """Move the counters of the current bucket into the table."""
+        if self._bucket is not None:
+            for code, count in enumerate(self._counters):
+                if count:
+                    level, module, process = self._keys[code]
+                    key = (self._bucket, level, module, int(process))
+                    self._counts[key] = self._counts.get(key, 0) + count
+        self._counters = array("Q", bytes(8 * len(self._counters)))
+
+    def update(self, lines: Iterable[str]) -> None:
+        """
+        Count the given lines.
+
+        Args:
+            lines (Iterable[str]): The log lines.
+        """
+        split = self.log_format.split
+        count = self._split_count
+        asctime_index, level_index, module_index, process_index = self._indexes
+        levels, modules, processes = self._levels, self._modules, self._processes
+        codes = self._codes
+        last_asctime: Optional[str] = None
+        bucket: Optional[datetime] = None
+        for line in lines:
+            values = split(line, count=count)
+            if values is None or not values[process_index].isdigit():
+                self.skipped += 1
+                continue
+
+            asctime = values[asctime_index]
+            if asctime != last_asctime:
+                bucket = self._to_bucket(asctime)
+                last_asctime = asctime
+            if bucket is None:
+                self.skipped += 1
+                continue
+            if bucket != self._bucket:
+                self._flush()
+                self._bucket = bucket
+
+            level, module, process = (
+                values[level_index],
+                values[module_index],
+                values[process_index],
+            )
+            level_id = levels.get(level)
+            if level_id is None:
+                level_id = levels[level] = len(levels)
+            module_id = modules.get(module)
+            if module_id is None:
+                module_id = modules[module] = len(modules)
+            process_id = processes.get(process)
+            if process_id is None:
+                process_id = processes[process] = len(processes)
+
+            key = (process_id << FIELD_BITS | module_id) << FIELD_BITS | level_id
+            code = codes.get(key)
+            if code is None:
+                code = codes[key] = len(self._keys)
+                self._keys.append((level, module, process))
+                self._counters.append(0)
+            self._counters[code] += 1
+
+    def update_blocks(self, blocks: Iterable[bytes]) -> None:
+        """
+        Count the lines of blocks of complete lines, decoding each block at once
+        instead of line by line.
+
+        Args:
+            blocks (Iterable[bytes]): The blocks, as yielded by `read_blocks`.
+        """
+        for block in blocks:
+            lines = block.decode("utf-8", errors="replace").split("\n")
+            self.update(line for line in lines if line)
+
+    def merge(self, other: "LogStats") -> None:
+        """
+        Add the counts of other statistics, like the ones of another file or of
+        another chunk of the same file.
+
+        Args:
+            other (LogStats): The statistics to merge into these ones.
+        """
+        self.add_counts(counts=other.counts(), skipped=other.skipped)
+
+    def add_counts(self, counts: Dict[Key, int], skipped: int = 0) -> None:
+        """
+        Add counts collected elsewhere, like in a worker process.
+
+        Args:
+            counts (Dict[Key, int]): The counts by combination, as returned by
+                `counts`.
+            skipped (int): The number of skipped lines.
+        """
+        for key, count in counts.items():
+            self._counts[key] = self._counts.get(key, 0) + count
+        self.skipped += skipped
+
+    def counts(self) -> Dict[Key, int]:
+        """
+        Return the count of every (bucket, level, module, process) combination.
+
+        Returns:
+            Dict[Key, int]: The counts by combination.
+        """
+        self._flush()
+        return self._counts
+
+    def table(self, *dimensions: str) -> List[Tuple]:
+        """
+        Return the counts grouped by the given dimensions, as a sorted table.
+
+        Args:
+            *dimensions (str): Some of `bucket`, `level`, `module` and `process`,
+                defaults to all of them.
+
+        Returns:
+            List[Tuple]: One row per group, made of its dimensions and its count.
+
+        Raises:
+            ValueError: If a dimension is not valid.
+        """
+        dimensions = dimensions or self.dimensions
+        for dimension in dimensions:
+            if dimension not in self.dimensions:
+                msg = f"Valid dimensions are: {self.dimensions}, got `{dimension}`"
+                logger.debug(msg)
+                raise ValueError(msg)
+
+        positions = [self.dimensions.index(dimension) for dimension in dimensions]
+        grouped: Dict[Tuple, int] = {}
+        for key, count in self.counts().items():
+            group = tuple(key[position] for position in positions)
+            grouped[group] = grouped.get(group, 0) + count
+        return [(*group, count) for group, count in sorted(grouped.items())]
+
+    def write_csv(self, output: TextIO, *dimensions: str) -> None:
+        """
+        Write the table of the given dimensions as CSV, with a header row.
+
+        Args:
+            output (TextIO): The output to write to.
+            *dimensions (str): The dimensions to group by, defaults to all of them.
+        """
+        table = self.table(*dimensions)
+        writer = csv.writer(output)
+        writer.writerow([*(dimensions or self.dimensions), "count"])
+        for row in table:
+            if isinstance(row[0], datetime):
+                row = (row[0].strftime(self.date_format), *row[1:])
+            writer.writerow(row)
+
+
+def _collect_range(
+    file_path: Path,
+    start: int,
+    end: int,
+    log_format: LineFormat,
+    date_format: str,
+    bucket_size: timedelta,
+) -> Tuple[Dict[Key, int], int]:
+    """
+    Collect the statistics of a byte range of a file, meant to run inside a worker
+    process.
+
+    Returns:
+        Tuple[Dict[Key, int], int]: The counts of the range and its skipped lines.
+    """
+    stats = LogStats(
+        log_format=log_format,
+        date_format=date_format,
+        bucket_size=bucket_size,
+    )
+    with file_path.open(mode="rb") as file:
+        stats.update_blocks(read_blocks(file=file, start=start, end=end))
+    return stats.counts(), stats.skipped
+
+
+def parallel_stats(
+    stats: LogStats,
+    file_path: Path,
+    start: int,
+    end: int,
+    workers: Optional[int],
+    chunk_size: int,
+) -> None:
+    """
+    Collect the statistics of a byte range of a file across a pool of processes,
+    merging the counts of every chunk into the given statistics.
+
+    Args:
+        stats (LogStats): The statistics to merge the counts into.
+        file_path (Path): The path of the log file.
+        start (int): The byte offset of the first line.
+        end (int): The byte offset to stop at, a line boundary.
+        workers (Optional[int]): The number of worker processes, defaults to the
+            number of CPUs.
+        chunk_size (int): The approximate size of each chunk in bytes.
+    """
+    with file_path.open(mode="rb") as file:
+        ranges = list(
+            split_ranges(file=file, chunk_size=chunk_size, start=start, end=end)
+        )
+
+    workers = workers or os.cpu_count() or 1
+    bucket_size = timedelta(seconds=stats.bucket_seconds)
+    arguments = (
+        (
+            file_path,
+            range_start,
+            range_end,
+            stats.log_format,
+            stats.date_format,
+            bucket_size,
+        )
+        for range_start, range_end in ranges
+    )
+    # Only `2 * workers` chunks are in flight, like in `parallel_scan`.
+    with process_pool(workers=workers) as executor:
+        results = bounded_map(
+            executor=executor,
+            function=_collect_range,
+            arguments=arguments,
+            limit=2 * workers,
+        )
+        for counts, skipped in results:
+            stats.add_counts(counts=counts, skipped=skipped)
@@ -0,0 +1,247 @@
+import csv
+import logging
+import re
+from collections import OrderedDict
+from typing import Iterable, List, Optional, TextIO, Tuple
+
+from .records import LineFormat, LogFormat
+
+logger = logging.getLogger("core")
+
+# The variable parts of the messages and their placeholders, masked in this order
+# so that the numbers inside paths, addresses and ids are not masked on their own.
+MASKS: Tuple[Tuple["re.Pattern[str]", str], ...] = (
+    (re.compile(r"(?:[A-Za-z]:)?(?:[\\/][\w.\-]+){2,}[\\/]?"), "<PATH>"),
+    (
+        re.compile(
+            r"\b[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-"
+            r"[0-9a-fA-F]{12}\b"
+        ),
+        "<UUID>",
+    ),
+    (re.compile(r"\b\d{1,3}(?:\.\d{1,3}){3}(?::\d+)?\b"), "<IP>"),
+    (re.compile(r"\b0x[0-9a-fA-F]+\b|\b(?=[0-9a-f]*\d)[0-9a-f]{8,}\b"), "<HEX>"),
+    (re.compile(r"[-+]?\b\d+(?:\.\d+)?\b"), "<NUM>"),
+)
+
+
+def mask_message(message: str) -> str:
+    """
+    Replace the variable parts of a message, like numbers, ids and paths, by
+    placeholders, so the messages printed by the same logging call are equal.
+
+    Args:
+        message (str): The message of a log line.
+
+    Returns:
+        str: The template of the message.
+    """
+    for pattern, placeholder in MASKS:
+        message = pattern.sub(placeholder, message)
+    return message
+
+
+class Template:
+    """
+    The lines sharing a message template: how many they are, when the first and
+    the last of them were logged, and the first of them as an example.
+    """
+
+    __slots__ = ("pattern", "count", "first_time", "last_time", "example")
+
+    def __init__(self, pattern: str, example: str, time: Optional[str]) -> None:
+        """
+        Initialize a template from its first line.
+
+        Args:
+            pattern (str): The masked message.
+            example (str): The first line of the template.
+            time (Optional[str]): The timestamp of the line, if it has one.
+        """
+        self.pattern = pattern
+        self.example = example
+        self.count = 1
+        self.first_time = time
+        self.last_time = time
+
+    def __repr__(self) -> str:
+        """Return the representation of the template with its counters."""
+        return (
+            f"Template(pattern={self.pattern!r}, count={self.count}, "
+            f"first_time={self.first_time!r}, last_time={self.last_time!r})"
+        )
+
+    def __str__(self) -> str:
+        """Return the example line of the template with its count and times."""
+        times = ""
+        if self.first_time is not None:
+            times = f" from {self.first_time} to {self.last_time}"
+        return f"[{self.count} lines{times}] {self.example}"
+
+    def merge(self, other: "Template") -> None:
+        """Add the lines of the same template from another source."""
+        self.count += other.count
+        if self.first_time is None or (
+            other.first_time is not None and other.first_time < self.first_time
+        ):
+            self.first_time = other.first_time
+            self.example = other.example
+        if self.last_time is None or (
+            other.last_time is not None and other.last_time > self.last_time
+        ):
+            self.last_time = other.last_time
+
+
+class TemplateMiner:
+    """
+    Group a stream of log lines into message templates in a single pass, so a
+    storm of nearly identical lines collapses into one line with its count.
+
+    The table holds at most `max_templates` templates. When it is full, the least
+    recently seen template is evicted and its lines are counted in `evicted`, so
+    the memory stays bounded however varied the messages are. The timestamps are
+    compared as text, which follows the time order of the default date format.
+    When a `level` is given, the lines whose `levelname` field is another level,
+    like an INFO line mentioning ERROR in its message, are not mined.
+
+    Example Usage:
+    ```
+    miner = TemplateMiner()
+    miner.update(parser.parse())
+    for template in miner.templates():
+        print(template)
+    ```
+    """
+
+    def __init__(
+        self,
+        log_format: Optional[LineFormat] = None,
+        max_templates: int = 1000,
+        level: Optional[str] = None,
+    ) -> None:
+        """
+        Initialize an empty template table.
+
+        Args:
+            log_format (Optional[LineFormat]): The format of the log lines, defaults
+                to the format of `logging.toml`.
+            max_templates (int): The maximum number of templates kept.
+            level (Optional[str]): The log level of the lines mined, defaults to
+                every level.
+
+        Raises:
+            ValueError: If the maximum number of templates is not positive.
+        """
+        if max_templates < 1:
+            msg = f"The maximum number of templates must be positive: {max_templates}"
+            logger.debug(msg)
+            raise ValueError(msg)
+
+        self.log_format = log_format or LogFormat()
+        self.max_templates = max_templates
+        self.level = level
+        self.table: "OrderedDict[str, Template]" = OrderedDict()
+        # The lines of the templates evicted from the full table.
+        self.evicted = 0
+
+        self._time_index = self.log_format.index("asctime")
+        self._message_index = self.log_format.index("message")
+
+    def __len__(self) -> int:
+        """Return the number of templates in the table."""
+        return len(self.table)
+
+    def update(self, lines: Iterable[str]) -> None:
+        """
+        Add the given lines to their templates.
+
+        The lines that do not follow the format, like the lines of tracebacks, are
+        masked as a whole and have no timestamps.
+
+        Args:
+            lines (Iterable[str]): The log lines.
+        """
+        table = self.table
+        split, is_level = self.log_format.split, self.log_format.is_level
+        level = self.level
+        time_index, message_index = self._time_index, self._message_index
+        for line in lines:
+            line = line.rstrip("\r\n")
+            values = split(line)
+            if values is None:
+                time, message = None, line
+            elif level is not None and not is_level(line, level):
+                continue
+            else:
+                time, message = values[time_index], values[message_index]
+
+            pattern = mask_message(message)
+            template = table.get(pattern)
+            if template is None:
+                table[pattern] = Template(pattern=pattern, example=line, time=time)
+                if len(table) > self.max_templates:
+                    _, oldest = table.popitem(last=False)
+                    self.evicted += oldest.count
+                continue
+
+            template.count += 1
+            if time is not None:
+                template.last_time = time
+                if template.first_time is None:
+                    template.first_time = time
+            table.move_to_end(pattern)
+
+    def merge(self, other: "TemplateMiner") -> None:
+        """
+        Add the templates of other lines, like the ones of another file.
+
+        Args:
+            other (TemplateMiner): The templates to merge into these ones.
+        """
+        for pattern, template in other.table.items():
+            if pattern in self.table:
+                self.table[pattern].merge(template)
+                continue
+            self.table[pattern] = template
+            if len(self.table) > self.max_templates:
+                _, oldest = self.table.popitem(last=False)
+                self.evicted += oldest.count
+        self.evicted += other.evicted
+
+    def templates(self, top: Optional[int] = None) -> List[Template]:
+        """
+        Return the templates, the most frequent first.
+
+        Args:
+            top (Optional[int]): The number of templates to return, defaults to all
+                of them.
+
+        Returns:
+            List[Template]: The templates.
+        """
+        templates = sorted(
+            self.table.values(), key=lambda template: template.count, reverse=True
+        )
+        return templates[:top]
+
+    def write_csv(self, output: TextIO, top: Optional[int] = None) -> None:
+        """
+        Write the templates as CSV, the most frequent first.
+
+        Args:
+            output (TextIO): The text stream to write to.
+            top (Optional[int]): The number of templates to write, defaults to all
+                of them.
+        """
+        writer = csv.writer(output)
+        writer.writerow(("count", "first_time", "last_time", "template", "example"))
+        for template in self.templates(top=top):
+            writer.writerow(
+                (
+                    template.count,
+                    template.first_time,
+                    template.last_time,
+                    template.pattern,
+                    template.example,
+                )
+            )
@@ -0,0 +1,118 @@
+import asyncio
+import threading
+from pathlib import Path
+from typing import Generator
+
+import pytest
+
+from ..async_parser import AsyncLogParser, aparse_many
+
+
+class TestAsyncLogParser:
+    """Test class for the AsyncLogParser."""
+
+    @pytest.fixture
+    def sample_file_paths(self, tmp_path: Path) -> list:
+        """Fixture for creating a few sample log files."""
+        file_paths = []
+        for number in range(3):
+            file_path = tmp_path / f"test{number}.log"
+            file_path.write_text(
+                "".join(
+                    f"{'ERROR' if line % 2 else 'INFO'}: file {number} line {line}\n"
+                    for line in range(10)
+                )
+            )
+            file_paths.append(file_path)
+        return file_paths
+
+    @pytest.mark.parametrize("mode", AsyncLogParser.valid_modes)
+    def test_aparse(self, mode: str, sample_file_paths: list) -> None:
+        """Tests that aparse yields the same lines as parse, in order."""
+        parser = AsyncLogParser()
+        parser.file_path = sample_file_paths[0]
+        parser.log_level = "error"
+        parser.mode = mode
+        parser.batch_size = 2
+
+        async def collect() -> list:
+            return [line async for line in parser.aparse()]
+
+        actual = asyncio.run(collect())
+        expected = [f"ERROR: file 0 line {line}\n" for line in range(1, 10, 2)]
+        assert actual == expected, f"expect {expected} but got {actual}"
+
+    def test_aparse_early_close(
+        self, monkeypatch: pytest.MonkeyPatch, sample_file_paths: list
+    ) -> None:
+        """Tests that the scan is stopped and closed when the consumer stops."""
+        closed = threading.Event()
+
+        def parse() -> Generator:
+            try:
+                for line in range(10_000):
+                    yield f"ERROR: line {line}\n"
+            finally:
+                closed.set()
+
+        parser = AsyncLogParser()
+        monkeypatch.setattr(parser, "parse", parse)
+        parser.batch_size = 2
+
+        async def first() -> str:
+            lines = parser.aparse()
+            line = await lines.__anext__()
+            await lines.aclose()
+            return line
+
+        actual = asyncio.run(first())
+        assert actual == "ERROR: line 0\n", f"expect the first line but got {actual}"
+        assert closed.wait(timeout=5), "expect the generator of the scan to be closed"
+
+    def test_invalid_log_level(self) -> None:
+        """Tests that the level validation is shared with the sync class."""
+        with pytest.raises(ValueError, match="Valid log levels are:"):
+            AsyncLogParser().log_level = "something_invalid"
+
+    def test_aparse_many(self, sample_file_paths: list) -> None:
+        """Tests that the lines of every file are yielded with their path."""
+
+        async def collect() -> list:
+            lines = aparse_many(
+                sample_file_paths, log_level="ERROR", concurrency=2, mode="mmap"
+            )
+            return [item async for item in lines]
+
+        actual = sorted(asyncio.run(collect()))
+        expected = sorted(
+            (file_path, f"ERROR: file {number} line {line}\n")
+            for number, file_path in enumerate(sample_file_paths)
+            for line in range(1, 10, 2)
+        )
+        assert actual == expected, f"expect {expected} but got {actual}"
+
+    def test_aparse_many_error(self, tmp_path: Path) -> None:
+        """Tests that an invalid setting of a query is raised to the consumer."""
+
+        async def collect() -> list:
+            lines = aparse_many([tmp_path / "a.log"], log_level="ERROR", mode="bad")
+            return [item async for item in lines]
+
+        with pytest.raises(ValueError, match="Valid scan modes are:"):
+            asyncio.run(collect())
+
+    def test_aparse_many_early_close(
+        self, caplog: pytest.LogCaptureFixture, sample_file_paths: list
+    ) -> None:
+        """Tests that stopping early cancels the queries without any warning."""
+
+        async def first() -> tuple:
+            lines = aparse_many(sample_file_paths, log_level="ERROR", concurrency=2)
+            item = await lines.__anext__()
+            await lines.aclose()
+            return item
+
+        with caplog.at_level("ERROR", logger="asyncio"):
+            actual = asyncio.run(first())
+        assert actual[1].startswith("ERROR: file"), f"expect a line but got {actual}"
+        assert not caplog.records, f"expect no warnings but got {caplog.text}"
@@ -0,0 +1,88 @@
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from ..cache import ENTRY_OVERHEAD, ResultCache
+
+
+class TestResultCache:
+    """Test class for the ResultCache."""
+
+    @pytest.fixture
+    def sample_file_path(self, tmp_path: Path) -> Path:
+        """Fixture for creating a sample log file."""
+        file_path = tmp_path / "test.log"
+        file_path.write_text("ERROR: Test line 1\nINFO: Test line 2\nERROR: Test")
+        return file_path
+
+    def scan(self, cache: ResultCache, file_path: Path, **kwargs) -> list:
+        """Scan a file through the cache and return its matching lines."""
+        with file_path.open(mode="rb") as file:
+            return list(cache.scan(file=file, path=file_path, token=b"ERROR", **kwargs))
+
+    def test_hit_and_extend(self, sample_file_path: Path) -> None:
+        """Tests that a grown file extends its entry instead of dropping it."""
+        cache = ResultCache()
+        first = self.scan(cache, sample_file_path)
+        second = self.scan(cache, sample_file_path)
+        assert first == second, f"expect {first} but got {second}"
+
+        with sample_file_path.open(mode="a") as file:
+            file.write(" line 3\nERROR: Test line 4\n")
+
+        actual: Any = self.scan(cache, sample_file_path, start=1)
+        expected: Any = [(37, b"ERROR: Test line 3\n"), (56, b"ERROR: Test line 4\n")]
+        assert actual == expected, f"expect {expected} but got {actual}"
+
+        actual = (cache.hits, cache.misses)
+        expected = (2, 1)
+        assert actual == expected, f"expect {expected} but got {actual}"
+        # The trailing partial line was not cached, the completed one was.
+        actual = list(next(iter(cache._entries.values())).offsets)
+        expected = [0, 37, 56]
+        assert actual == expected, f"expect {expected} but got {actual}"
+
+    def test_bounded_scan(self, sample_file_path: Path) -> None:
+        """Tests that a scan with an end only reads and caches the file up to it."""
+        cache = ResultCache()
+        actual: Any = self.scan(cache, sample_file_path, end=19)
+        expected: Any = [(0, b"ERROR: Test line 1\n")]
+        assert actual == expected, f"expect {expected} but got {actual}"
+
+        entry = next(iter(cache._entries.values()))
+        actual = (list(entry.offsets), entry.identity.size)
+        expected = ([0], 19)
+        assert actual == expected, f"expect {expected} but got {actual}"
+
+        actual = self.scan(cache, sample_file_path)
+        expected = [(0, b"ERROR: Test line 1\n"), (37, b"ERROR: Test")]
+        assert actual == expected, f"expect {expected} but got {actual}"
+
+    def test_replaced(self, sample_file_path: Path) -> None:
+        """Tests that a rewritten file is scanned again."""
+        cache = ResultCache()
+        self.scan(cache, sample_file_path)
+        sample_file_path.write_text("INFO: Test line 1\n")
+
+        actual = self.scan(cache, sample_file_path)
+        assert actual == [], f"expect no lines but got {actual}"
+
+    def test_eviction(self, tmp_path: Path) -> None:
+        """Tests that the least recently used entries are evicted over the budget."""
+        cache = ResultCache(max_bytes=2 * (ENTRY_OVERHEAD + 8))
+        file_paths = []
+        for number in range(3):
+            file_path = tmp_path / f"test{number}.log"
+            file_path.write_text("ERROR: Test line\n")
+            file_paths.append(file_path)
+
+        self.scan(cache, file_paths[0])
+        self.scan(cache, file_paths[1])
+        self.scan(cache, file_paths[0])
+        self.scan(cache, file_paths[2])
+
+        actual = sorted(Path(key[0]).name for key in cache._entries)
+        expected = ["test0.log", "test2.log"]
+        assert actual == expected, f"expect {expected} but got {actual}"
+        assert cache.nbytes <= cache.max_bytes
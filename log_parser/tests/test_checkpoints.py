@@ -0,0 +1,47 @@
+from typing import Any
+
+import pytest
+
+from ..checkpoints import CheckpointIndex
+
+
+class TestCheckpointIndex:
+    """Test class for the CheckpointIndex."""
+
+    def test_checkpoint(self) -> None:
+        """Tests that only every interval-th match is kept and found back."""
+        checkpoints = CheckpointIndex(interval=4)
+        for number in range(10):
+            checkpoints.record(number=number, offset=number * 10)
+        # Rescanned matches are not recorded twice.
+        checkpoints.record(number=4, offset=40)
+
+        actual: Any = list(checkpoints.offsets)
+        expected: Any = [0, 40, 80]
+        assert actual == expected, f"expect {expected} but got {actual}"
+
+        actual = [checkpoints.checkpoint(number) for number in (0, 7, 9, 100)]
+        expected = [(0, 0), (4, 40), (8, 80), (8, 80)]
+        assert actual == expected, f"expect {expected} but got {actual}"
+
+    def test_sync(self, tmp_path) -> None:
+        """Tests that a replaced file drops the checkpoints."""
+        file_path = tmp_path / "test.log"
+        file_path.write_text("ERROR: Test line 1\n")
+        checkpoints = CheckpointIndex(interval=4)
+        with file_path.open(mode="rb") as file:
+            checkpoints.sync(file=file)
+        checkpoints.record(number=0, offset=0)
+        checkpoints.finish(count=1)
+
+        file_path.write_text("INFO\n")
+        with file_path.open(mode="rb") as file:
+            actual = checkpoints.sync(file=file)
+        expected = "replaced"
+        assert actual == expected, f"expect {expected} but got {actual}"
+        assert checkpoints.count == 0 and not checkpoints.complete
+
+    def test_invalid_interval(self) -> None:
+        """Tests that the interval must be positive."""
+        with pytest.raises(ValueError, match="must be positive"):
+            CheckpointIndex(interval=0)
@@ -0,0 +1,43 @@
+import bz2
+import gzip
+import lzma
+from pathlib import Path
+from typing import Callable, Dict
+
+import pytest
+
+from ..compression import detect_compression, open_decompressed
+
+CONTENT = b"DEBUG: line 1\nERROR: line 2\n"
+COMPRESSORS: Dict[str, Callable[[bytes], bytes]] = {
+    "gzip": gzip.compress,
+    "bz2": bz2.compress,
+    "xz": lzma.compress,
+}
+
+
+class TestCompression:
+    """Test class for the detection and decompression of compressed logs."""
+
+    @pytest.mark.parametrize("compression", COMPRESSORS)
+    def test_detect_and_open(self, compression: str, tmp_path: Path) -> None:
+        """
+        Tests that the format is detected from the magic bytes, even with a
+        misleading extension, and that the content is decompressed.
+        """
+        file_path = tmp_path / "project.log.txt"
+        file_path.write_bytes(COMPRESSORS[compression](CONTENT))
+
+        actual = detect_compression(path=file_path)
+        assert actual == compression, f"expect {compression} but got {actual}"
+
+        with open_decompressed(path=file_path, compression=compression) as file:
+            content = file.read()
+        assert content == CONTENT, f"expect {CONTENT!r} but got {content!r}"
+
+    def test_plain_file(self, tmp_path: Path) -> None:
+        """Tests that a plain text file is not detected as compressed."""
+        file_path = tmp_path / "project.log.gz"
+        file_path.write_bytes(CONTENT)
+        actual = detect_compression(path=file_path)
+        assert actual is None, f"expect None but got {actual}"
@@ -0,0 +1,192 @@
+import gzip
+from datetime import datetime
+from itertools import islice
+from pathlib import Path
+from typing import Any, Generator
+
+import pytest
+
+from .. import database
+from ..database import LogDatabase
+from ..engines import split_lines
+from ..filters import Level, parse_query
+from ..records import JsonFormat
+
+LINES = [
+    "2024-01-01 14:00:00 - WARNING - db - 10 - 1 - Slow query\n",
+    "2024-01-01 14:00:01 - INFO - db - 10 - 1 - WARNING threshold\n",
+    "2024-01-01 14:00:02 - ERROR - app - 11 - 1 - Request timed out\n",
+    "Traceback (most recent call last):\n",
+    "2024-01-01 14:00:03 - CRITICAL - db - 12 - 1 - Connection lost\n",
+]
+
+
+class TestLogDatabase:
+    """Test class for the SQLite database of parsed log lines."""
+
+    @pytest.fixture
+    def sample_file_path(self, tmp_path: Path) -> Path:
+        """Fixture for creating a sample log file."""
+        file_path = tmp_path / "test.log"
+        file_path.write_text("".join(LINES))
+        return file_path
+
+    @pytest.fixture
+    def log_database(self, tmp_path: Path) -> Generator:
+        """Fixture for opening an empty database."""
+        with LogDatabase(db_path=tmp_path / "logs.db") as log_database:
+            yield log_database
+
+    @pytest.mark.parametrize(
+        "query, expected",
+        [
+            ("level>=WARNING and module=db", [0, 4]),
+            ("level=ERROR|CRITICAL or process=10", [0, 1, 2, 4]),
+            ('message~"(?i)timed? out|lost$"', [2, 4]),
+            ("not module=db", [2]),
+        ],
+    )
+    def test_select(
+        self,
+        log_database: LogDatabase,
+        sample_file_path: Path,
+        query: str,
+        expected: list,
+    ) -> None:
+        """Tests that the queries are translated into SQL conditions."""
+        log_database.ingest(file_path=sample_file_path)
+        actual: Any = list(log_database.select(parse_query(query)))
+        lines = [LINES[number] for number in expected]
+        assert actual == lines, f"expect {lines} but got {actual}"
+
+        actual = log_database.count(parse_query(query))
+        assert actual == len(lines), f"expect {len(lines)} but got {actual}"
+
+    def test_time_window_and_limit(
+        self, log_database: LogDatabase, sample_file_path: Path
+    ) -> None:
+        """Tests the time window, the sources and the limit of the selection."""
+        log_database.ingest(file_path=sample_file_path)
+        lines = log_database.select(
+            sources=[sample_file_path],
+            start_time=datetime(2024, 1, 1, 14, 0, 1),
+            end_time=datetime(2024, 1, 1, 14, 0, 3),
+            limit=2,
+        )
+        actual: Any = list(lines)
+        expected = LINES[1:3]
+        assert actual == expected, f"expect {expected} but got {actual}"
+
+        actual = log_database.count(sources=["other.log"])
+        assert actual == 0, f"expect no lines but got {actual}"
+
+        with pytest.raises(ValueError, match="Valid fields"):
+            list(log_database.select(parse_query("host=web1")))
+
+    def test_resume(
+        self,
+        monkeypatch: pytest.MonkeyPatch,
+        log_database: LogDatabase,
+        sample_file_path: Path,
+    ) -> None:
+        """Tests that only the appended complete lines are ingested again."""
+        monkeypatch.setattr(database, "BATCH_SIZE", 2)
+        monkeypatch.setattr(database, "TRANSACTION_SIZE", 2)
+        with sample_file_path.open(mode="a") as file:
+            file.write("2024-01-01 14:00:04 - ERROR - db")
+
+        actual: Any = [
+            log_database.ingest(file_path=sample_file_path) for _ in range(2)
+        ]
+        expected: Any = [5, 0]
+        assert actual == expected, f"expect {expected} but got {actual}"
+
+        with sample_file_path.open(mode="a") as file:
+            file.write(" - 10 - 1 - Retried\n")
+        actual = log_database.ingest(file_path=sample_file_path)
+        assert actual == 1, f"expect 1 line but got {actual}"
+
+        actual = log_database.sources()
+        expected = [(str(sample_file_path.resolve()), sample_file_path.stat().st_size)]
+        assert actual == expected, f"expect {expected} but got {actual}"
+        actual = log_database.count(Level("ERROR"))
+        assert actual == 2, f"expect 2 lines but got {actual}"
+
+    def test_replaced(self, log_database: LogDatabase, sample_file_path: Path) -> None:
+        """Tests that the lines of a replaced file are dropped."""
+        log_database.ingest(file_path=sample_file_path)
+        sample_file_path.write_text(LINES[2])
+        log_database.ingest(file_path=sample_file_path)
+        actual = list(log_database.select())
+        expected = LINES[2:3]
+        assert actual == expected, f"expect {expected} but got {actual}"
+
+    def test_carriage_return(
+        self, log_database: LogDatabase, sample_file_path: Path
+    ) -> None:
+        """Tests that only a newline ends a line and a CRLF ends as a newline."""
+        content = "INFO: x\rERROR: order 2\r\nERROR: order 3\x0c\n"
+        sample_file_path.write_bytes(content.encode("utf-8"))
+
+        actual: Any = log_database.ingest(file_path=sample_file_path)
+        assert actual == 2, f"expect 2 lines but got {actual}"
+        actual = list(log_database.select())
+        expected = ["INFO: x\rERROR: order 2\n", "ERROR: order 3\x0c\n"]
+        assert actual == expected, f"expect {expected} but got {actual}"
+
+    def test_interrupted_compressed(
+        self,
+        monkeypatch: pytest.MonkeyPatch,
+        log_database: LogDatabase,
+        tmp_path: Path,
+    ) -> None:
+        """Tests that an interrupted ingest of a compressed file is done again."""
+        file_path = tmp_path / "test.log.gz"
+        file_path.write_bytes(gzip.compress("".join(LINES).encode("utf-8")))
+        monkeypatch.setattr(database, "BATCH_SIZE", 1)
+        monkeypatch.setattr(database, "TRANSACTION_SIZE", 1)
+
+        def interrupted(block: bytes) -> Generator:
+            yield from islice(split_lines(block), 3)
+            raise KeyboardInterrupt
+
+        with monkeypatch.context() as context:
+            context.setattr(database, "split_lines", interrupted)
+            with pytest.raises(KeyboardInterrupt):
+                log_database.ingest(file_path=file_path)
+        assert log_database.sources() == [], "expect the source to be unsaved"
+
+        actual: Any = [log_database.ingest(file_path=file_path) for _ in range(2)]
+        expected = [len(LINES), 0]
+        assert actual == expected, f"expect {expected} but got {actual}"
+        actual = list(log_database.select())
+        assert actual == LINES, f"expect {LINES} but got {actual}"
+
+    def test_compressed_and_json(self, tmp_path: Path) -> None:
+        """Tests the ingest of a compressed file of JSON lines."""
+        file_path = tmp_path / "test.jsonl.gz"
+        file_path.write_bytes(
+            gzip.compress(
+                b'{"level": "ERROR", "module": "db", "msg": "Failed"}\n'
+                b'{"level": "INFO", "module": "db", "msg": "ERROR"}\n'
+            )
+        )
+        with LogDatabase(tmp_path / "logs.db", log_format=JsonFormat()) as log_db:
+            actual: Any = [log_db.ingest(file_path=file_path) for _ in range(2)]
+            expected = [2, 0]
+            assert actual == expected, f"expect {expected} but got {actual}"
+
+            actual = log_db.count(parse_query("level=ERROR and module=db"))
+            assert actual == 1, f"expect 1 line but got {actual}"
+
+    def test_json_lowercase_level(self, tmp_path: Path) -> None:
+        """Tests that the levels of JSON lines are matched in any case."""
+        file_path = tmp_path / "test.jsonl"
+        file_path.write_bytes(
+            b'{"level": "error", "msg": "Failed"}\n{"level": "Info", "msg": "error"}\n'
+        )
+        with LogDatabase(tmp_path / "logs.db", log_format=JsonFormat()) as log_db:
+            log_db.ingest(file_path=file_path)
+            actual = [log_db.count(Level(level)) for level in ("ERROR", "INFO")]
+            expected = [1, 1]
+            assert actual == expected, f"expect {expected} but got {actual}"
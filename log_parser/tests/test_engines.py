@@ -0,0 +1,134 @@
+import io
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Generator
+
+import pytest
+
+from ..engines import (
+    bounded_map,
+    mmap_scan,
+    parallel_scan,
+    split_lines,
+    split_ranges,
+    stream_scan,
+)
+
+
+class TestMmapScan:
+    """Test class for the mmap_scan engine."""
+
+    @pytest.fixture
+    def sample_file_path(self, tmp_path: Path) -> Path:
+        """Fixture for creating a sample log file."""
+        file_path = tmp_path / "test.log"
+        file_path.write_bytes(
+            b"DEBUG: line 1\nERROR: line 2\nINFO: line 3 ERROR\nERROR: line 4"
+        )
+        return file_path
+
+    def test_offsets_and_lines(self, sample_file_path: Path) -> None:
+        """Tests that the matching lines are yielded with their byte offsets."""
+        with sample_file_path.open(mode="rb") as file:
+            actual = list(mmap_scan(file=file, token=b"ERROR"))
+        expected = [
+            (14, b"ERROR: line 2\n"),
+            (28, b"INFO: line 3 ERROR\n"),
+            (47, b"ERROR: line 4"),
+        ]
+        assert actual == expected, f"expect {expected} but got {actual}"
+
+    def test_range(self, sample_file_path: Path) -> None:
+        """Tests that only the lines inside the given byte range are scanned."""
+        with sample_file_path.open(mode="rb") as file:
+            actual = list(mmap_scan(file=file, token=b"ERROR", start=14, end=28))
+        expected = [(14, b"ERROR: line 2\n")]
+        assert actual == expected, f"expect {expected} but got {actual}"
+
+    def test_empty_file(self, tmp_path: Path) -> None:
+        """Tests that an empty file yields nothing instead of failing to map."""
+        file_path = tmp_path / "empty.log"
+        file_path.touch()
+        with file_path.open(mode="rb") as file:
+            actual = list(mmap_scan(file=file, token=b"ERROR"))
+        assert actual == [], f"expect no lines but got {actual}"
+
+
+class TestStreamScan:
+    """Test class for the stream_scan engine."""
+
+    def test_lines_across_blocks(self) -> None:
+        """Tests that lines split between two blocks are matched as a whole."""
+        stream = io.BytesIO(b"DEBUG: line 1\nERROR: line 2\nINFO: 3\nERROR: end")
+        actual = list(stream_scan(file=stream, token=b"ERROR", block_size=5))
+        expected = [(14, b"ERROR: line 2\n"), (36, b"ERROR: end")]
+        assert actual == expected, f"expect {expected} but got {actual}"
+
+    def test_split_lines(self) -> None:
+        """Tests that only a newline ends a line of a block."""
+        actual = list(split_lines(b"INFO: a\rb\x0cc\nERROR: \x85d\nend"))
+        expected = [b"INFO: a\rb\x0cc\n", b"ERROR: \x85d\n", b"end"]
+        assert actual == expected, f"expect {expected} but got {actual}"
+
+
+class TestParallelScan:
+    """Test class for the split_ranges and parallel_scan engines."""
+
+    @pytest.fixture
+    def sample_file_path(self, tmp_path: Path) -> Path:
+        """Fixture for creating a sample log file with many lines."""
+        file_path = tmp_path / "test.log"
+        lines = [
+            f"{'ERROR' if number % 3 == 0 else 'INFO'}: line {number}\n"
+            for number in range(500)
+        ]
+        file_path.write_text("".join(lines))
+        return file_path
+
+    def test_split_ranges(self, sample_file_path: Path) -> None:
+        """Tests that the ranges cover the whole file and start at line boundaries."""
+        content = sample_file_path.read_bytes()
+        with sample_file_path.open(mode="rb") as file:
+            ranges = list(split_ranges(file=file, chunk_size=100))
+
+        assert ranges[0][0] == 0, f"expect 0 but got {ranges[0][0]}"
+        assert ranges[-1][1] == len(content)
+        for (_, end), (start, _) in zip(ranges, ranges[1:]):
+            assert end == start, f"expect {end} but got {start}"
+            assert content.endswith(b"\n", 0, start), "range is not line aligned"
+
+    def test_ordered_output(self, sample_file_path: Path) -> None:
+        """Tests that the parallel scan yields the same matches as the mmap scan."""
+        with sample_file_path.open(mode="rb") as file:
+            expected = list(mmap_scan(file=file, token=b"ERROR"))
+            actual = list(
+                parallel_scan(
+                    file=file,
+                    file_path=sample_file_path,
+                    token=b"ERROR",
+                    workers=2,
+                    chunk_size=256,
+                )
+            )
+        assert actual == expected, "parallel scan changed the matches or their order"
+
+
+class TestBoundedMap:
+    """Test class for the bounded_map helper of the parallel scans."""
+
+    def test_bounded_map(self) -> None:
+        """Tests that the results are in order with a bounded number in flight."""
+        submitted = []
+
+        def arguments() -> Generator:
+            for number in range(20):
+                submitted.append(number)
+                yield (number,)
+
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            results = bounded_map(executor, abs, arguments(), limit=3)
+            actual = [next(results)]
+            assert len(submitted) == 3, f"expect 3 calls in flight: {submitted}"
+            actual.extend(results)
+        expected = list(range(20))
+        assert actual == expected, f"expect {expected} but got {actual}"
@@ -0,0 +1,150 @@
+import gzip
+from pathlib import Path
+
+import pytest
+
+from ..compression import open_decompressed
+from ..filters import (
+    And,
+    Equals,
+    Level,
+    Matcher,
+    Matches,
+    Not,
+    Or,
+    compile_filter,
+    parse_query,
+)
+from ..records import JsonFormat, LogFormat
+
+LINES = [
+    b"2024-01-01 14:00:00 - WARNING - db - 10 - 1 - Slow query on orders\n",
+    b"2024-01-01 14:00:01 - INFO - db - 10 - 1 - WARNING threshold is 2 s\n",
+    b"2024-01-01 14:00:02 - ERROR - app - 11 - 1 - Request timed out\n",
+    b"2024-01-01 14:00:03 - CRITICAL - db - 12 - 1 - Connection lost\n",
+    b"Traceback (most recent call last):\n",
+]
+
+
+class TestParseQuery:
+    """Test class for the parsing of the queries into filter expressions."""
+
+    @pytest.mark.parametrize(
+        "query, expected",
+        [
+            ("level=ERROR|critical", Level("ERROR", "CRITICAL")),
+            ("level>=ERROR", Level("ERROR", "CRITICAL")),
+            ("level<=INFO", Level("DEBUG", "INFO")),
+            ("module!=db", Not(Equals("module", "db"))),
+            (
+                "level>=WARNING and module=db or process=11",
+                Or(
+                    And(Level("WARNING", "ERROR", "CRITICAL"), Equals("module", "db")),
+                    Equals("process", "11"),
+                ),
+            ),
+            (
+                'not (module=db or message~"timed? out")',
+                Not(Or(Equals("module", "db"), Matches("message", "timed? out"))),
+            ),
+            (r'message~"id \d+ \"x\""', Matches("message", 'id \\d+ "x"')),
+        ],
+    )
+    def test_parse(self, query: str, expected: object) -> None:
+        """Tests the precedence of the operators and the conditions."""
+        actual = parse_query(query)
+        assert actual == expected, f"expect {expected} but got {actual}"
+
+    @pytest.mark.parametrize(
+        "query, message",
+        [
+            ("level=FATAL", "Valid levels are"),
+            ("module>=db", "Only the level can be compared"),
+            ("level>=ERROR|INFO", "Only one level"),
+            ("(module=db", "ended unexpectedly"),
+            ("module=db)", r"Unexpected `\)`"),
+            ("module is db", "Expected a condition on `module`"),
+            ('message~"("', "Invalid regular expression"),
+        ],
+    )
+    def test_errors(self, query: str, message: str) -> None:
+        """Tests that invalid queries raise a ValueError."""
+        with pytest.raises(ValueError, match=message):
+            parse_query(query)
+
+    def test_operators(self) -> None:
+        """Tests that the filters are combined with the Python operators."""
+        actual = ~Level("error") & Equals("level", "db") | Matches("module", "x")
+        expected = Or(
+            And(Not(Level("ERROR")), Equals("levelname", "db")), Matches("module", "x")
+        )
+        assert actual == expected, f"expect {expected} but got {actual}"
+
+
+class TestMatcher:
+    """Test class for the filters compiled into a fused matcher."""
+
+    @pytest.mark.parametrize(
+        "query, literals, expected",
+        [
+            ("level>=ERROR", (b"CRITICAL", b"ERROR"), [2, 3]),
+            ("level>=WARNING and module=db", (b"db",), [0, 3]),
+            ("message~timed or process=12", (b"12", b"timed"), [2, 3]),
+            ('message~"lost|out$"', None, [2, 3]),
+            ("not module=db", None, [2]),
+        ],
+    )
+    def test_scan(
+        self, tmp_path: Path, query: str, literals: tuple, expected: list
+    ) -> None:
+        """Tests the literal prefilter and the lines found by the scans."""
+        matcher = compile_filter(query, log_format=LogFormat())
+        assert matcher.literals == literals, f"expect {literals}: {matcher.literals}"
+
+        file_path = tmp_path / "test.log"
+        file_path.write_bytes(b"".join(LINES))
+        with file_path.open(mode="rb") as file:
+            actual = [line for _, line in matcher.scan(file=file)]
+        lines = [LINES[number] for number in expected]
+        assert actual == lines, f"expect {lines} but got {actual}"
+
+        compressed_path = tmp_path / "test.log.gz"
+        compressed_path.write_bytes(gzip.compress(b"".join(LINES)))
+        with open_decompressed(path=compressed_path, compression="gzip") as file:
+            actual = [line for _, line in matcher.stream_scan(file=file)]
+        assert actual == lines, f"expect {lines} but got {actual}"
+
+    def test_offsets(self) -> None:
+        """Tests the offsets of the lines found in a range of a buffer."""
+        matcher = compile_filter("level=CRITICAL|WARNING", log_format=LogFormat())
+        buffer = b"".join(LINES)
+        actual = [offset for offset, _ in matcher.find(buffer, 0, len(buffer))]
+        expected = [0, sum(map(len, LINES[:3]))]
+        assert actual == expected, f"expect {expected} but got {actual}"
+
+        start = len(LINES[0])
+        actual = [offset for offset, _ in matcher.find(buffer, start, len(buffer))]
+        assert actual == expected[1:], f"expect {expected[1:]} but got {actual}"
+
+    def test_json_format(self) -> None:
+        """Tests that the fields are checked by their keys in JSON lines."""
+        matcher = Matcher(
+            parse_query("level=ERROR and process!=7"), log_format=JsonFormat()
+        )
+        actual = [
+            matcher.match('{"level": "ERROR", "process": 8, "msg": "x"}'),
+            matcher.match('{"level": "ERROR", "process": 7, "msg": "x"}'),
+            matcher.match('{"level": "INFO", "msg": "ERROR"}'),
+            matcher.match('{"level": "error", "process": 8, "msg": "x"}'),
+        ]
+        expected = [True, False, False, True]
+        assert actual == expected, f"expect {expected} but got {actual}"
+
+        buffer = b'{"level": "error", "process": 8, "msg": "x"}\n'
+        actual = [offset for offset, _ in matcher.find(buffer, 0, len(buffer))]
+        assert actual == [0], f"expect [0] but got {actual}"
+
+    def test_unknown_field(self) -> None:
+        """Tests that a field the format does not have raises a ValueError."""
+        with pytest.raises(ValueError):
+            compile_filter("host=web1", log_format=LogFormat())
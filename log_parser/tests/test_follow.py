@@ -0,0 +1,70 @@
+from pathlib import Path
+
+import pytest
+
+from ..follow import follow_scan
+
+
+class TestFollowScan:
+    """Test class for the follow_scan engine."""
+
+    @pytest.fixture
+    def sample_file_path(self, tmp_path: Path) -> Path:
+        """Fixture for creating a sample log file."""
+        file_path = tmp_path / "test.log"
+        file_path.write_bytes(b"ERROR: line 1\nINFO: line 2\n")
+        return file_path
+
+    @staticmethod
+    def append(file_path: Path, content: bytes) -> None:
+        """Append content to a file, like a logging handler would."""
+        with file_path.open(mode="ab") as file:
+            file.write(content)
+
+    def test_appended_lines(self, sample_file_path: Path) -> None:
+        """Tests that appended lines are yielded, but only once they are complete."""
+        follower = follow_scan(
+            file_path=sample_file_path, token=b"ERROR", poll_interval=0.001
+        )
+        actual = next(follower)
+        expected = (0, b"ERROR: line 1\n")
+        assert actual == expected, f"expect {expected} but got {actual}"
+
+        self.append(sample_file_path, b"ERROR: line 3")
+        self.append(sample_file_path, b" continued\n")
+        actual = next(follower)
+        expected = (27, b"ERROR: line 3 continued\n")
+        assert actual == expected, f"expect {expected} but got {actual}"
+        follower.close()
+
+    def test_rotation(self, sample_file_path: Path) -> None:
+        """
+        Tests that the lines written right before a rotation are not lost and that
+        the follower switches to the new file.
+        """
+        follower = follow_scan(
+            file_path=sample_file_path, token=b"ERROR", poll_interval=0.001
+        )
+        next(follower)
+
+        self.append(sample_file_path, b"ERROR: before rotation\n")
+        sample_file_path.rename(sample_file_path.with_name("test.log.1"))
+        sample_file_path.write_bytes(b"INFO: new 1\nERROR: after rotation\n")
+
+        actual = [next(follower), next(follower)]
+        expected = [(27, b"ERROR: before rotation\n"), (12, b"ERROR: after rotation\n")]
+        assert actual == expected, f"expect {expected} but got {actual}"
+        follower.close()
+
+    def test_truncation(self, sample_file_path: Path) -> None:
+        """Tests that a file truncated in place is read again from the beginning."""
+        follower = follow_scan(
+            file_path=sample_file_path, token=b"ERROR", poll_interval=0.001
+        )
+        next(follower)
+
+        sample_file_path.write_bytes(b"ERROR: new\n")
+        actual = next(follower)
+        expected = (0, b"ERROR: new\n")
+        assert actual == expected, f"expect {expected} but got {actual}"
+        follower.close()
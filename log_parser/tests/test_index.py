@@ -0,0 +1,111 @@
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from ..index import FileIdentity, OffsetIndex
+
+
+class TestOffsetIndex:
+    """Test class for the OffsetIndex sidecar index."""
+
+    levels = ("DEBUG", "INFO", "ERROR")
+
+    @pytest.fixture
+    def sample_file_path(self, tmp_path: Path) -> Path:
+        """Fixture for creating a sample log file."""
+        file_path = tmp_path / "test.log"
+        file_path.write_bytes(b"DEBUG: line 1\nERROR: line 2\nINFO: line 3\n")
+        return file_path
+
+    def scan(self, file_path: Path, level: str) -> list:
+        """Scan the file through a fresh index, like a new process would."""
+        index = OffsetIndex(file_path=file_path, levels=self.levels)
+        with file_path.open(mode="rb") as file:
+            return list(index.scan(file=file, level=level))
+
+    def test_build_and_reuse(self, sample_file_path: Path) -> None:
+        """Tests that the index is saved during a scan and used by the next one."""
+        actual: Any = self.scan(sample_file_path, "ERROR")
+        expected: Any = [(14, b"ERROR: line 2\n")]
+        assert actual == expected, f"expect {expected} but got {actual}"
+
+        index = OffsetIndex(file_path=sample_file_path, levels=self.levels)
+        index.load()
+        actual = {level: list(offsets) for level, offsets in index.offsets.items()}
+        expected = {"DEBUG": [0], "INFO": [28], "ERROR": [14]}
+        assert actual == expected, f"expect {expected} but got {actual}"
+
+        actual = self.scan(sample_file_path, "INFO")
+        expected = [(28, b"INFO: line 3\n")]
+        assert actual == expected, f"expect {expected} but got {actual}"
+
+    def test_incremental_update(self, sample_file_path: Path) -> None:
+        """Tests that only the appended part of a grown file is scanned."""
+        self.scan(sample_file_path, "ERROR")
+        with sample_file_path.open(mode="ab") as file:
+            file.write(b"ERROR: line 4\nERROR: partial")
+
+        actual = self.scan(sample_file_path, "ERROR")
+        expected: Any = [
+            (14, b"ERROR: line 2\n"),
+            (41, b"ERROR: line 4\n"),
+            (55, b"ERROR: partial"),
+        ]
+        assert actual == expected, f"expect {expected} but got {actual}"
+
+        # The trailing partial line must not be indexed.
+        index = OffsetIndex(file_path=sample_file_path, levels=self.levels)
+        index.load()
+        actual = list(index.offsets["ERROR"])
+        expected = [14, 41]
+        assert actual == expected, f"expect {expected} but got {actual}"
+
+    def test_bounded_scan(self, sample_file_path: Path) -> None:
+        """Tests that a scan with an end only reads and indexes the file up to it."""
+        index = OffsetIndex(file_path=sample_file_path, levels=self.levels)
+        with sample_file_path.open(mode="rb") as file:
+            actual: Any = list(index.scan(file=file, level="DEBUG", end=28))
+        expected: Any = [(0, b"DEBUG: line 1\n")]
+        assert actual == expected, f"expect {expected} but got {actual}"
+
+        index = OffsetIndex(file_path=sample_file_path, levels=self.levels)
+        index.load()
+        actual = {level: list(offsets) for level, offsets in index.offsets.items()}
+        expected = {"DEBUG": [0], "INFO": [], "ERROR": [14]}
+        assert actual == expected, f"expect {expected} but got {actual}"
+        assert index.identity is not None, "expect an identity but got None"
+        assert index.identity.size == 28, f"expect 28 but got {index.identity.size}"
+
+        actual = self.scan(sample_file_path, "INFO")
+        expected = [(28, b"INFO: line 3\n")]
+        assert actual == expected, f"expect {expected} but got {actual}"
+
+    def test_rebuild_on_truncation(self, sample_file_path: Path) -> None:
+        """Tests that the index is rebuilt when the file was truncated."""
+        self.scan(sample_file_path, "ERROR")
+        sample_file_path.write_bytes(b"ERROR: new\n")
+
+        actual = self.scan(sample_file_path, "ERROR")
+        expected = [(0, b"ERROR: new\n")]
+        assert actual == expected, f"expect {expected} but got {actual}"
+
+    def test_identity_compare(self, sample_file_path: Path) -> None:
+        """Tests the detection of unchanged, grown and replaced files."""
+        with sample_file_path.open(mode="rb") as file:
+            identity = FileIdentity.of(file=file)
+            actual = identity.compare(file)
+        assert actual == "unchanged", f"expect unchanged but got {actual}"
+
+        with sample_file_path.open(mode="ab") as file:
+            file.write(b"INFO: line 4\n")
+        with sample_file_path.open(mode="rb") as file:
+            actual = identity.compare(file)
+        assert actual == "grown", f"expect grown but got {actual}"
+
+        replacement = sample_file_path.with_name("new.log")
+        replacement.write_bytes(b"INFO: another file with more content\n" * 2)
+        replacement.replace(sample_file_path)
+        with sample_file_path.open(mode="rb") as file:
+            actual = identity.compare(file)
+        assert actual == "replaced", f"expect replaced but got {actual}"
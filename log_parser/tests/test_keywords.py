@@ -0,0 +1,116 @@
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from .. import keywords
+from ..keywords import KeywordIndex, decode_postings, encode_postings, tokenize
+
+CONTENT = (
+    b"ERROR: order_id=12345 failed\n"
+    b"INFO: order_id=12345 created\n"
+    b"ERROR: order_id=999 failed\n"
+    b"ERROR: Order_ID 12345 retried\n"
+)
+
+
+class TestKeywordIndex:
+    """Test class for the KeywordIndex inverted index."""
+
+    @pytest.fixture
+    def sample_file_path(self, tmp_path: Path) -> Path:
+        """Fixture for creating a sample log file."""
+        file_path = tmp_path / "test.log"
+        file_path.write_bytes(CONTENT)
+        return file_path
+
+    def search(self, file_path: Path, *words: str, level: str = "ERROR") -> list:
+        """Search the file through a fresh index, like a new process would."""
+        index = KeywordIndex(file_path=file_path)
+        with file_path.open(mode="rb") as file:
+            return list(index.search(file=file, keywords=words, level=level))
+
+    def test_tokenize_and_postings(self) -> None:
+        """Tests the tokens of a text and the round trip of the postings."""
+        actual: Any = tokenize("Order_ID=12345, failed!")
+        expected: Any = {b"order_id", b"12345", b"failed"}
+        assert actual == expected, f"expect {expected} but got {actual}"
+
+        offsets = [10, 11, 300, 70000, 2**40]
+        encoded = encode_postings(offsets=offsets, base=10)
+        actual = list(decode_postings(encoded=encoded, base=10))
+        assert actual == offsets, f"expect {offsets} but got {actual}"
+        assert len(encoded) < 8 * len(offsets), "expect compressed postings"
+
+    def test_search(self, sample_file_path: Path) -> None:
+        """Tests that the postings of the keywords and the level are intersected."""
+        actual = self.search(sample_file_path, "order_id", "12345")
+        expected = [
+            (0, b"ERROR: order_id=12345 failed\n"),
+            (85, b"ERROR: Order_ID 12345 retried\n"),
+        ]
+        assert actual == expected, f"expect {expected} but got {actual}"
+        assert KeywordIndex(sample_file_path).index_path.exists(), "expect a sidecar"
+
+        actual = self.search(sample_file_path, "created", level="ERROR")
+        assert actual == [], f"expect no lines but got {actual}"
+
+    def test_incremental_update(self, sample_file_path: Path) -> None:
+        """Tests that only the appended lines are indexed, in the same segment."""
+        self.search(sample_file_path, "12345")
+        with sample_file_path.open(mode="ab") as file:
+            file.write(b"ERROR: order_id=12345 again\nERROR: 12345 partial")
+
+        actual: Any = [offset for offset, _ in self.search(sample_file_path, "12345")]
+        expected: Any = [0, 85, 115, 143]
+        assert actual == expected, f"expect {expected} but got {actual}"
+
+        index = KeywordIndex(file_path=sample_file_path)
+        index.load()
+        actual = [(segment.start, segment.end) for segment in index.segments]
+        expected = [(0, 143)]
+        assert actual == expected, f"expect {expected} but got {actual}"
+
+    def test_segments(self, monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> None:
+        """Tests that large files are indexed into many segments."""
+        monkeypatch.setattr(keywords, "SEGMENT_SIZE", 40)
+        file_path = tmp_path / "test.log"
+        file_path.write_bytes(CONTENT)
+
+        actual = [offset for offset, _ in self.search(file_path, "failed")]
+        expected = [0, 58]
+        assert actual == expected, f"expect {expected} but got {actual}"
+
+        index = KeywordIndex(file_path=file_path)
+        index.load()
+        assert len(index.segments) > 1, f"expect many segments: {index.segments}"
+
+    def test_rebuild_on_replacement(self, sample_file_path: Path) -> None:
+        """Tests that the index is dropped when the file is replaced."""
+        self.search(sample_file_path, "12345")
+        sample_file_path.write_bytes(b"ERROR: order_id=777 failed\n")
+
+        actual = self.search(sample_file_path, "order_id")
+        expected = [(0, b"ERROR: order_id=777 failed\n")]
+        assert actual == expected, f"expect {expected} but got {actual}"
+
+    def test_corrupted_sidecar(self, sample_file_path: Path) -> None:
+        """Tests that a partly written sidecar is ignored and rebuilt."""
+        index = KeywordIndex(file_path=sample_file_path)
+        index.index_path.write_bytes(b'{"start": 0, "end": 10, "size": 999')
+
+        actual = [offset for offset, _ in self.search(sample_file_path, "999")]
+        expected = [58]
+        assert actual == expected, f"expect {expected} but got {actual}"
+
+    def test_carriage_return(self, tmp_path: Path) -> None:
+        """Tests that only a newline ends an indexed line, like in the other scans."""
+        file_path = tmp_path / "test.log"
+        file_path.write_bytes(b"INFO: x\rERROR: order 2\nERROR: order 3\x0c\n")
+
+        actual = self.search(file_path, "order")
+        expected = [
+            (0, b"INFO: x\rERROR: order 2\n"),
+            (23, b"ERROR: order 3\x0c\n"),
+        ]
+        assert actual == expected, f"expect {expected} but got {actual}"
@@ -1,11 +1,18 @@
+import gzip
+import lzma
 import os
 import tempfile
-from typing import Any
+from datetime import datetime, timedelta
+from typing import Any, Generator, List
 from pathlib import Path
 
 import pytest
 
+from ..cache import ResultCache
+from ..keywords import KeywordIndex
 from ..log_file_parser import LogParser
+from ..metrics import ScanMetrics
+from ..records import JsonFormat
 from ..utils.messages import ErrorMessages
 
 
@@ -17,7 +24,7 @@ class TestLogParser:
         return LogParser()
 
     @pytest.fixture
-    def sample_file_path(self, tmp_path: Path) -> Path:
+    def sample_file_path(self, tmp_path: Path) -> Generator[Path, None, None]:
         """Fixture for creating a sample file path."""
         file_path = tmp_path / 'test.log'
         file_path.touch()
@@ -46,7 +53,7 @@ class TestLogParser:
             with pytest.raises(
                 ValueError, match="path should be Path `object` or `str`"
             ):
-                log_parser.file_path = invalid_type
+                log_parser.file_path = invalid_type  # type: ignore[assignment]
 
     def test_valid_log_level(self, log_parser: LogParser) -> None:
         """Validates that the log level is correctly set in the LogParser instance."""
@@ -67,7 +74,7 @@ class TestLogParser:
         Tests the LogParser's behavior when an invalid log level type is provided.
         """
         with pytest.raises(AttributeError):
-            log_parser.log_level = 12
+            log_parser.log_level = 12  # type: ignore[assignment]
 
     def test_parse(self, log_parser: LogParser, sample_file_path: Path) -> None:
         """
@@ -96,6 +103,636 @@ class TestLogParser:
         with pytest.raises(StopIteration):
             next(log_parser.parse())
 
+    def test_valid_mode(self, log_parser: LogParser) -> None:
+        """Validates that the scan mode is correctly set in the LogParser instance."""
+        log_parser.mode = "MMap"
+        actual = log_parser.mode
+        expected = "mmap"
+        assert actual == expected, f"expect {expected} but got {actual}"
+
+    def test_invalid_mode(self, log_parser: LogParser) -> None:
+        """Tests the LogParser's behavior when an invalid scan mode is provided."""
+        with pytest.raises(ValueError, match="Valid scan modes are:"):
+            log_parser.mode = "something_invalid"
+
+    def test_parse_mmap(self, log_parser: LogParser, sample_file_path: Path) -> None:
+        """
+        Tests that the `mmap` mode yields the same lines as the `line` mode and keeps
+        the lazy, resumable behavior of the generator.
+        """
+        content = (
+            "DEBUG: Test line 1\nERROR: Test line 2\nINFO: Test line 3\n"
+            "ERROR: Test line 4"
+        )
+
+        with sample_file_path.open(mode="w") as file:
+            file.write(content)
+
+        log_parser.file_path = sample_file_path
+        log_parser.log_level = "ERROR"
+        log_parser.mode = "mmap"
+        generator = log_parser.parse()
+
+        actual = next(generator)
+        expected = "ERROR: Test line 2\n"
+        assert actual == expected, f"expect {expected} but got {actual}"
+
+        actual = next(log_parser.parse())
+        expected = "ERROR: Test line 4"
+        assert actual == expected, f"expect {expected} but got {actual}"
+
+        with pytest.raises(StopIteration):
+            next(log_parser.parse())
+
+    @pytest.mark.parametrize("mode", LogParser.valid_modes)
+    def test_parse_new_file(self, mode: str, tmp_path: Path) -> None:
+        """Tests that a parser given a new file path starts over on the new file."""
+        first, second = tmp_path / "first.log", tmp_path / "second.log"
+        first.write_text("ERROR: Test line 1\n")
+        second.write_text("ERROR: Test line 2\n")
+        log_parser = LogParser()
+        log_parser.file_path = first
+        log_parser.log_level = "ERROR"
+        log_parser.mode = mode
+        log_parser.workers = 2
+        next(log_parser.parse())
+
+        log_parser.file_path = second
+        actual = list(log_parser.parse())
+        expected = ["ERROR: Test line 2\n"]
+        assert actual == expected, f"expect {expected} but got {actual}"
+
+        log_parser.file_path = first
+        log_parser.mode = "mmap" if mode == "line" else "line"
+        actual = list(log_parser.parse())
+        expected = ["ERROR: Test line 1\n"]
+        assert actual == expected, f"expect {expected} but got {actual}"
+
+    def test_parse_parallel(
+        self, log_parser: LogParser, sample_file_path: Path
+    ) -> None:
+        """Tests that the `parallel` mode yields the matches in the file order."""
+        lines = [f"{'ERROR' if i % 2 else 'DEBUG'}: Test line {i}\n" for i in range(50)]
+
+        with sample_file_path.open(mode="w") as file:
+            file.write("".join(lines))
+
+        log_parser.file_path = sample_file_path
+        log_parser.log_level = "ERROR"
+        log_parser.mode = "parallel"
+        log_parser.workers = 2
+        log_parser.chunk_size = 64
+
+        actual = list(log_parser.parse())
+        expected = [line for line in lines if "ERROR" in line]
+        assert actual == expected, f"expect {expected} but got {actual}"
+
+    @pytest.mark.parametrize("mode", LogParser.valid_modes)
+    def test_parse_crlf(self, mode: str, sample_file_path: Path) -> None:
+        """Tests that every mode ends the lines of a CRLF log with a newline."""
+        content = (
+            "ERROR: Test line 1\r\nINFO: a\r\nERROR: Test line 2\r\n"
+            "DEBUG: Test line 3\r\nERROR: Test line 4"
+        )
+        sample_file_path.write_bytes(content.encode("utf-8"))
+
+        log_parser = LogParser()
+        log_parser.file_path = sample_file_path
+        log_parser.log_level = "ERROR"
+        log_parser.mode = mode
+        log_parser.workers = 2
+        log_parser.chunk_size = 16
+
+        actual = list(log_parser.parse())
+        expected = [
+            "ERROR: Test line 1\n",
+            "ERROR: Test line 2\n",
+            "ERROR: Test line 4",
+        ]
+        assert actual == expected, f"expect {expected} but got {actual}"
+
+    def test_parse_with_index(
+        self, log_parser: LogParser, sample_file_path: Path
+    ) -> None:
+        """Tests that a parse through the sidecar index yields the same lines."""
+        content = "DEBUG: Test line 1\nERROR: Test line 2\nERROR: Test line 3\n"
+
+        with sample_file_path.open(mode="w") as file:
+            file.write(content)
+
+        for _ in range(2):
+            parser = LogParser()
+            parser.file_path = sample_file_path
+            parser.log_level = "ERROR"
+            parser.use_index = True
+
+            actual = list(parser.parse())
+            expected = ["ERROR: Test line 2\n", "ERROR: Test line 3\n"]
+            assert actual == expected, f"expect {expected} but got {actual}"
+
+        sidecar = sample_file_path.with_name(f".{sample_file_path.name}.idx")
+        assert sidecar.exists(), f"{sidecar} is not created!"
+        sidecar.unlink()
+
+    def test_parse_follow(self, log_parser: LogParser, sample_file_path: Path) -> None:
+        """Tests that the follow mode keeps yielding lines appended to the file."""
+        with sample_file_path.open(mode="w") as file:
+            file.write("ERROR: Test line 1\n")
+
+        log_parser.file_path = sample_file_path
+        log_parser.log_level = "ERROR"
+        log_parser.follow = True
+
+        actual = next(log_parser.parse())
+        expected = "ERROR: Test line 1\n"
+        assert actual == expected, f"expect {expected} but got {actual}"
+
+        with sample_file_path.open(mode="a") as file:
+            file.write("INFO: Test line 2\nERROR: Test line 3\n")
+
+        actual = next(log_parser.parse())
+        expected = "ERROR: Test line 3\n"
+        assert actual == expected, f"expect {expected} but got {actual}"
+        log_parser._follower.close()
+
+    @pytest.mark.parametrize("mode", LogParser.valid_modes)
+    def test_parse_rotation(self, mode: str, tmp_path: Path) -> None:
+        """
+        Tests that a rotation family is parsed as one stream, from the oldest file
+        to the newest, with every scan mode.
+        """
+        contents = {
+            "project.log.2": "ERROR: Test line 1\nINFO: Test line 2\n",
+            "project.log.1": "ERROR: Test line 3\n",
+            "project.log": "INFO: Test line 4\nERROR: Test line 5\n",
+        }
+        for name, content in contents.items():
+            (tmp_path / name).write_text(content)
+
+        log_parser = LogParser()
+        log_parser.file_path = tmp_path / "project.log"
+        log_parser.log_level = "ERROR"
+        log_parser.mode = mode
+        log_parser.rotation = True
+
+        actual = [next(log_parser.parse())]
+        actual.extend(log_parser.parse())
+        expected = [
+            "ERROR: Test line 1\n",
+            "ERROR: Test line 3\n",
+            "ERROR: Test line 5\n",
+        ]
+        assert actual == expected, f"expect {expected} but got {actual}"
+
+    def test_parse_compressed_rotation(self, tmp_path: Path) -> None:
+        """
+        Tests that compressed members of a rotation family are decompressed on the
+        fly, next to the plain ones.
+        """
+        content = b"ERROR: Test line 1\nINFO: Test line 2\n"
+        (tmp_path / "project.log.2.gz").write_bytes(gzip.compress(content))
+        (tmp_path / "project.log.1").write_bytes(lzma.compress(b"ERROR: Test line 3"))
+        (tmp_path / "project.log").write_text("ERROR: Test line 4\n")
+
+        log_parser = LogParser()
+        log_parser.file_path = tmp_path / "project.log"
+        log_parser.log_level = "ERROR"
+        log_parser.mode = "mmap"
+        log_parser.rotation = True
+
+        actual = [next(log_parser.parse())]
+        actual.extend(log_parser.parse())
+        expected = [
+            "ERROR: Test line 1\n",
+            "ERROR: Test line 3",
+            "ERROR: Test line 4\n",
+        ]
+        assert actual == expected, f"expect {expected} but got {actual}"
+
+    def test_parse_structured(
+        self, log_parser: LogParser, sample_file_path: Path
+    ) -> None:
+        """
+        Tests that the structured mode matches the level by its field, not anywhere
+        in the line, and yields records.
+        """
+        content = (
+            "2024-01-01 10:00:00 - ERROR - app - 1 - 2 - Test line 1\n"
+            "2024-01-01 10:00:01 - DEBUG - app - 1 - 2 - Retrying after INFO\n"
+            "2024-01-01 10:00:02 - INFO - db - 1 - 2 - Test line 3\n"
+        )
+
+        with sample_file_path.open(mode="w") as file:
+            file.write(content)
+
+        log_parser.file_path = sample_file_path
+        log_parser.log_level = "INFO"
+        log_parser.mode = "mmap"
+        log_parser.structured = True
+
+        actual = [(record.module, record.message) for record in log_parser.parse()]
+        expected = [("db", "Test line 3")]
+        assert actual == expected, f"expect {expected} but got {actual}"
+
+    @pytest.mark.parametrize("mode", LogParser.valid_modes)
+    def test_parse_time_range(
+        self, mode: str, log_parser: LogParser, sample_file_path: Path
+    ) -> None:
+        """Tests that only the lines inside the time window are yielded."""
+        content = "".join(
+            f"2024-01-01 14:0{minute}:00 - ERROR - app - 1 - 2 - Test line {minute}\n"
+            for minute in range(10)
+        )
+
+        with sample_file_path.open(mode="w") as file:
+            file.write(content)
+
+        log_parser.file_path = sample_file_path
+        log_parser.log_level = "ERROR"
+        log_parser.mode = mode
+        log_parser.start_time = datetime(2024, 1, 1, 14, 3)
+        log_parser.end_time = datetime(2024, 1, 1, 14, 5)
+
+        actual = [line.rsplit(" - ", 1)[-1] for line in log_parser.parse()]
+        expected = ["Test line 3\n", "Test line 4\n", "Test line 5\n"]
+        assert actual == expected, f"expect {expected} but got {actual}"
+
+    @pytest.mark.parametrize("mode", LogParser.valid_modes)
+    def test_stats(
+        self, mode: str, log_parser: LogParser, sample_file_path: Path
+    ) -> None:
+        """Tests that the statistics are the same with every scan mode."""
+        content = "".join(
+            f"2024-01-01 14:0{number % 3}:00 - {level} - app - 1 - 2 - Line\n"
+            for number, level in enumerate(["ERROR", "INFO", "ERROR"] * 20)
+        )
+
+        with sample_file_path.open(mode="w") as file:
+            file.write(content)
+
+        log_parser.file_path = sample_file_path
+        log_parser.mode = mode
+        log_parser.workers = 2
+        log_parser.chunk_size = 256
+
+        actual = log_parser.stats(bucket_size=timedelta(minutes=1)).table("level")
+        expected = [("ERROR", 40), ("INFO", 20)]
+        assert actual == expected, f"expect {expected} but got {actual}"
+
+    @pytest.mark.parametrize("mode", LogParser.valid_modes)
+    def test_sketch(
+        self, mode: str, log_parser: LogParser, sample_file_path: Path
+    ) -> None:
+        """
+        Tests that the sketches are the same with every scan mode, leaving out the
+        lines that only mention the level.
+        """
+        content = "".join(
+            f"2024-01-01 14:00:00 - {level} - mod{number % 4} - {number} - 2 - "
+            f"{'Failed' if number % 5 else 'Timeout'}\n"
+            for number, level in enumerate(["ERROR", "INFO", "ERROR"] * 20)
+        )
+        content += "2024-01-01 14:00:01 - INFO - mod9 - 99 - 2 - Retried ERROR\n"
+        sample_file_path.write_text(content)
+
+        log_parser.file_path = sample_file_path
+        log_parser.log_level = "ERROR"
+        log_parser.mode = mode
+        log_parser.workers = 2
+        log_parser.chunk_size = 256
+
+        summary = log_parser.sketch(sample_size=5).summary(top=1)
+        actual = (
+            summary["lines"],
+            summary["top_messages"],
+            summary["distinct_modules"],
+            summary["distinct_processes"],
+            len(summary["samples"]),
+        )
+        expected = (40, [{"message": "Failed", "count": 32}], 4, 40, 5)
+        assert actual == expected, f"expect {expected} but got {actual}"
+
+    def test_sketch_seed(self, log_parser: LogParser, sample_file_path: Path) -> None:
+        """Tests that the samples of the `parallel` mode are reproducible."""
+        sample_file_path.write_text(
+            "".join(
+                f"2024-01-01 14:00:00 - ERROR - mod - {number} - 2 - Failed\n"
+                for number in range(200)
+            )
+        )
+        log_parser.file_path = sample_file_path
+        log_parser.log_level = "ERROR"
+        log_parser.mode = "parallel"
+        log_parser.workers = 2
+        log_parser.chunk_size = 256
+
+        actual, expected = (
+            log_parser.sketch(sample_size=5, seed=7).samples.sample() for _ in range(2)
+        )
+        assert len(actual) == 5, f"expect 5 samples but got {actual}"
+        assert actual == expected, f"expect {expected} but got {actual}"
+
+    def test_templates(self, log_parser: LogParser, sample_file_path: Path) -> None:
+        """Tests that the templates are mined apart from the position of parse()."""
+        sample_file_path.write_text(
+            "".join(
+                f"2024-01-01 14:00:0{number} - ERROR - db - 1 - 2 - Query {number} "
+                "failed\n"
+                for number in range(5)
+            )
+            + "2024-01-01 14:00:09 - INFO - db - 1 - 2 - Retried the ERROR\n"
+        )
+        log_parser.file_path = sample_file_path
+        log_parser.log_level = "ERROR"
+        lines = log_parser.parse()
+        next(lines)
+
+        templates = log_parser.templates().templates()
+        actual: Any = [(template.pattern, template.count) for template in templates]
+        expected: Any = [("Query <NUM> failed", 5)]
+        assert actual == expected, f"expect {expected} but got {actual}"
+
+        actual = next(lines)
+        expected = "2024-01-01 14:00:01 - ERROR - db - 1 - 2 - Query 1 failed\n"
+        assert actual == expected, f"expect {expected} but got {actual}"
+
+    @pytest.mark.parametrize("mode", LogParser.valid_modes)
+    def test_json_lines(
+        self, mode: str, log_parser: LogParser, sample_file_path: Path
+    ) -> None:
+        """Tests that JSON lines are matched by their level field, not by text."""
+        sample_file_path.write_text(
+            '{"level": "ERROR", "msg": "Failed"}\n'
+            '{"level": "INFO", "msg": "Retrying after ERROR"}\n'
+            '{"ctx": {"level": "ERROR"}, "level": "INFO", "msg": "Nested"}\n'
+            '{"level": "error", "msg": "Failed again"}\n'
+        )
+        log_parser.file_path = sample_file_path
+        log_parser.log_level = "ERROR"
+        log_parser.mode = mode
+        log_parser.workers = 2
+        log_parser.log_format = JsonFormat()
+
+        actual = [line.rstrip("\n") for line in log_parser.parse()]
+        expected = [
+            '{"level": "ERROR", "msg": "Failed"}',
+            '{"level": "error", "msg": "Failed again"}',
+        ]
+        assert actual == expected, f"expect {expected} but got {actual}"
+
+        log_parser = LogParser()
+        log_parser.file_path = sample_file_path
+        log_parser.log_level = "ERROR"
+        log_parser.log_format = JsonFormat()
+        log_parser.structured = True
+        actual = [record.message for record in log_parser.parse()]
+        expected = ["Failed", "Failed again"]
+        assert actual == expected, f"expect {expected} but got {actual}"
+
+        record, last = log_parser.goto(1), log_parser.last()
+        assert record is not None and last is not None, "expect the records"
+        actual = [record.message, last.message]
+        expected = ["Failed again", "Failed again"]
+        assert actual == expected, f"expect {expected} but got {actual}"
+
+    @pytest.mark.parametrize("use_keyword_index", [False, True])
+    def test_keywords(
+        self, use_keyword_index: bool, log_parser: LogParser, sample_file_path: Path
+    ) -> None:
+        """Tests that the lines are kept by their keywords, with or without index."""
+        sample_file_path.write_text(
+            "ERROR: order_id=12345 failed\n"
+            "INFO: order_id=12345 created\n"
+            "ERROR: order_id=123456 failed\n"
+            "ERROR: ORDER_ID 12345 retried\n"
+        )
+        log_parser.file_path = sample_file_path
+        log_parser.log_level = "ERROR"
+        log_parser.keywords = ("order_id", "12345")
+        log_parser.use_keyword_index = use_keyword_index
+
+        actual: Any = list(log_parser.parse())
+        expected: Any = [
+            "ERROR: order_id=12345 failed\n",
+            "ERROR: ORDER_ID 12345 retried\n",
+        ]
+        assert actual == expected, f"expect {expected} but got {actual}"
+
+        actual = log_parser.last()
+        expected = "ERROR: ORDER_ID 12345 retried\n"
+        assert actual == expected, f"expect {expected} but got {actual}"
+        KeywordIndex(file_path=sample_file_path).reset()
+
+    def test_keywords_level_in_token(self, sample_file_path: Path) -> None:
+        """Tests that the index finds the level inside a token, like a full scan."""
+        sample_file_path.write_text(
+            "DB_ERROR: order_id=12345 failed\nINFO: order_id=12345 created\n"
+        )
+        expected = ["DB_ERROR: order_id=12345 failed\n"]
+        for use_keyword_index in (False, True):
+            log_parser = LogParser()
+            log_parser.file_path = sample_file_path
+            log_parser.log_level = "ERROR"
+            log_parser.keywords = ("order_id",)
+            log_parser.use_keyword_index = use_keyword_index
+            actual = list(log_parser.parse())
+            assert actual == expected, f"expect {expected} but got {actual}"
+        KeywordIndex(file_path=sample_file_path).reset()
+
+    @pytest.mark.parametrize("mode", LogParser.valid_modes)
+    def test_query(
+        self, mode: str, log_parser: LogParser, sample_file_path: Path
+    ) -> None:
+        """Tests that a query replaces the log level, in every mode and format."""
+        sample_file_path.write_text(
+            "2024-01-01 14:00:00 - WARNING - db - 10 - 1 - Slow query\n"
+            "2024-01-01 14:00:01 - INFO - db - 10 - 1 - WARNING threshold\n"
+            "2024-01-01 14:00:02 - ERROR - app - 11 - 1 - Timed out\n"
+            "2024-01-01 14:00:03 - CRITICAL - db - 12 - 1 - Connection lost\n"
+        )
+        log_parser.file_path = sample_file_path
+        log_parser.mode = mode
+        log_parser.query = "level>=WARNING and module=db"
+
+        actual = [line[22:30] for line in log_parser.parse()]
+        expected = ["WARNING ", "CRITICAL"]
+        assert actual == expected, f"expect {expected} but got {actual}"
+
+        log_parser.structured = True
+        last = log_parser.last()
+        assert last is not None, "expect a record but got None"
+        actual = last.levelname
+        assert actual == "CRITICAL", f"expect CRITICAL but got {actual}"
+
+        with pytest.raises(ValueError, match="Valid levels"):
+            log_parser.query = "level=FATAL"
+
+        gzip_path = sample_file_path.with_suffix(".gz")
+        gzip_path.write_bytes(gzip.compress(sample_file_path.read_bytes()))
+        log_parser = LogParser()
+        log_parser.file_path = gzip_path
+        log_parser.query = 'message~"(?i)timed out" or process=12'
+        actual = [line[22:30] for line in log_parser.parse()]
+        expected = ["ERROR - ", "CRITICAL"]
+        assert actual == expected, f"expect {expected} but got {actual}"
+        gzip_path.unlink()
+
+    def test_navigation(self, log_parser: LogParser, sample_file_path: Path) -> None:
+        """Tests going back and forth and jumping between the matching lines."""
+        with sample_file_path.open(mode="w") as file:
+            for number in range(50):
+                file.write(f"ERROR: Test line {number}\nDEBUG: Skipped line\n")
+
+        log_parser.file_path = sample_file_path
+        log_parser.log_level = "ERROR"
+        log_parser.checkpoint_interval = 8
+
+        actual: Any = [
+            log_parser.first(),
+            log_parser.next_match(),
+            log_parser.goto(30),
+            log_parser.previous_match(),
+            log_parser.last(),
+            log_parser.goto(20),
+            log_parser.next_match(),
+        ]
+        expected: Any = [
+            f"ERROR: Test line {number}\n" for number in (0, 1, 30, 29, 49, 20, 21)
+        ]
+        assert actual == expected, f"expect {expected} but got {actual}"
+
+        actual = len(log_parser._checkpoints.offsets)
+        expected = 7
+        assert actual == expected, f"expect {expected} but got {actual}"
+
+        actual = (log_parser.goto(50), log_parser.position)
+        expected = (None, 21)
+        assert actual == expected, f"expect {expected} but got {actual}"
+
+    def test_navigation_grown_file(
+        self, log_parser: LogParser, sample_file_path: Path
+    ) -> None:
+        """Tests that the matches appended to the file are found by last()."""
+        sample_file_path.write_text("ERROR: Test line 1\n")
+        log_parser.file_path = sample_file_path
+        log_parser.log_level = "ERROR"
+        log_parser.last()
+
+        with sample_file_path.open(mode="a") as file:
+            file.write("ERROR: Test line 2\n")
+
+        actual = log_parser.last()
+        expected = "ERROR: Test line 2\n"
+        assert actual == expected, f"expect {expected} but got {actual}"
+
+    def test_navigation_new_filter(
+        self, log_parser: LogParser, sample_file_path: Path
+    ) -> None:
+        """Tests that the checkpoints of the previous filter are dropped."""
+        with sample_file_path.open(mode="w") as file:
+            for number in range(6):
+                file.write(f"ERROR: Test line {number}\n")
+            for number in range(3):
+                file.write(f"INFO: Test line {number}\n")
+
+        log_parser.file_path = sample_file_path
+        log_parser.log_level = "ERROR"
+        log_parser.checkpoint_interval = 2
+        log_parser.last()
+
+        log_parser.log_level = "INFO"
+        actual = (log_parser.last(), log_parser.position)
+        expected = ("INFO: Test line 2\n", 2)
+        assert actual == expected, f"expect {expected} but got {actual}"
+
+        log_parser.keywords = ("1",)
+        actual = (log_parser.last(), log_parser.position)
+        expected = ("INFO: Test line 1\n", 0)
+        assert actual == expected, f"expect {expected} but got {actual}"
+
+    def test_cache(self, sample_file_path: Path) -> None:
+        """Tests that repeated queries are answered from the shared result cache."""
+        sample_file_path.write_text("ERROR: Test line 1\nINFO: Test line 2\n")
+        cache = ResultCache()
+
+        for _ in range(3):
+            log_parser = LogParser()
+            log_parser.cache = cache
+            log_parser.file_path = sample_file_path
+            log_parser.log_level = "ERROR"
+            actual: Any = list(log_parser.parse())
+            expected: Any = ["ERROR: Test line 1\n"]
+            assert actual == expected, f"expect {expected} but got {actual}"
+
+        actual = (cache.hits, cache.misses)
+        expected = (2, 1)
+        assert actual == expected, f"expect {expected} but got {actual}"
+
+    @pytest.mark.parametrize("mode", LogParser.valid_modes)
+    def test_profile(
+        self, mode: str, log_parser: LogParser, sample_file_path: Path
+    ) -> None:
+        """Tests that the metrics are gathered and reported with every scan mode."""
+        sample_file_path.write_text("ERROR: Test line 1\nINFO: Test line 2\n" * 5)
+        reports: List[ScanMetrics] = []
+        log_parser.file_path = sample_file_path
+        log_parser.log_level = "ERROR"
+        log_parser.mode = mode
+        log_parser.workers = 2
+        log_parser.metrics_hook = reports.append
+
+        lines = list(log_parser.parse())
+        metrics = log_parser.metrics
+        assert metrics is not None, "expect the metrics but got None"
+        actual = (len(lines), metrics.matches, metrics.lines_scanned)
+        expected = (5, 5, 10)
+        assert actual == expected, f"expect {expected} but got {actual}"
+        assert reports, "expect the metrics to be reported to the hook"
+
+    @pytest.mark.parametrize(
+        "setting, value, scanned",
+        [("query", "level=ERROR", 10), ("use_index", True, 5)],
+    )
+    def test_profile_other_scans(
+        self,
+        setting: str,
+        value: Any,
+        scanned: int,
+        log_parser: LogParser,
+        sample_file_path: Path,
+    ) -> None:
+        """
+        Tests that the metrics are gathered by the query scan, reading every line,
+        and by the offset index, reading only the lines it returns.
+        """
+        sample_file_path.write_text(
+            "2024-01-01 14:00:00 - ERROR - db - 10 - 1 - Failed\n"
+            "2024-01-01 14:00:01 - INFO - db - 10 - 1 - Retrying\n" * 5
+        )
+        log_parser.file_path = sample_file_path
+        log_parser.log_level = "ERROR"
+        log_parser.profile = True
+        setattr(log_parser, setting, value)
+
+        lines = list(log_parser.parse())
+        metrics = log_parser.metrics
+        assert metrics is not None, "expect the metrics but got None"
+        actual = (len(lines), metrics.matches, metrics.lines_scanned)
+        expected = (5, 5, scanned)
+        assert actual == expected, f"expect {expected} but got {actual}"
+        assert metrics.bytes_read > 0, "expect the bytes read to be counted"
+
+        sidecar = sample_file_path.with_name(f".{sample_file_path.name}.idx")
+        sidecar.unlink(missing_ok=True)
+
+    def test_no_profile(self, log_parser: LogParser, sample_file_path: Path) -> None:
+        """Tests that no metrics are gathered unless they are asked for."""
+        sample_file_path.write_text("ERROR: Test line 1\n")
+        log_parser.file_path = sample_file_path
+        log_parser.log_level = "ERROR"
+        list(log_parser.parse())
+        assert log_parser.metrics is None, "expect no metrics"
+
     def test_file_not_found_error(self, capsys: Any, log_parser: LogParser) -> None:
         """
         Tests the behavior of the LogParser when a FileNotFoundError occurs during
@@ -0,0 +1,115 @@
+from pathlib import Path
+
+import pytest
+
+from ..merge import MergedLogParser
+from ..records import JsonFormat, LogEntry
+
+
+class TestMergedLogParser:
+    """Test class for the MergedLogParser."""
+
+    @pytest.fixture
+    def sample_file_paths(self, tmp_path: Path) -> list:
+        """Fixture for creating two interleaved log files."""
+        first_path = tmp_path / "worker1.log"
+        first_path.write_text(
+            "2024-01-01 14:00:00 - ERROR - app - 1 - 2 - Line 1\n"
+            "2024-01-01 14:00:20 - ERROR - app - 1 - 2 - Line 3\n"
+            "Traceback (most recent call last):\n"
+            "2024-01-01 14:00:30 - INFO - app - 1 - 2 - Line 4\n"
+            "2024-01-01 14:00:40 - ERROR - app - 1 - 2 - Line 5\n"
+        )
+        second_path = tmp_path / "worker2.log"
+        second_path.write_text(
+            "2024-01-01 14:00:10 - ERROR - db - 3 - 4 - Line 2\n"
+            "2024-01-01 14:00:30 - ERROR - db - 3 - 4 - Line 4\n"
+        )
+        return [first_path, second_path]
+
+    @pytest.mark.parametrize("mode", MergedLogParser.valid_modes)
+    def test_parse(self, mode: str, sample_file_paths: list) -> None:
+        """Tests that the lines of every file are yielded in timestamp order."""
+        parser = MergedLogParser()
+        parser.file_paths = sample_file_paths
+        parser.log_level = "ERROR"
+        parser.mode = mode
+
+        actual = [line.rsplit(" - ", 1)[-1] for line in parser.parse()]
+        expected = ["Line 1\n", "Line 2\n", "Line 3\n", "Line 4\n", "Line 5\n"]
+        assert actual == expected, f"expect {expected} but got {actual}"
+
+    def test_resume(self, sample_file_paths: list) -> None:
+        """Tests that a new call to parse() resumes the merged stream."""
+        parser = MergedLogParser()
+        parser.file_paths = sample_file_paths
+        parser.log_level = "ERROR"
+
+        first = next(parser.parse())
+        actual = [first, *parser.parse()]
+        assert len(actual) == 5, f"expect 5 but got {len(actual)}"
+
+    def test_structured(self, sample_file_paths: list) -> None:
+        """Tests that structured records are merged by their asctime."""
+        parser = MergedLogParser()
+        parser.file_paths = sample_file_paths
+        parser.log_level = "ERROR"
+        parser.structured = True
+
+        records = list(parser.parse())
+        assert all(isinstance(record, LogEntry) for record in records)
+        actual = [record.module for record in records]
+        expected = ["app", "db", "app", "db", "app"]
+        assert actual == expected, f"expect {expected} but got {actual}"
+
+    def test_structured_without_time(self, tmp_path: Path) -> None:
+        """Tests that the records without an asctime keep their file position."""
+        first_path = tmp_path / "worker1.jsonl"
+        first_path.write_text(
+            '{"level": "ERROR", "msg": "Line 1"}\n'
+            '{"level": "ERROR", "asctime": "2024-01-01 14:00:20", "msg": "Line 3"}\n'
+        )
+        second_path = tmp_path / "worker2.jsonl"
+        second_path.write_text(
+            '{"level": "ERROR", "asctime": "2024-01-01 14:00:10", "msg": "Line 2"}\n'
+        )
+        parser = MergedLogParser()
+        parser.file_paths = [first_path, second_path]
+        parser.log_level = "ERROR"
+        parser.log_format = JsonFormat()
+        parser.structured = True
+
+        actual = [record.message for record in parser.parse()]
+        expected = ["Line 1", "Line 2", "Line 3"]
+        assert actual == expected, f"expect {expected} but got {actual}"
+
+    def test_stats(self, sample_file_paths: list) -> None:
+        """Tests that the statistics of every file are merged."""
+        parser = MergedLogParser()
+        parser.file_paths = sample_file_paths
+
+        actual = parser.stats().table("module")
+        expected = [("app", 4), ("db", 2)]
+        assert actual == expected, f"expect {expected} but got {actual}"
+
+    def test_new_file_paths(self, sample_file_paths: list) -> None:
+        """Tests that new file paths start a new merge."""
+        parser = MergedLogParser()
+        parser.file_paths = sample_file_paths
+        parser.log_level = "ERROR"
+        next(parser.parse())
+
+        parser.file_paths = sample_file_paths[1:]
+        actual = [line.rsplit(" - ", 1)[-1] for line in parser.parse()]
+        expected = ["Line 2\n", "Line 4\n"]
+        assert actual == expected, f"expect {expected} but got {actual}"
+
+    def test_no_navigation(self, sample_file_paths: list) -> None:
+        """Tests that the navigation methods refuse the merged stream."""
+        parser = MergedLogParser()
+        parser.file_paths = sample_file_paths
+        parser.log_level = "ERROR"
+
+        for navigate in (parser.first, parser.last, parser.next_match):
+            with pytest.raises(ValueError, match="can be navigated"):
+                navigate()
@@ -0,0 +1,39 @@
+import io
+from typing import Any
+
+from ..metrics import ScanMetrics, profiled_lines, profiled_scan
+
+
+class TestScanMetrics:
+    """Test class for the scan metrics and the profiled engines."""
+
+    def test_profiled_scan(self) -> None:
+        """Tests that the counters of every block are added and reported."""
+        reports = []
+        metrics = ScanMetrics(hook=lambda metrics: reports.append(metrics.bytes_read))
+        content = b"ERROR: Test line 1\nINFO: Test line 2\nERROR: Test line 3"
+        file = io.BytesIO(content)
+
+        actual: Any = list(
+            profiled_scan(file, b"ERROR", metrics, start=0, block_size=20)
+        )
+        expected: Any = [(0, b"ERROR: Test line 1\n"), (37, b"ERROR: Test line 3")]
+        assert actual == expected, f"expect {expected} but got {actual}"
+
+        actual = (metrics.bytes_read, metrics.lines_scanned, len(reports))
+        expected = (len(content), 3, 3)
+        assert actual == expected, f"expect {expected} but got {actual}"
+        assert metrics.read_time >= 0 and metrics.match_time >= 0
+
+    def test_profiled_lines(self) -> None:
+        """Tests that the lines and the matches of a text stream are counted."""
+        metrics = ScanMetrics()
+        lines = ["ERROR: Test line 1\n", "INFO: Test l\u00efne 2\n"]
+
+        actual: Any = list(profiled_lines(lines, "ERROR", metrics))
+        expected: Any = lines[:1]
+        assert actual == expected, f"expect {expected} but got {actual}"
+
+        actual = (metrics.lines_scanned, metrics.matches, metrics.bytes_read)
+        expected = (2, 1, sum(len(line.encode()) for line in lines))
+        assert actual == expected, f"expect {expected} but got {actual}"
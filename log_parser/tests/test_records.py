@@ -0,0 +1,149 @@
+import pickle
+import sys
+from typing import Any
+
+import pytest
+
+from ..records import JsonFormat, LogFormat
+
+LINE = "2024-01-01 10:00:00 - ERROR - app - 120 - 140 - Failed - INFO: retrying\n"
+
+
+class TestLogFormat:
+    """Test class for the LogFormat and its structured records."""
+
+    @pytest.fixture
+    def log_format(self) -> LogFormat:
+        """Fixture for creating the log format of `logging.toml`."""
+        return LogFormat()
+
+    def test_fields(self, log_format: LogFormat) -> None:
+        """Tests that the fields are read from the format string."""
+        actual = log_format.fields
+        expected = ("asctime", "levelname", "module", "process", "thread", "message")
+        assert actual == expected, f"expect {expected} but got {actual}"
+
+    def test_lazy_split(self, log_format: LogFormat) -> None:
+        """Tests that a line can be split only up to a given field."""
+        actual: Any = log_format.split(LINE, count=2)
+        expected: Any = ["2024-01-01 10:00:00", "ERROR"]
+        assert actual == expected, f"expect {expected} but got {actual}"
+
+        actual = log_format.field(LINE, "levelname")
+        assert actual == "ERROR", f"expect ERROR but got {actual}"
+
+    def test_parse(self, log_format: LogFormat) -> None:
+        """
+        Tests that a line is parsed into a slotted record, with its numeric fields
+        converted and the separators of the message kept.
+        """
+        record = log_format.parse(LINE)
+        assert record is not None, "expect a record but got None"
+        actual = record.as_dict()
+        expected = {
+            "asctime": "2024-01-01 10:00:00",
+            "levelname": "ERROR",
+            "module": "app",
+            "process": 120,
+            "thread": 140,
+            "message": "Failed - INFO: retrying",
+        }
+        assert actual == expected, f"expect {expected} but got {actual}"
+        assert not hasattr(record, "__dict__"), "the record should use slots only"
+        assert sys.getsizeof(record) < sys.getsizeof(actual)
+
+    def test_invalid_lines(self, log_format: LogFormat) -> None:
+        """Tests that lines that do not follow the format are rejected."""
+        for line in ("Traceback (most recent call last):", "a - ERROR - b - x - 1 - m"):
+            actual = log_format.parse(line)
+            assert actual is None, f"expect None but got {actual}"
+
+    def test_invalid_format(self) -> None:
+        """Tests that formats whose fields can not be told apart are rejected."""
+        with pytest.raises(ValueError, match="adjacent fields"):
+            LogFormat("%(levelname)s%(message)s")
+        with pytest.raises(ValueError, match="has no field"):
+            LogFormat("no fields")
+
+
+JSON_LINE = (
+    '{"time": "2024-01-01 10:00:00", "level": "INFO", "module": "app", '
+    '"process": 120, "msg": "Sent {\\"level\\": \\"ERROR\\"}"}\n'
+)
+
+
+class TestJsonFormat:
+    """Test class for the JsonFormat of JSON lines."""
+
+    @pytest.fixture
+    def log_format(self) -> JsonFormat:
+        """Fixture for creating the default JSON format."""
+        return JsonFormat()
+
+    def test_field(self, log_format: JsonFormat) -> None:
+        """Tests that the fields are found by their keys on the raw line."""
+        actual = [
+            log_format.field(JSON_LINE, name)
+            for name in ("asctime", "levelname", "process", "message", "thread")
+        ]
+        expected = [
+            "2024-01-01 10:00:00",
+            "INFO",
+            "120",
+            'Sent {"level": "ERROR"}',
+            None,
+        ]
+        assert actual == expected, f"expect {expected} but got {actual}"
+
+    def test_split_and_parse(self, log_format: JsonFormat) -> None:
+        """Tests that the lines are decoded into their fields and records."""
+        actual: Any = log_format.split(JSON_LINE, count=4)
+        expected: Any = ["2024-01-01 10:00:00", "INFO", "app", "120"]
+        assert actual == expected, f"expect {expected} but got {actual}"
+
+        record = log_format.parse(JSON_LINE)
+        assert record is not None, "expect a record but got None"
+        actual = (record.process, record.thread, record.message)
+        expected = (120, None, 'Sent {"level": "ERROR"}')
+        assert actual == expected, f"expect {expected} but got {actual}"
+
+        for line in ("Traceback (most recent call last):", "[1, 2]"):
+            assert log_format.split(line) is None, f"expect None for {line}"
+            assert log_format.parse(line) is None, f"expect None for {line}"
+
+    def test_nested_and_priority(self, log_format: JsonFormat) -> None:
+        """Tests that only the top-level keys are read, in their priority order."""
+        lines = [
+            '{"ctx": {"level": "ERROR"}, "level": "INFO"}',
+            '{"level": "INFO", "levelname": "ERROR"}',
+            '{"level": null, "msg": "x"}',
+        ]
+        actual = [log_format.field(line, "levelname") for line in lines]
+        expected = ["INFO", "ERROR", None]
+        assert actual == expected, f"expect {expected} but got {actual}"
+
+    def test_lowercase_level(self, log_format: JsonFormat) -> None:
+        """Tests that the levels are matched in any case, with a token of the key."""
+        line = '{"level": "error", "msg": "Failed"}'
+        actual: Any = (
+            log_format.is_level(line, "ERROR"),
+            log_format.level_token("ERROR"),
+        )
+        expected: Any = (True, b'"level')
+        assert actual == expected, f"expect {expected} but got {actual}"
+
+        actual = JsonFormat(keys={"levelname": "severity"}).level_token("ERROR")
+        expected = b'"severity"'
+        assert actual == expected, f"expect {expected} but got {actual}"
+
+    def test_keys(self) -> None:
+        """Tests that the keys of the fields can be configured."""
+        log_format = JsonFormat(keys={"levelname": "severity", "trace": "trace_id"})
+        line = '{"severity": "ERROR", "level": "INFO", "trace_id": "ab12"}'
+        actual = (log_format.field(line, "levelname"), log_format.field(line, "trace"))
+        expected = ("ERROR", "ab12")
+        assert actual == expected, f"expect {expected} but got {actual}"
+
+        copy = pickle.loads(pickle.dumps(log_format))
+        actual = copy.field(line, "levelname")
+        assert actual == "ERROR", f"expect ERROR but got {actual}"
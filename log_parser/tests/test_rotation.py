@@ -0,0 +1,44 @@
+import os
+from pathlib import Path
+
+import pytest
+
+from ..rotation import rotation_family
+
+
+class TestRotationFamily:
+    """Test class for the rotation_family function."""
+
+    @pytest.fixture
+    def sample_dir(self, tmp_path: Path) -> Path:
+        """Fixture for creating a rotated log set with a few unrelated files."""
+        for name in ("project.log", "project.log.1", "project.log.2", "project.log.10"):
+            (tmp_path / name).write_text(f"{name}\n")
+        (tmp_path / "project.log.bak").write_text("backup\n")
+        (tmp_path / ".project.log.idx").write_text("index\n")
+        (tmp_path / "other.log").write_text("other\n")
+        return tmp_path
+
+    def test_base_path(self, sample_dir: Path) -> None:
+        """Tests that the rotated members of a base path are found oldest first."""
+        actual = [path.name for path in rotation_family(sample_dir / "project.log")]
+        expected = ["project.log.10", "project.log.2", "project.log.1", "project.log"]
+        assert actual == expected, f"expect {expected} but got {actual}"
+
+    def test_glob(self, sample_dir: Path) -> None:
+        """Tests that a glob pattern is expanded and sorted chronologically."""
+        os.utime(sample_dir / "project.log.bak", ns=(0, 0))
+        actual = [path.name for path in rotation_family(sample_dir / "project.log*")]
+        expected = [
+            "project.log.10",
+            "project.log.2",
+            "project.log.1",
+            "project.log.bak",
+            "project.log",
+        ]
+        assert actual == expected, f"expect {expected} but got {actual}"
+
+    def test_no_member(self, tmp_path: Path) -> None:
+        """Tests that a family without any member raises FileNotFoundError."""
+        with pytest.raises(FileNotFoundError):
+            rotation_family(tmp_path / "project.log")
@@ -0,0 +1,161 @@
+import pickle
+from collections import Counter
+from typing import Hashable
+
+import pytest
+
+from ..sketches import HeavyHitters, HyperLogLog, LogSketch, Reservoir
+
+LINES = [
+    "2024-01-01 14:00:05 - ERROR - db - 10 - 1 - Failed",
+    "2024-01-01 14:00:30 - ERROR - db - 12 - 1 - Failed",
+    "2024-01-01 14:00:59 - ERROR - app - 11 - 1 - Timeout",
+    "Traceback (most recent call last):",
+    "2024-01-01 14:01:00 - ERROR - db - 10 - 1 - Failed",
+]
+
+
+class TestHeavyHitters:
+    """Test class for the approximate most frequent items."""
+
+    def test_exact_under_capacity(self) -> None:
+        """Tests that the counts are exact while the items fit in the counters."""
+        hitters = HeavyHitters(capacity=10)
+        hitters.update("abracadabra")
+        actual = hitters.top(2)
+        expected = [("a", 5), ("b", 2)]
+        assert actual == expected, f"expect {expected} but got {actual}"
+        assert hitters.error == 0, f"expect no error but got {hitters.error}"
+
+    def test_error_bound(self) -> None:
+        """Tests that the counts stay within the error bound past the capacity."""
+        items = [f"item {number % 500}" for number in range(5000)]
+        items += ["hot"] * 2000
+        hitters = HeavyHitters(capacity=20)
+        hitters.update(items)
+
+        bound = hitters.total / (hitters.capacity + 1)
+        assert hitters.error <= bound, f"expect at most {bound} but got {hitters.error}"
+        truth: Counter[Hashable] = Counter(items)
+        for item, count in hitters.counts.items():
+            assert count <= truth[item] <= count + hitters.error, (
+                f"expect {truth[item]} within the bounds of {count}"
+            )
+        actual = hitters.top(1)[0][0]
+        assert actual == "hot", f"expect hot but got {actual}"
+
+    def test_merge(self) -> None:
+        """Tests that merged summaries count the items of both streams."""
+        first, second = HeavyHitters(capacity=5), HeavyHitters(capacity=5)
+        first.update(["a", "a", "b"])
+        second.update(["a", "c"])
+        first.merge(second)
+        actual = dict(first.counts)
+        expected = {"a": 3, "b": 1, "c": 1}
+        assert actual == expected, f"expect {expected} but got {actual}"
+        assert first.total == 5, f"expect 5 items but got {first.total}"
+
+    def test_invalid_capacity(self) -> None:
+        """Tests that a capacity below one is rejected."""
+        with pytest.raises(ValueError, match="must be positive"):
+            HeavyHitters(capacity=0)
+
+
+class TestHyperLogLog:
+    """Test class for the approximate distinct counts."""
+
+    def test_estimate(self) -> None:
+        """Tests that the estimate is within a few standard errors."""
+        distinct = HyperLogLog(precision=12)
+        distinct.update(f"process {number}" for number in range(20000))
+        distinct.update(f"process {number}" for number in range(10000))
+        actual = distinct.estimate()
+        error = 1.04 / (2**12) ** 0.5
+        assert abs(actual - 20000) <= 4 * error * 20000, f"expect ~20000, got {actual}"
+
+    def test_small_counts(self) -> None:
+        """Tests that small counts are estimated almost exactly."""
+        distinct = HyperLogLog()
+        distinct.update(["db", "app", "db"])
+        actual = round(distinct.estimate())
+        assert actual == 2, f"expect 2 but got {actual}"
+
+    def test_merge(self) -> None:
+        """Tests that merging matches the sketch of the combined stream."""
+        first, second, combined = HyperLogLog(), HyperLogLog(), HyperLogLog()
+        first.update(range(0, 3000))
+        second.update(range(2000, 5000))
+        combined.update(range(0, 5000))
+        first.merge(second)
+        assert first.registers == combined.registers, "expect the same registers"
+
+        with pytest.raises(ValueError, match="same precision"):
+            first.merge(HyperLogLog(precision=10))
+
+    def test_invalid_precision(self) -> None:
+        """Tests that a precision out of range is rejected."""
+        with pytest.raises(ValueError, match="between 4 and 18"):
+            HyperLogLog(precision=3)
+
+
+class TestReservoir:
+    """Test class for the uniform sample."""
+
+    def test_sample(self) -> None:
+        """Tests that the sample keeps its size and the order of the stream."""
+        reservoir = Reservoir(size=5, seed=0)
+        reservoir.update(range(1000))
+        actual = reservoir.sample()
+        assert len(actual) == 5, f"expect 5 items but got {actual}"
+        assert actual == sorted(actual), f"expect the stream order but got {actual}"
+        assert reservoir.seen == 1000, f"expect 1000 but got {reservoir.seen}"
+
+    def test_merge(self) -> None:
+        """Tests that merged samples draw from both streams."""
+        first, second = Reservoir(size=100, seed=0), Reservoir(size=100, seed=1)
+        first.update(["first"] * 1000)
+        second.update(["second"] * 1000)
+        first.merge(second)
+        actual = Counter(first.sample())
+        assert sum(actual.values()) == 100, f"expect 100 items but got {actual}"
+        assert 25 <= actual["first"] <= 75, f"expect a balanced sample but got {actual}"
+
+
+class TestLogSketch:
+    """Test class for the approximate analytics of log lines."""
+
+    def test_summary(self) -> None:
+        """Tests the summary of the sample lines."""
+        sketch = LogSketch(sample_size=2, seed=0)
+        sketch.update(LINES)
+        actual = sketch.summary(top=1)
+        assert actual["lines"] == 4, f"expect 4 lines but got {actual['lines']}"
+        assert actual["skipped"] == 1, f"expect 1 skipped but got {actual['skipped']}"
+        expected = [{"message": "Failed", "count": 3}]
+        assert actual["top_messages"] == expected, (
+            f"expect {expected} but got {actual['top_messages']}"
+        )
+        assert actual["distinct_modules"] == 2, f"expect 2 but got {actual}"
+        assert actual["distinct_processes"] == 3, f"expect 3 but got {actual}"
+        assert len(actual["samples"]) == 2, f"expect 2 samples but got {actual}"
+
+    def test_level(self) -> None:
+        """Tests that only the lines whose levelname is the level are added."""
+        sketch = LogSketch(level="ERROR")
+        sketch.update(
+            LINES + ["2024-01-01 14:01:05 - INFO - db - 13 - 1 - Retried ERROR"]
+        )
+        actual = sketch.summary()
+        assert actual["lines"] == 4, f"expect 4 lines but got {actual['lines']}"
+        assert actual["distinct_processes"] == 3, f"expect 3 but got {actual}"
+
+    def test_merge_and_pickle(self) -> None:
+        """Tests that sketches survive pickling and merge like one stream."""
+        first, second = LogSketch(), LogSketch()
+        first.update(LINES[:2])
+        second.update(LINES[2:])
+        first.merge(pickle.loads(pickle.dumps(second)))
+        actual = first.summary()
+        assert actual["lines"] == 4, f"expect 4 lines but got {actual['lines']}"
+        assert actual["top_messages"][0]["count"] == 3, f"expect 3 but got {actual}"
+        assert actual["distinct_modules"] == 2, f"expect 2 but got {actual}"
@@ -0,0 +1,72 @@
+import io
+from datetime import datetime, timedelta
+
+import pytest
+
+from ..stats import LogStats
+
+LINES = [
+    "2024-01-01 14:00:05 - ERROR - db - 10 - 1 - Failed",
+    "2024-01-01 14:00:30 - ERROR - db - 10 - 1 - Failed - again",
+    "2024-01-01 14:00:59 - INFO - app - 11 - 1 - Started",
+    "Traceback (most recent call last):",
+    "2024-01-01 14:01:00 - ERROR - db - 10 - 1 - Failed",
+    "2024-01-01 14:01:10 - ERROR - app - 11 - 1 - Failed",
+]
+MINUTE = datetime(2024, 1, 1, 14, 0)
+
+
+class TestLogStats:
+    """Test class for the LogStats aggregation."""
+
+    @pytest.fixture
+    def stats(self) -> LogStats:
+        """Fixture for creating statistics of the sample lines."""
+        stats = LogStats(bucket_size=timedelta(minutes=1))
+        stats.update(LINES)
+        return stats
+
+    def test_counts(self, stats: LogStats) -> None:
+        """Tests the count of every combination and of the skipped lines."""
+        actual = stats.counts()
+        expected = {
+            (MINUTE, "ERROR", "db", 10): 2,
+            (MINUTE, "INFO", "app", 11): 1,
+            (MINUTE + timedelta(minutes=1), "ERROR", "db", 10): 1,
+            (MINUTE + timedelta(minutes=1), "ERROR", "app", 11): 1,
+        }
+        assert actual == expected, f"expect {expected} but got {actual}"
+        assert stats.skipped == 1, f"expect 1 skipped line but got {stats.skipped}"
+
+    def test_table(self, stats: LogStats) -> None:
+        """Tests that the table is grouped by the requested dimensions."""
+        actual = stats.table("level", "module")
+        expected = [("ERROR", "app", 1), ("ERROR", "db", 3), ("INFO", "app", 1)]
+        assert actual == expected, f"expect {expected} but got {actual}"
+
+        with pytest.raises(ValueError, match="Valid dimensions are:"):
+            stats.table("thread")
+
+    def test_merge(self, stats: LogStats) -> None:
+        """Tests that the statistics of two sources are added together."""
+        other = LogStats()
+        other.update(LINES[:1])
+        stats.merge(other)
+        actual = stats.table("level")
+        expected = [("ERROR", 5), ("INFO", 1)]
+        assert actual == expected, f"expect {expected} but got {actual}"
+
+    def test_update_blocks_and_csv(self) -> None:
+        """Tests the counting of raw blocks and the CSV output."""
+        stats = LogStats(bucket_size=timedelta(hours=1))
+        stats.update_blocks(["\n".join(LINES).encode("utf-8")])
+        output = io.StringIO()
+        stats.write_csv(output, "bucket", "level")
+
+        actual = output.getvalue().splitlines()
+        expected = [
+            "bucket,level,count",
+            "2024-01-01 14:00:00,ERROR,4",
+            "2024-01-01 14:00:00,INFO,1",
+        ]
+        assert actual == expected, f"expect {expected} but got {actual}"
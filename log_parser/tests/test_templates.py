@@ -0,0 +1,120 @@
+import io
+from typing import Any
+
+import pytest
+
+from ..templates import TemplateMiner, mask_message
+
+LINES = [
+    "2024-01-01 14:00:05 - ERROR - db - 10 - 1 - Query 42 failed after 1.5 s\n",
+    "2024-01-01 14:00:30 - ERROR - db - 10 - 1 - Query 7 failed after 30 s\n",
+    "Traceback (most recent call last):\n",
+    "2024-01-01 14:01:00 - ERROR - app - 11 - 1 - Cannot open /var/log/app.log\n",
+    "2024-01-01 14:02:00 - ERROR - db - 10 - 1 - Query 9 failed after 2 s\n",
+]
+
+
+class TestMaskMessage:
+    """Test class for the masking of the variable parts of the messages."""
+
+    @pytest.mark.parametrize(
+        "message, expected",
+        [
+            ("Query 42 failed after 1.5 s", "Query <NUM> failed after <NUM> s"),
+            ("Cannot open /var/log/app.1.log", "Cannot open <PATH>"),
+            ("Lost 10.0.0.12:5432", "Lost <IP>"),
+            (
+                "Request 123e4567-e89b-12d3-a456-426614174000 done",
+                "Request <UUID> done",
+            ),
+            ("Object at 0x7f3a2c done in 3ms", "Object at <HEX> done in 3ms"),
+            ("Commit 9fceb02d0ae598e9 pushed", "Commit <HEX> pushed"),
+            ("Connection reset", "Connection reset"),
+        ],
+    )
+    def test_mask(self, message: str, expected: str) -> None:
+        """Tests that the variable parts are replaced by their placeholders."""
+        actual = mask_message(message)
+        assert actual == expected, f"expect {expected} but got {actual}"
+
+
+class TestTemplateMiner:
+    """Test class for the streaming message-template clustering."""
+
+    def test_templates(self) -> None:
+        """Tests the counts, the timestamps and the examples of the templates."""
+        miner = TemplateMiner()
+        miner.update(LINES)
+        actual: Any = [
+            (template.pattern, template.count, template.first_time, template.last_time)
+            for template in miner.templates()
+        ]
+        expected: Any = [
+            (
+                "Query <NUM> failed after <NUM> s",
+                3,
+                "2024-01-01 14:00:05",
+                "2024-01-01 14:02:00",
+            ),
+            ("Traceback (most recent call last):", 1, None, None),
+            ("Cannot open <PATH>", 1, "2024-01-01 14:01:00", "2024-01-01 14:01:00"),
+        ]
+        assert actual == expected, f"expect {expected} but got {actual}"
+
+        actual = str(miner.templates(top=1)[0])
+        header = "[3 lines from 2024-01-01 14:00:05 to 2024-01-01 14:02:00]"
+        expected = f"{header} {LINES[0].rstrip()}"
+        assert actual == expected, f"expect {expected} but got {actual}"
+
+    def test_level(self) -> None:
+        """Tests that only the lines whose levelname is the level are mined."""
+        miner = TemplateMiner(level="ERROR")
+        miner.update(
+            LINES + ["2024-01-01 14:03:00 - INFO - db - 10 - 1 - Retried ERROR\n"]
+        )
+        actual = [(template.pattern, template.count) for template in miner.templates()]
+        expected = [
+            ("Query <NUM> failed after <NUM> s", 3),
+            ("Traceback (most recent call last):", 1),
+            ("Cannot open <PATH>", 1),
+        ]
+        assert actual == expected, f"expect {expected} but got {actual}"
+
+    def test_bounded_table(self) -> None:
+        """Tests that the least recently seen templates are evicted."""
+        miner = TemplateMiner(max_templates=2)
+        miner.update(["a", "b", "a", "c", "a"])
+        actual = sorted(miner.table)
+        expected = ["a", "c"]
+        assert actual == expected, f"expect {expected} but got {actual}"
+        assert miner.evicted == 1, f"expect 1 evicted line but got {miner.evicted}"
+
+        with pytest.raises(ValueError, match="must be positive"):
+            TemplateMiner(max_templates=0)
+
+    def test_merge(self) -> None:
+        """Tests that the templates of two sources are added together."""
+        first, second = TemplateMiner(), TemplateMiner()
+        first.update(LINES[1:2])
+        second.update(LINES[:1] + LINES[4:])
+        first.merge(second)
+        template = first.templates()[0]
+        actual = (template.count, template.first_time, template.last_time)
+        expected = (3, "2024-01-01 14:00:05", "2024-01-01 14:02:00")
+        assert actual == expected, f"expect {expected} but got {actual}"
+        assert template.example == LINES[0].rstrip("\n"), "expect the first line"
+
+    def test_write_csv(self) -> None:
+        """Tests the CSV output of the templates."""
+        miner = TemplateMiner()
+        miner.update(LINES[:2])
+        output = io.StringIO()
+        miner.write_csv(output)
+        actual = output.getvalue().splitlines()
+        expected = [
+            "count,first_time,last_time,template,example",
+            "2,2024-01-01 14:00:05,2024-01-01 14:00:30,Query <NUM> failed after "
+            "<NUM> s,2024-01-01 14:00:05 - ERROR - db - 10 - 1 - Query 42 failed "
+            "after 1.5 s",
+        ]
+        assert actual == expected, f"expect {expected} but got {actual}"
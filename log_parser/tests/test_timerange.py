@@ -0,0 +1,69 @@
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import pytest
+
+from ..records import LogFormat
+from ..timerange import seek_time, time_range
+
+START = datetime(2024, 1, 1, 14, 0, 0)
+
+
+class TestTimeRange:
+    """Test class for the binary search of time ranges."""
+
+    @pytest.fixture
+    def sample_file_path(self, tmp_path: Path) -> Path:
+        """
+        Fixture for creating a log file with one line every ten seconds and a
+        traceback line without a timestamp after each of them.
+        """
+        lines = []
+        for number in range(100):
+            timestamp = START + timedelta(seconds=10 * number)
+            asctime = f"{timestamp:%Y-%m-%d %H:%M:%S}"
+            lines.append(f"{asctime} - ERROR - app - 1 - 2 - {number}\n")
+            lines.append("Traceback (most recent call last):\n")
+        file_path = tmp_path / "test.log"
+        file_path.write_text("".join(lines))
+        return file_path
+
+    def first_number(self, file_path: Path, offset: int) -> str:
+        """Return the message of the line at the given offset."""
+        with file_path.open(mode="rb") as file:
+            file.seek(offset)
+            return file.readline().decode().rsplit(" - ", 1)[-1].strip()
+
+    def test_seek_time(self, sample_file_path: Path) -> None:
+        """Tests that the first line at or after a time is found."""
+        log_format = LogFormat()
+        cases = {
+            START: "0",
+            START + timedelta(seconds=5): "1",
+            START + timedelta(seconds=500): "50",
+            START - timedelta(days=1): "0",
+        }
+        with sample_file_path.open(mode="rb") as file:
+            for target, expected in cases.items():
+                offset = seek_time(file=file, target=target, log_format=log_format)
+                actual = self.first_number(sample_file_path, offset)
+                assert actual == expected, f"expect {expected} but got {actual}"
+
+            offset = seek_time(
+                file=file, target=START + timedelta(days=1), log_format=log_format
+            )
+        size = sample_file_path.stat().st_size
+        assert offset == size, f"expect {size} but got {offset}"
+
+    def test_time_range(self, sample_file_path: Path) -> None:
+        """Tests that the range includes the lines at both of its ends."""
+        with sample_file_path.open(mode="rb") as file:
+            start, end = time_range(
+                file=file,
+                log_format=LogFormat(),
+                start_time=START + timedelta(seconds=100),
+                end_time=START + timedelta(seconds=120),
+            )
+            file.seek(start)
+            actual = file.read(end - start).decode().count("ERROR")
+        assert actual == 3, f"expect 3 lines but got {actual}"
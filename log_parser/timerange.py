@@ -0,0 +1,139 @@
+import logging
+import os
+from datetime import datetime
+from typing import BinaryIO, Optional, Tuple
+
+from .records import LineFormat
+
+logger = logging.getLogger("core")
+
+# The `datefmt` of the `coreFormatter` in `logging.toml`.
+DEFAULT_DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
+# Stop looking for a timestamp after this many lines without one, like the lines
+# of a very long traceback.
+MAX_UNTIMED_LINES = 1000
+
+
+def line_time(
+    line: str, log_format: LineFormat, date_format: str = DEFAULT_DATE_FORMAT
+) -> Optional[datetime]:
+    """
+    Parse the timestamp of a log line from its `asctime` field.
+
+    Args:
+        line (str): The log line.
+        log_format (LineFormat): The format of the log line.
+        date_format (str): The `strftime` format of the `asctime` field.
+
+    Returns:
+        Optional[datetime]: The timestamp, or None if the line has no valid one.
+    """
+    value = log_format.field(line, "asctime")
+    if value is None:
+        return None
+    try:
+        return datetime.strptime(value, date_format)
+    except ValueError:
+        return None
+
+
+def _next_timed_line(
+    file: BinaryIO, position: int, log_format: LineFormat, date_format: str
+) -> Optional[Tuple[int, int, datetime]]:
+    """
+    Find the first line with a timestamp that starts at or after a byte offset.
+
+    Returns:
+        Optional[Tuple[int, int, datetime]]: The offsets of the beginning and the
+            end of that line and its timestamp, or None if there is no such line.
+    """
+    file.seek(max(position - 1, 0))
+    if position > 0:
+        # Resync to the beginning of the next line.
+        file.readline()
+
+    for _ in range(MAX_UNTIMED_LINES):
+        line_start = file.tell()
+        line = file.readline()
+        if not line:
+            return None
+        timestamp = line_time(
+            line=line.decode("utf-8", errors="replace"),
+            log_format=log_format,
+            date_format=date_format,
+        )
+        if timestamp is not None:
+            return line_start, file.tell(), timestamp
+    return None
+
+
+def seek_time(
+    file: BinaryIO,
+    target: datetime,
+    log_format: LineFormat,
+    date_format: str = DEFAULT_DATE_FORMAT,
+    inclusive: bool = True,
+) -> int:
+    """
+    Binary search a log file written in timestamp order for the first line at or
+    after a time, by seeking to byte offsets instead of reading the file.
+
+    Args:
+        file (BinaryIO): The log file opened in binary mode.
+        target (datetime): The time to search for.
+        log_format (LineFormat): The format of the log lines.
+        date_format (str): The `strftime` format of the `asctime` field.
+        inclusive (bool): Whether a line at exactly the target time is included
+            (the first line at or after it is found) or not (the first line after
+            it is found).
+
+    Returns:
+        int: The offset of the first line in the searched time, or the size of the
+            file if there is none.
+    """
+    size = os.fstat(file.fileno()).st_size
+    low, high = 0, size
+    while low < high:
+        middle = (low + high) // 2
+        found = _next_timed_line(
+            file=file, position=middle, log_format=log_format, date_format=date_format
+        )
+        if found is None:
+            high = middle
+            continue
+
+        _, line_end, timestamp = found
+        if timestamp > target or (inclusive and timestamp == target):
+            high = middle
+        else:
+            # Every line up to this one is before the target.
+            low = line_end
+
+    # Skip the lines without a timestamp, which belong to the record before.
+    found = _next_timed_line(
+        file=file, position=low, log_format=log_format, date_format=date_format
+    )
+    return size if found is None else found[0]
+
+
+def time_range(
+    file: BinaryIO,
+    log_format: LineFormat,
+    start_time: Optional[datetime] = None,
+    end_time: Optional[datetime] = None,
+    date_format: str = DEFAULT_DATE_FORMAT,
+) -> Tuple[int, int]:
+    """
+    Find the byte range of the lines between two times, both included.
+
+    Returns:
+        Tuple[int, int]: The offset of the first line in the range and the offset
+            right after the last one.
+    """
+    start, end = 0, os.fstat(file.fileno()).st_size
+    if start_time is not None:
+        start = seek_time(file, start_time, log_format, date_format, inclusive=True)
+    if end_time is not None:
+        end = seek_time(file, end_time, log_format, date_format, inclusive=False)
+    logger.debug(f"The time range {start_time} - {end_time} is at bytes {start}-{end}")
+    return start, max(start, end)
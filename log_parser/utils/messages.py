@@ -5,13 +5,21 @@ class ErrorMessages(StrEnum):
     """Enumeration of error messages used in the LogParser application."""
 
     INVALID_LOG_LEVEL = "Valid log levels are: {valid_levels}, but got `{value}`"
+    INVALID_MODE = "Valid scan modes are: {valid_modes}, but got `{value}`"
     WRONG_PATH = "The given path is wrong. Please provide a valid file path."
     WRONG_PATH_LOG = "Valid path sent by the user: `{path}`"
     NO_PERMISSION = "You do not have the permission to read this file!"
     NO_PERMISSION_LOG = (
-        "A file path that the user don't have permission to " "read it: `{path}`"
+        "A file path that the user don't have permission to read it: `{path}`"
+    )
+    NO_NAVIGATION = (
+        "Only a single uncompressed log file can be navigated, enter next, templates "
+        "or quit."
+    )
+    INVALID_COMMAND = (
+        "{command} is not a valid action, enter next, prev, first, last, goto N, "
+        "templates or quit."
     )
-    INVALID_COMMAND = "{command} is not a valid action, enter next or quit."
     INVALID_COMMAND_LOG = "user entered an invalid command: {command}"
 
 
@@ -19,8 +27,12 @@ class ViewMessages(StrEnum):
     """Enumeration of view messages used in the LogParser application."""
 
     DIVIDER = "------"
-    GET_PATH = "Enter the path of your log file: "
+    GET_PATH = (
+        "Enter the path of your log file (separate many paths with `,` to merge them): "
+    )
     GET_LOG_LEVEL = "Enter the log level you want to filter by: "
     COMMAND = (
-        "Enter `next` for seeing the next line or `quit` for quitting " "the app: "
+        "Enter `next` or `prev` for seeing the next or the previous line, `first`, "
+        "`last` or `goto N` for jumping to a line, `templates` for collapsing the "
+        "lines into their message templates, or `quit` for quitting the app: "
     )
@@ -1,18 +1,27 @@
-import os
 import logging
+import sys
 
 from .log_file_parser import LogParser
 from .utils.messages import ViewMessages, ErrorMessages
 
 logger = logging.getLogger("core")
 
+# Move the cursor to the top left corner, then erase the screen and the scrollback.
+CLEAR_SCREEN = "\033[H\033[2J\033[3J"
+
 
 class LogParserView:
     """A class representing the user interface for the LogParser application."""
 
     def clear_screen(self) -> None:
-        """Clears the terminal screen."""
-        os.system("cls" if os.name == "md" else "clear")    # pragma: no cover
+        """
+        Clears the terminal screen with ANSI escape codes, instead of starting a
+        `clear` process every time. Nothing is written when the output is not a
+        terminal, like when it is piped.
+        """
+        if sys.stdout.isatty():
+            sys.stdout.write(CLEAR_SCREEN)
+            sys.stdout.flush()
 
     def show_divider(self) -> None:
         """Prints a divider line to separate sections in the console."""
@@ -45,7 +54,7 @@ class LogParserView:
 
         if log_level.upper() not in valid_levels:
             msg = ErrorMessages.INVALID_LOG_LEVEL.format(
-                valid_levels=self.valid_levels, value=log_level
+                valid_levels=valid_levels, value=log_level
             )
             logger.debug(msg)
             raise ValueError(msg)
@@ -56,19 +65,24 @@ class LogParserView:
 
     def action(self) -> str:
         """
-        Prompts the user to enter the next action (`next` or `quit`). Validates
-        the input and returns the validated action.
+        Prompts the user to enter the next action (`next`, `prev`, `first`, `last`,
+        `goto N`, `templates` or `quit`). Validates the input and returns the
+        validated action.
 
         Returns:
-            str: The validated user action (`next` or `quit`).
+            str: The validated user action, in lower case.
 
         Raises:
             ValueError: If the entered action is not valid.
         """
         command = input(ViewMessages.COMMAND)
-        if command.lower() in ("next", "quit"):
+        words = command.lower().split()
+        commands = (["next"], ["prev"], ["first"], ["last"], ["templates"], ["quit"])
+        if words in commands or (
+            len(words) == 2 and words[0] == "goto" and words[1].isdigit()
+        ):
             self.clear_screen()
-            return command
+            return " ".join(words)
 
         logger.info(ErrorMessages.INVALID_COMMAND_LOG.format(command=command))
         raise ValueError(ErrorMessages.INVALID_COMMAND.format(command=command))
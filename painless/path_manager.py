@@ -34,7 +34,7 @@ class PathManager(FileMixins):
         """
         return self._path
 
-    def is_exist(self) -> bool:
+    def is_exist(self) -> bool:  # type: ignore[override]
         """Check if a given path exists using the is_path_exists method."""
         return super().is_exist(self.path)
 
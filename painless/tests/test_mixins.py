@@ -60,7 +60,7 @@ class TestFileMixins:
             with pytest.raises(
                 ValueError, match="path should be Path `object` or `str`"
             ):
-                file_handler.convert_to_path(invalid_type)
+                file_handler.convert_to_path(invalid_type)  # type: ignore[arg-type]
 
     def test_path_existence(
         self, file_handler: FileMixins, sample_existing_path: Path
@@ -83,4 +83,4 @@ class TestFileMixins:
         invalid_types = (12, 10.02, True, open)
         for invalid_type in invalid_types:
             with pytest.raises(ValueError, match="path should be a Path object"):
-                file_handler.is_exist(invalid_type)
+                file_handler.is_exist(invalid_type)  # type: ignore[arg-type]
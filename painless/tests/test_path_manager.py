@@ -20,7 +20,7 @@ class TestPathManager:
         """
         return PathManager(path=sample_path)
 
-    def test_is_path_valid(self, path_manager: PathManager, sample_path: Path) -> Path:
+    def test_is_path_valid(self, path_manager: PathManager, sample_path: Path) -> None:
         """
         Test whether the PathManager.path is a valid Path object and matches the
         expected path.
@@ -1,10 +1,20 @@
-from pathlib import Path
+import sys
 
-from core import main
-from config import setup_logging
-
-LOGGING_CONFIG_PATH = Path("logging.toml")
+from config import LOGGING_CONFIG_PATH, setup_logging
 
 if __name__ == "__main__":
     setup_logging(logging_config_path=LOGGING_CONFIG_PATH)
+    # Only the entry point that runs is imported, see `core/__init__.py`.
+    # Run the HTTP query service on `run.py serve`.
+    if sys.argv[1:2] == ["serve"]:
+        from core import serve
+
+        sys.exit(serve(sys.argv[2:]))
+    # Run the non-interactive batch mode when arguments are given.
+    if len(sys.argv) > 1:
+        from core import batch
+
+        sys.exit(batch())
+    from core import main
+
     main()